@@ -0,0 +1,71 @@
+'''
+Compares the blocked syrk assembly of the correlation matrix against one
+full product per velocity component.
+
+    python benchmarks/bench_gram.py -nPts 200000 -nSnaps 1000 -blasThreads 4
+'''
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from modalMethods.bin.POD.pod_kernels import blas_threads, get_correlation_matrix
+
+
+def legacy_correlation_matrix(u):
+    c = np.dot(u[0].T, u[0])
+    for uk in u[1:]:
+        c = np.add(c, np.dot(uk.T, uk))
+
+    return c
+
+
+def time_call(func, *args):
+    '''returns the output, run time and peak memory allocated by func'''
+    tracemalloc.start()
+    tStart = time.perf_counter()
+    out = func(*args)
+    tEnd = time.perf_counter()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return out, tEnd - tStart, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Benchmark the correlation matrix assembly.")
+
+    parser.add_argument('-nPts',
+                        type=int,
+                        help='# of points in the POD window',
+                        default=100000)
+
+    parser.add_argument('-nSnaps',
+                        type=int,
+                        help='# of snapshots',
+                        default=500)
+
+    parser.add_argument('-blasThreads',
+                        type=int,
+                        help='# of BLAS threads, BLAS default if 0',
+                        default=0)
+
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for nDim in [2, 3]:
+        u = rng.standard_normal((nDim, args.nPts, args.nSnaps))
+
+        with blas_threads(args.blasThreads):
+            old, tOld, memOld = time_call(legacy_correlation_matrix, u)
+            new, tNew, memNew = time_call(get_correlation_matrix, u)
+
+        err = np.max(np.abs(old - new))/np.max(np.abs(old))
+        print(' %dd window: legacy %8.3f s %8.1f MB, syrk %8.3f s %8.1f MB, '
+              'speedup %5.2fx, relative difference %.1e'
+              % (nDim, tOld, memOld/1e6, tNew, memNew/1e6, tOld/tNew, err))
+
+
+if __name__ == "__main__":
+    main()
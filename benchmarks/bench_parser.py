@@ -0,0 +1,167 @@
+'''
+Compares the single-pass OpenFOAM field parser against the line-by-line
+parser it replaced.
+
+    python benchmarks/bench_parser.py -nPts 1000000
+'''
+
+import argparse
+import os
+import re
+import tempfile
+import time
+import numpy as np
+from modalMethods.readers.reader_support_functions import read_data, get_internal_field
+
+_foamHeader = '''/*--------------------------------*- C++ -*----------------------------------*\\
+| =========                 |                                                 |
+| \\\\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |
+|  \\\\    /   O peration     | Version:  5.x                                   |
+|   \\\\  /    A nd           | Web:      www.OpenFOAM.org                      |
+|    \\\\/     M anipulation  |                                                 |
+\\*---------------------------------------------------------------------------*/
+FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       volVectorField;
+    location    "0";
+    object      U;
+}
+// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //
+
+dimensions      [0 1 -1 0 0 0 0];
+
+internalField   nonuniform List<vector>
+'''
+
+
+def legacy_get_number_of_cols(fname, skiprows=0):
+    count = 0
+    with open(fname) as f:
+        for line in f:
+            count += 1
+
+            if count > skiprows:
+                line = re.split(r'[(|)|\s]', line)
+                while '' in line:
+                    line.remove('')
+
+                try:
+                    temp = float( line[0] )
+                    nCols = len(line)
+                    break
+                except:
+                    continue
+
+            else: continue
+
+    return nCols
+
+
+def legacy_get_internal_field(fname, skiprows=0):
+    nCols = legacy_get_number_of_cols(fname, skiprows)
+    data = [[] for i in range(nCols)]
+
+    count = 0
+    pointsInternalField = 0
+
+    with open(fname) as f:
+        for line in f:
+            count += 1
+
+            if count == (skiprows-1):
+                line = re.split(r'[\s]', line)
+                while '' in line:
+                    line.remove('')
+
+                pointsInternalField = int( line[0] )
+
+            elif (count > skiprows) and (count <= pointsInternalField + skiprows):
+                line = re.split(r'[(|)|\s]', line)
+                while '' in line:
+                    line.remove('')
+
+                try:
+                    for i in range( nCols ):
+                        data[i].append( float( line[i] ) )
+
+                except:
+                    continue
+
+            elif count > pointsInternalField + skiprows:
+                break
+
+            else: continue
+
+    return np.array(data).T
+
+
+def legacy_read_data(filePath, cols):
+    data = [[] for i in range(len(cols))]
+
+    with open(filePath) as f:
+        for line in f:
+            line = re.split(r'[(|)|\s]', line)
+            try:
+                for i in range(len(cols)):
+                    data[i].append(float(line[1+cols[i]]))
+            except:
+                continue
+
+    return np.array(data)
+
+
+def write_fields(caseDir, nPts):
+    '''writes a 3d internal field and a 2d surface field with nPts entries'''
+
+    data = np.random.default_rng(0).standard_normal((nPts, 3))
+    rows = '\n'.join('(%.6g %.6g %.6g)' % tuple(x) for x in data)
+
+    fname3d = os.path.join(caseDir, 'U')
+    with open(fname3d, 'w') as f:
+        f.write(_foamHeader + str(nPts) + '\n(\n' + rows + '\n)\n;\n\n' +
+                'boundaryField\n{\n}\n')
+
+    fname2d = os.path.join(caseDir, 'vectorField_U')
+    with open(fname2d, 'w') as f:
+        f.write(str(nPts) + '\n(\n' + rows + '\n)\n')
+
+    return fname3d, fname2d
+
+
+def time_call(func, *args):
+    tStart = time.perf_counter()
+    out = func(*args)
+    return out, time.perf_counter() - tStart
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Benchmark the OpenFOAM ascii field parser.")
+
+    parser.add_argument('-nPts',
+                        type=int,
+                        help='# of entries in the field',
+                        default=200000)
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as caseDir:
+        fname3d, fname2d = write_fields(caseDir, args.nPts)
+
+        old, tOld = time_call(legacy_get_internal_field, fname3d, 22)
+        new, tNew = time_call(get_internal_field, fname3d)
+        assert np.array_equal(old, new)
+        print(' get_internal_field: legacy %8.3f s, new %8.3f s, speedup %6.1fx'
+              % (tOld, tNew, tOld/tNew))
+
+        old, tOld = time_call(legacy_read_data, fname2d, [0, 1])
+        new, tNew = time_call(read_data, fname2d, [0, 1])
+        assert np.array_equal(old, new)
+        print(' read_data:          legacy %8.3f s, new %8.3f s, speedup %6.1fx'
+              % (tOld, tNew, tOld/tNew))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+'''
+Measures the start-up time of the command line tools: the time to import
+the module of each command and to print its help, and the heavy packages
+(matplotlib, scipy, tqdm) that are imported on the way.
+
+    python benchmarks/bench_startup.py -nRepeat 20
+'''
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import numpy as np
+
+_commands = {
+    'pod':         'modalMethods.bin.POD.write_pod_modes',
+    'basic-plot':  'modalMethods.bin.POD.pod_basic_plot',
+    'quiver-plot': 'modalMethods.bin.POD.pod_quiver_plot',
+    'energy-plot': 'modalMethods.bin.POD.pod_energy_plot',
+}
+
+_heavy = ['matplotlib', 'scipy', 'tqdm']
+
+
+def time_run(cmd, nRepeat):
+    '''returns the median wall time of nRepeat runs of cmd'''
+    times = []
+    for i in range(nRepeat):
+        tStart = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - tStart)
+
+    return float(np.median(times))
+
+
+def get_heavy_imports(module):
+    '''returns the heavy packages imported with module'''
+    code = ('import sys, json, ' + module + '; print(json.dumps([m for m in ' +
+            repr(_heavy) + ' if m in sys.modules]))')
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         stdout=subprocess.PIPE).stdout
+
+    return json.loads(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Benchmark the start-up time of the command line tools.")
+
+    parser.add_argument('-nRepeat',
+                        type=int,
+                        help='# of runs of each command',
+                        default=10)
+
+    args = parser.parse_args()
+
+    python = time_run([sys.executable, '-c', 'pass'], args.nRepeat)
+    numpy  = time_run([sys.executable, '-c', 'import numpy'], args.nRepeat)
+    print(' interpreter %6.3f s, numpy import %6.3f s' % (python, numpy))
+
+    print(' %-12s %10s %10s  %s' % ('command', 'import', 'help', 'heavy imports'))
+    for command, module in _commands.items():
+        tImport = time_run([sys.executable, '-c', 'import ' + module], args.nRepeat)
+        tHelp   = time_run([sys.executable, '-m', 'modalMethods', command, '-h'],
+                           args.nRepeat)
+        heavy   = get_heavy_imports(module)
+
+        print(' %-12s %8.3f s %8.3f s  %s' % (command, tImport, tHelp,
+                                              ', '.join(heavy) or '-'))
+
+
+if __name__ == "__main__":
+    main()
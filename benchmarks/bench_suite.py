@@ -0,0 +1,216 @@
+'''
+Benchmark suite of the reader and POD path on synthetic cases: times and
+memory-profiles read_points_from_foamFile, get_indices_npts,
+read_velocity_from_foamFile, get_modes and the plotting functions, and
+writes the results as JSON so that runs can be compared across commits.
+
+    python benchmarks/bench_suite.py -nPts 50000 -nSnaps 100 -output new.json
+    python benchmarks/bench_suite.py -nPts 50000 -nSnaps 100 -compare old.json
+
+The memory reported is the peak of the allocations traced by tracemalloc
+(numpy buffers included, memory-mapped files excluded) of one extra run.
+'''
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+from synthetic_case import make_case
+
+# case name: (nDim, format):
+_cases = {'2d-ascii': (2, 'ascii'), '3d-ascii': (3, 'ascii'),
+          '3d-binary': (3, 'binary')}
+
+
+def run_stage(func, nRepeat):
+    '''returns the run times of nRepeat calls of func and its traced peak memory'''
+    times = []
+    with open(os.devnull, 'w') as fnull, contextlib.redirect_stdout(fnull), \
+         contextlib.redirect_stderr(fnull):
+        for i in range(nRepeat):
+            tStart = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - tStart)
+
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return times, peak
+
+
+def get_stages(configFile, plots):
+    '''returns the (name, function) stages of the case of configFile'''
+    from modalMethods.readers.reader import (config_to_dict, read_points_from_foamFile,
+                                             read_velocity_from_foamFile)
+    from modalMethods.readers.reader_support_functions import get_indices_npts
+    from modalMethods.readers.foam_file import read_foam_field
+    from modalMethods.bin.POD.pod_eval import get_pod_setup, get_modes
+    from modalMethods.bin.POD.write_pod_modes import write_modes
+    from modalMethods.bin.POD.pod_basic_plot import pod_basic_plot
+    from modalMethods.bin.POD.pod_quiver_plot import pod_quiver_plot
+    from modalMethods.bin.POD.pod_energy_plot import pod_energy_plot
+
+    # the parse cache is disabled, every repeat parses the files:
+    with open(configFile) as f:
+        configLines = f.readlines() + ['parseCache no\n']
+
+    configDict = config_to_dict(configLines)[0]
+    s = get_pod_setup(configDict)
+    nDim = s['nDim']
+
+    out = read_points_from_foamFile(s['filePath'], s['nSnaps'], s['patchName'],
+                                    s['minX'], s['maxX'], s['h'], nDim, s['cols'],
+                                    None)
+    indices, nPts = out[-2:]
+
+    if nDim == 2:
+        coordFile = s['filePath'] + '/' + os.listdir(s['filePath'])[0] + '/' + \
+                    s['patchName'] + '/points'
+    else:
+        coordFile = [d for d in os.listdir(s['caseDir'])
+                     if os.path.exists(s['caseDir'] + '/' + d + '/cellCentres')][0]
+        coordFile = s['caseDir'] + '/' + coordFile + '/cellCentres'
+    coordData = np.array( read_foam_field(coordFile) )
+
+    stages = [
+        ('read_points_from_foamFile',
+         lambda: read_points_from_foamFile(s['filePath'], s['nSnaps'], s['patchName'],
+                                           s['minX'], s['maxX'], s['h'], nDim,
+                                           s['cols'], None)),
+        ('get_indices_npts',
+         lambda: get_indices_npts(coordData, s['minX'], s['maxX'], nDim, s['cols'])),
+        ('read_velocity_from_foamFile',
+         lambda: read_velocity_from_foamFile(s['filePath'], s['patchName'], indices,
+                                             s['nSnaps'], nPts, nDim, s['cols'],
+                                             cache=None)),
+        ('get_modes', lambda: get_modes(configLines)),
+    ]
+
+    if plots and nDim == 2:
+        # the plots read the POD results of the case:
+        with open(os.devnull, 'w') as fnull, contextlib.redirect_stdout(fnull), \
+             contextlib.redirect_stderr(fnull):
+            write_modes(get_modes(configLines), nDim)
+
+        stages += [('pod_basic_plot', lambda: pod_basic_plot(configLines)),
+                   ('pod_quiver_plot', lambda: pod_quiver_plot(configLines)),
+                   ('pod_energy_plot', lambda: pod_energy_plot(configLines))]
+
+    return stages, nPts
+
+
+def get_meta(args):
+    '''describes the run: commit, versions, machine and parameters'''
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                cwd=os.path.dirname(os.path.abspath(__file__))
+                                ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {'commit': commit,
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'machine': platform.machine(), 'nCPU': os.cpu_count(),
+            'nPts': args.nPts, 'nSnaps': args.nSnaps, 'nRepeat': args.nRepeat}
+
+
+def compare(results, fname):
+    '''prints the ratio of the median times to those of an earlier run'''
+    with open(fname) as f:
+        old = {(r['case'], r['stage']): r for r in json.load(f)['results']}
+
+    print('\n compared to ' + fname + ':')
+    for r in results:
+        ref = old.get((r['case'], r['stage']))
+        if ref is None or 'time' not in ref or 'time' not in r:
+            continue
+        print('  %-10s %-28s %8.3f s -> %8.3f s  x%.2f'
+              % (r['case'], r['stage'], ref['time'], r['time'], r['time']/ref['time']))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Benchmark the readers and the POD on synthetic cases.")
+
+    parser.add_argument('-nPts', type=int, help='# of points of the cases',
+                        default=20000)
+    parser.add_argument('-nSnaps', type=int, help='# of snapshots of the cases',
+                        default=50)
+    parser.add_argument('-nRepeat', type=int, help='# of timed runs of each stage',
+                        default=3)
+    parser.add_argument('-cases', type=str, nargs='+', choices=list(_cases),
+                        help='cases to run', default=list(_cases))
+    parser.add_argument('-caseRoot', type=str,
+                        help='directory of the generated cases, kept after the run; '
+                             'a temporary directory if not given')
+    parser.add_argument('-noPlots', action='store_true',
+                        help='skip the plotting functions')
+    parser.add_argument('-output', type=str, help='JSON file of the results',
+                        default='benchmark.json')
+    parser.add_argument('-compare', type=str,
+                        help='JSON file of an earlier run to compare against')
+
+    args = parser.parse_args()
+
+    caseRoot = args.caseRoot or tempfile.mkdtemp(prefix='modalMethods_bench_')
+    cwd = os.getcwd()
+    results = []
+
+    try:
+        for name in args.cases:
+            nDim, fmt = _cases[name]
+            caseDir = os.path.join(caseRoot, name + '_' + str(args.nPts) + '_' +
+                                   str(args.nSnaps))
+
+            if not os.path.exists(os.path.join(caseDir, 'PODdict')):
+                print('\n generating ' + caseDir + ' ...')
+                make_case(caseDir, nDim, args.nPts, args.nSnaps, fmt=fmt)
+
+            os.chdir(caseDir)
+            stages, nPts = get_stages(os.path.join(caseDir, 'PODdict'),
+                                      not args.noPlots)
+
+            print('\n ' + name + ': ' + str(nPts) + ' points in the POD window')
+            for stage, func in stages:
+                result = {'case': name, 'stage': stage, 'nPtsWindow': int(nPts)}
+                try:
+                    times, peak = run_stage(func, args.nRepeat)
+                    result.update(time=float(np.median(times)), times=times,
+                                  peakMemory=peak)
+                    print('  %-28s %8.3f s %10.1f MB' % (stage, result['time'],
+                                                         peak/1e6))
+                except Exception as e:
+                    result['error'] = repr(e)
+                    print('  %-28s failed: %r' % (stage, e))
+
+                results.append(result)
+            os.chdir(cwd)
+
+    finally:
+        os.chdir(cwd)
+        if args.caseRoot is None:
+            shutil.rmtree(caseRoot)
+
+    with open(args.output, 'w') as f:
+        json.dump({'meta': get_meta(args), 'results': results}, f, indent=2)
+    print('\n results written in ' + args.output)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
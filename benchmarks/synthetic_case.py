@@ -0,0 +1,195 @@
+'''
+Generates synthetic OpenFOAM cases for the benchmarks: a 2d case with the
+cuttingPlane surfaces in postProcessing, or a 3d case with the internal
+field and cell centres in the time directories, ascii or binary. The
+velocity is a sum of a few travelling waves plus noise.
+
+    python benchmarks/synthetic_case.py -caseDir /tmp/case3d -nDim 3 \
+        -nPts 100000 -nSnaps 100 -format binary
+'''
+
+import argparse
+import os
+import numpy as np
+
+_foamHeader = '''FoamFile
+{
+    version     2.0;
+    format      %s;
+    arch        "LSB;label=32;scalar=64";
+    class       %s;
+    location    "%s";
+    object      %s;
+}
+// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //
+
+dimensions      [0 1 -1 0 0 0 0];
+
+internalField   nonuniform List<vector>
+'''
+
+_config2d = '''nDim 2
+patchName %s
+nSnaps %d
+nModes %d
+direction1 x
+direction2 y
+x1min 0.5
+x1max 3.5
+x2min 0.5
+x2max 3.5
+h 1
+nPltPts 100
+modes (0, 1, 2)
+point (1.5, 1.5)
+point (2.5, 1.5)
+point (2.5, 2.5)
+point (1.5, 1.5)
+'''
+
+_config3d = '''nDim 3
+patchName internal
+nSnaps %d
+nModes %d
+x1min 0.5
+x1max 3.5
+x2min 0.5
+x2max 3.5
+x3min 0.5
+x3max 3.5
+h 1
+modes (0, 1, 2)
+'''
+
+
+def get_time_names(nSnaps):
+    '''names of the time directories, equally spaced from 1'''
+    return ['%.4f' % (1 + 1e-4*k) for k in range(nSnaps)]
+
+
+def get_velocity(x, k, rng):
+    '''(nPts, 3) velocity of snapshot k at the points x'''
+    t = 0.1*k
+    u = np.empty_like(x)
+    u[:, 0] = np.sin(x[:, 0] - t) + 0.5*np.sin(2*x[:, 1] + 2*t)
+    u[:, 1] = np.cos(x[:, 1] - t) + 0.25*np.cos(3*x[:, 0] - 3*t)
+    u[:, 2] = 0.5*np.sin(x[:, 2] + x[:, 0] - 0.5*t)
+    u += 0.01*rng.standard_normal(x.shape)
+
+    return u
+
+
+def write_field(fname, data, fmt='ascii', header=True, location='0', obj='U'):
+    '''
+    Input
+    -----
+        fname: path of the file
+        data: (nPts, 3) vectors
+        fmt: 'ascii' or 'binary', binary fields need a header
+        header: write the FoamFile header, surfaces written by the
+                cuttingPlane function object have none
+        location, obj: header entries
+    '''
+
+    with open(fname, 'wb') as f:
+        if header:
+            f.write( (_foamHeader % (fmt, 'volVectorField', location, obj)).encode() )
+
+        f.write( ('%d\n(' % data.shape[0]).encode() )
+        if fmt == 'binary':
+            f.write( np.ascontiguousarray(data, dtype='<f8').tobytes() )
+        else:
+            f.write(b'\n')
+            np.savetxt(f, data, fmt='(%.10g %.10g %.10g)')
+        f.write(b')\n')
+
+        if header:
+            f.write(b';\n\nboundaryField\n{\n}\n')
+
+
+def make_case_2d(caseDir, nPts, nSnaps, nModes=10, patchName='zNormal', seed=0):
+    '''
+    writes postProcessing/cuttingPlane/<time>/<patchName>/{points, vectorField/U}
+    and the config file caseDir/PODdict
+    '''
+
+    rng = np.random.default_rng(seed)
+    x = 4*rng.random((nPts, 3))
+    x[:, 2] = 0
+
+    for k, time in enumerate( get_time_names(nSnaps) ):
+        surfDir = os.path.join(caseDir, 'postProcessing', 'cuttingPlane', time,
+                               patchName)
+        os.makedirs(os.path.join(surfDir, 'vectorField'), exist_ok=True)
+
+        write_field(os.path.join(surfDir, 'points'), x, header=False)
+        write_field(os.path.join(surfDir, 'vectorField', 'U'),
+                    get_velocity(x, k, rng), header=False)
+
+    configFile = os.path.join(caseDir, 'PODdict')
+    with open(configFile, 'w') as f:
+        f.write(_config2d % (patchName, nSnaps, nModes))
+
+    return configFile
+
+
+def make_case_3d(caseDir, nPts, nSnaps, nModes=10, fmt='ascii', seed=0):
+    '''
+    writes <time>/U, <first time>/cellCentres and the config file
+    caseDir/PODdict
+    '''
+
+    rng = np.random.default_rng(seed)
+    x = 4*rng.random((nPts, 3))
+
+    for k, time in enumerate( get_time_names(nSnaps) ):
+        timeDir = os.path.join(caseDir, time)
+        os.makedirs(timeDir, exist_ok=True)
+
+        if k == 0:
+            write_field(os.path.join(timeDir, 'cellCentres'), x, fmt,
+                        location=time, obj='cellCentres')
+        write_field(os.path.join(timeDir, 'U'), get_velocity(x, k, rng), fmt,
+                    location=time)
+
+    configFile = os.path.join(caseDir, 'PODdict')
+    with open(configFile, 'w') as f:
+        f.write(_config3d % (nSnaps, nModes))
+
+    return configFile
+
+
+def make_case(caseDir, nDim, nPts, nSnaps, nModes=10, fmt='ascii', seed=0):
+    '''writes a synthetic case and returns the path of its config file'''
+    if nDim == 2:
+        if fmt != 'ascii':
+            raise ValueError('\n cuttingPlane surfaces are only written in ascii ...')
+        return make_case_2d(caseDir, nPts, nSnaps, nModes, seed=seed)
+
+    elif nDim == 3:
+        return make_case_3d(caseDir, nPts, nSnaps, nModes, fmt, seed)
+
+    raise ValueError('Oops! Number of dimensions not defined ...')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Generate a synthetic OpenFOAM case.")
+
+    parser.add_argument('-caseDir', type=str, help='case directory', required=True)
+    parser.add_argument('-nDim', type=int, help='2 or 3', default=3)
+    parser.add_argument('-nPts', type=int, help='# of points', default=10000)
+    parser.add_argument('-nSnaps', type=int, help='# of snapshots', default=50)
+    parser.add_argument('-nModes', type=int, help='# of POD modes', default=10)
+    parser.add_argument('-format', type=str, choices=['ascii', 'binary'],
+                        help='format of the 3d fields', default='ascii')
+
+    args = parser.parse_args()
+
+    configFile = make_case(args.caseDir, args.nDim, args.nPts, args.nSnaps,
+                           args.nModes, args.format)
+    print('\n case written, config file ' + configFile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+'''
+Compares the POD of a case computed with 'precision float32' against the
+float64 path: singular values, modes, and orthogonality of the modes.
+Run it in the case directory:
+
+    python benchmarks/validate_precision.py -config constant/PODdict
+'''
+
+import argparse
+import time
+import numpy as np
+from modalMethods.bin.POD.pod_eval import get_pod_result
+
+
+def run_pod(configLines, precision):
+    tStart = time.perf_counter()
+    result = get_pod_result(configLines + ['precision ' + precision + '\n'])
+    modes  = result.modes
+    result.close()
+
+    return result, modes, time.perf_counter() - tStart
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Validate single-precision POD against double precision.")
+
+    parser.add_argument('-config',
+                        type=str,
+                        help='The config file',
+                        required=True)
+
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        configLines = [line for line in f if not line.startswith('precision')]
+
+    ref, refModes, tRef = run_pod(configLines, 'float64')
+    res, resModes, tRes = run_pod(configLines, 'float32')
+
+    nModes = ref.nModes
+    refModes = refModes.reshape(-1, nModes)
+    resModes = resModes.reshape(-1, nModes)
+
+    # singular values:
+    singErr = np.abs(res.singVals - ref.singVals)/ref.singVals[0]
+
+    # modes, up to their sign:
+    proj    = np.sum(refModes*resModes, axis=0)
+    modeErr = np.linalg.norm(resModes*np.sign(proj) - refModes, axis=0)
+
+    # orthogonality of the single precision modes:
+    orthErr = np.max(np.abs( np.dot(resModes.T, resModes) - np.eye(nModes) ))
+
+    print('\n precision validation: ' + str(ref.nPts) + ' points, ' +
+          str(ref.nSnaps) + ' snapshots, ' + str(nModes) + ' modes')
+    print('  run time: float64 %.2f s, float32 %.2f s' % (tRef, tRes))
+    print('  %5s %14s %14s %12s %12s' % ('mode', 'singVal64', 'singVal32',
+                                          'rel. error', 'mode error'))
+    for i in range(nModes):
+        print('  %5d %14.6e %14.6e %12.3e %12.3e' % (i, ref.singVals[i],
+              res.singVals[i], singErr[i], modeErr[i]))
+    print('  max |phi32^T phi32 - I| = %.3e' % orthErr)
+
+
+if __name__ == "__main__":
+    main()
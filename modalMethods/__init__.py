@@ -1,3 +1,14 @@
-from . import readers
+import importlib
 
 __all__ = ["readers"]
+
+# subpackages are imported on first access, so that the command line tools
+# only import what they use:
+_subpackages = ["readers", "bin", "profiler"]
+
+
+def __getattr__(name):
+    if name in _subpackages:
+        return importlib.import_module('.' + name, __name__)
+
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
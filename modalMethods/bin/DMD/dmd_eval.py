@@ -0,0 +1,146 @@
+import numpy as np
+import os
+from modalMethods.readers.reader_support_functions import *
+from modalMethods.readers.reader import *
+from modalMethods.readers.decomposed import *
+from modalMethods.profiler import *
+from modalMethods.bin.POD.pod_kernels import *
+from modalMethods.bin.POD.pod_eval import *
+from .dmd_kernels import *
+from .dmd_result import *
+
+__all__=["get_dmd_setup", "get_snapshot_times", "get_dmd_result"]
+
+
+def get_dmd_setup(configDict, nWorkers=None):
+    '''
+    Input
+    -----
+        configDict: dictionary of the config file entries
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        setup: output of get_pod_setup with the DMD entries: 'dmdMethod'
+               (exact or streaming), 'dt' (None to take it from the time
+               directories) and 'streamTol'
+    '''
+
+    setup = get_pod_setup(configDict, nWorkers)
+
+    setup['dmdMethod'] = configDict.get('dmdMethod', 'exact')
+    if setup['dmdMethod'] not in ('exact', 'streaming'):
+        raise ValueError('\n dmdMethod should be exact or streaming ...')
+
+    setup['dt'] = float( configDict['dt'] ) if 'dt' in configDict else None
+    setup['streamTol'] = float( configDict.get('streamTol', 1e-10) )
+
+    if setup['distributed']:
+        print('\n distributed DMD is not supported, running on one process ...')
+
+    return setup
+
+
+def get_snapshot_times(setup):
+    '''
+    Input
+    -----
+        setup: output of get_dmd_setup
+
+    Output
+    ------
+        timeDirs: names of the nSnaps time directories of the snapshots
+        dt: time between two snapshots, the 'dt' entry of the config file or
+            the mean spacing of the time directories
+    '''
+
+    if setup['decomposed']:
+        timeDirs = get_time_dirs(get_processor_dirs(setup['filePath'])[0],
+                                 setup['nSnaps'], setup['timeSelection'], 'U')
+    else:
+        timeDirs = get_time_dirs(setup['filePath'], setup['nSnaps'],
+                                 setup['timeSelection'],
+                                 get_snapshot_field(setup['patchName'],
+                                                    setup['nDim']))
+
+    if len(timeDirs) < 2:
+        raise ValueError('\n DMD needs at least 2 snapshots ...')
+
+    dt = setup['dt']
+    if dt is None:
+        steps = np.diff( np.asarray(timeDirs, dtype=np.float64) )
+        dt = np.mean(steps)
+        if np.ptp(steps) > 1e-6*abs(dt):
+            print('\n the snapshots are not equally spaced in time, ' +
+                  'using the mean spacing dt = ' + str(dt) + ' ...')
+
+    return timeDirs, dt
+
+
+def get_dmd_result(configFile, nWorkers=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        result: DMDResult
+
+    The exact DMD reads the snapshot matrix like the POD (in memory or
+    out-of-core), computes the correlation matrix once and truncates the
+    POD of the snapshots at nModes. The streaming DMD reads the snapshots
+    one at a time and keeps about 2 nModes of them in memory.
+    '''
+
+    [configDict, modes, points] = config_to_dict(configFile)
+    setup = get_dmd_setup(configDict, nWorkers)
+
+    patchName, nSnaps = setup['patchName'], setup['nSnaps']
+
+    coords, indices, nPts = read_window_points(setup)
+
+    with stage('listDirs'):
+        timeDirs, dt = get_snapshot_times(setup)
+
+    if setup['dmdMethod'] == 'streaming':
+        print('\n streaming DMD ...')
+        dmd = StreamingDMD(setup['nModes'], setup['streamTol'])
+
+        with stage('streaming'):
+            for x in iter_snapshots(setup, indices, nPts, timeDirs):
+                dmd.add_snapshot(x)
+                add_snapshots(1)
+
+            eigVals, amplitudes, phi = dmd.get_dmd()
+
+        return DMDResult(coords, eigVals, amplitudes,
+                         phi.reshape(setup['nDim'], nPts, -1), dt, patchName,
+                         nSnaps, 'streaming')
+
+    snapshotFile = get_snapshot_file(setup, 'DMD')
+    u = read_snapshot_matrix(setup, indices, nPts, snapshotFile)
+
+    try:
+        with blas_threads(setup['blasThreads']):
+            with stage('gram'):
+                c = get_correlation_matrix(u, setup['blockSize'])
+
+            print('\n performing DMD ...')
+            with stage('eigen'):
+                eigVals, amplitudes, coeff = get_exact_dmd(c, setup['nModes'],
+                                                           setup['solver'])
+
+            with stage('projection'):
+                phi = get_dmd_modes(u, coeff, setup['blockSize'])
+
+    finally:
+        del u
+        if snapshotFile is not None:
+            os.remove(snapshotFile)
+
+    return DMDResult(coords, eigVals, amplitudes, phi, dt, patchName, nSnaps,
+                     'exact')
@@ -0,0 +1,223 @@
+import numpy as np
+from modalMethods.bin.POD.pod_kernels import *
+from modalMethods.bin.POD.pod_kernels import _get_blocks
+
+__all__=["get_exact_dmd", "get_dmd_modes", "StreamingDMD"]
+
+
+def _sort_by_amplitude(eigVals, amplitudes, w):
+    '''orders the DMD modes by decreasing amplitude'''
+    order = np.argsort(-np.abs(amplitudes), kind='stable')
+
+    return eigVals[order], amplitudes[order], w[:, order]
+
+
+def get_exact_dmd(c, nModes, solver='svd'):
+    '''
+    Input
+    -----
+        c: (nSnaps, nSnaps) correlation matrix of all the snapshots, not
+           divided by nSnaps
+        nModes: rank of the POD truncation of the first nSnaps - 1 snapshots
+        solver: eigensolver of the correlation matrix, see get_eigen_modes
+
+    Output
+    ------
+        eigVals: (nModes,) DMD eigenvalues
+        amplitudes: (nModes,) amplitudes of the modes in the first snapshot
+        coeff: (nSnaps - 1, nModes) coefficients of the exact DMD modes in
+               the snapshots 1 to nSnaps - 1, see get_dmd_modes
+
+    With X and Y the snapshots 0 to nSnaps - 2 and 1 to nSnaps - 1, X^T X
+    and X^T Y are blocks of c. The POD of X gives X = U S V^T, the reduced
+    operator is U^T Y V S^-1 = S^-1 V^T (X^T Y) V S^-1 and the exact DMD
+    modes (Tu et al. 2014) are Y V S^-1 W / lambda, so the snapshots are
+    only read again to project the modes.
+    '''
+
+    cx, cxy = c[:-1, :-1], c[:-1, 1:]
+
+    singVals, eigVect = get_eigen_modes(cx, nModes, solver)
+
+    # directions of X below round-off are dropped:
+    keep = singVals > singVals[0]*cx.shape[0]*np.finfo(np.float64).eps
+    vs = eigVect[:, keep]/np.sqrt(singVals[keep])
+
+    aTilde = np.dot(vs.T, np.dot(cxy, vs))
+    eigVals, w = np.linalg.eig(aTilde)
+
+    amplitudes = np.linalg.solve(w, np.dot(vs.T, c[:-1, 0]))
+    eigVals, amplitudes, w = _sort_by_amplitude(eigVals, amplitudes, w)
+
+    scale = np.where(np.abs(eigVals) > 0, eigVals, 1)
+    coeff = np.dot(vs, w)/scale
+
+    return eigVals, amplitudes, coeff
+
+
+def get_dmd_modes(u, coeff, blockSize=None):
+    '''
+    Input
+    -----
+        u: (nComp, nPts, nSnaps) snapshot matrix or list of (nPts, nSnaps)
+           velocity components, may be memory-mapped
+        coeff: (nSnaps - 1, nModes) output of get_exact_dmd
+        blockSize: # of points per block, all points at once if None
+
+    Output
+    ------
+        phi: (nComp, nPts, nModes) complex exact DMD modes
+    '''
+
+    nPts  = u[0].shape[0]
+    nComp = len(u)
+    phi   = np.zeros((nComp, nPts, coeff.shape[1]), dtype=np.complex128)
+
+    # real products, the snapshot blocks are never cast to complex:
+    coeffRe, coeffIm = np.ascontiguousarray(coeff.real), np.ascontiguousarray(coeff.imag)
+    for start, end in _get_blocks(nPts, blockSize):
+        for k in range(nComp):
+            block = u[k][start:end, 1:]
+            phi[k, start:end].real = np.dot(block, coeffRe)
+            phi[k, start:end].imag = np.dot(block, coeffIm)
+
+    return phi
+
+
+def _expand_basis(q, x, tol):
+    '''
+    returns the basis q with the normalized part of x outside it appended,
+    or q itself if that part is smaller than tol relative to x
+    '''
+    xNorm = np.linalg.norm(x)
+    if xNorm == 0:
+        return q
+
+    if q is None:
+        return (x/xNorm)[:, None]
+
+    # classical Gram-Schmidt with one reorthogonalization:
+    e = x - np.dot(q, np.dot(q.T, x))
+    e -= np.dot(q, np.dot(q.T, e))
+    eNorm = np.linalg.norm(e)
+
+    if eNorm > tol*xNorm:
+        return np.column_stack([q, e/eNorm])
+
+    return q
+
+
+def _leading_eigvect(g, nVect):
+    '''returns the nVect leading eigenvectors of the symmetric matrix g'''
+    eigVals, eigVect = np.linalg.eigh(g)
+
+    return eigVect[:, ::-1][:, :nVect]
+
+
+class StreamingDMD(object):
+    '''
+    Streaming DMD (Hemati et al. 2014): the snapshots are added one at a
+    time and only two orthonormal bases Qx and Qy of the snapshots x and of
+    the next ones y, each of at most maxRank + 1 vectors, and three small
+    matrices are kept: A = sum y~ x~^T, Gx = sum x~ x~^T and Gy = sum y~ y~^T
+    with x~ = Qx^T x and y~ = Qy^T y. The memory does not depend on the #
+    of snapshots. When a basis grows past maxRank it is compressed to the
+    leading POD directions of its snapshots seen so far.
+
+    Input
+    -----
+        maxRank: maximum rank of the bases, i.e. # of DMD modes
+        tol: relative norm below which the part of a snapshot outside a
+             basis is discarded
+    '''
+
+    def __init__(self, maxRank, tol=1e-10):
+        self.maxRank = maxRank
+        self.tol = tol
+        self.count = 0
+
+        self.qx = None
+        self.qy = None
+        self.a  = np.zeros((0, 0))
+        self.gx = np.zeros((0, 0))
+        self.gy = np.zeros((0, 0))
+
+        # first snapshot for the amplitudes, last one for the next pair:
+        self._first = None
+        self._last  = None
+
+    @property
+    def rank(self):
+        return 0 if self.qx is None else self.qx.shape[1]
+
+    def add_snapshot(self, x):
+        '''adds the snapshot x, of any shape, after the previous one'''
+        x = np.asarray(x, dtype=np.float64).ravel()
+
+        if self._last is None:
+            self._first = x
+        else:
+            self._update(self._last, x)
+
+        self._last = x
+        self.count += 1
+
+    def _update(self, x, y):
+        rx, ry = self.rank, 0 if self.qy is None else self.qy.shape[1]
+        self.qx = _expand_basis(self.qx, x, self.tol)
+        self.qy = _expand_basis(self.qy, y, self.tol)
+
+        # the new directions have no past snapshots:
+        nx, ny = self.qx.shape[1] - rx, self.qy.shape[1] - ry
+        self.a  = np.pad(self.a, ((0, ny), (0, nx)))
+        self.gx = np.pad(self.gx, ((0, nx), (0, nx)))
+        self.gy = np.pad(self.gy, ((0, ny), (0, ny)))
+
+        xt = np.dot(self.qx.T, x)
+        yt = np.dot(self.qy.T, y)
+
+        self.a  += np.outer(yt, xt)
+        self.gx += np.outer(xt, xt)
+        self.gy += np.outer(yt, yt)
+
+        # the new directions compete with the old ones once the pair is in:
+        if self.qx.shape[1] > self.maxRank:
+            v = _leading_eigvect(self.gx, self.maxRank)
+            self.qx = np.dot(self.qx, v)
+            self.a  = np.dot(self.a, v)
+            self.gx = np.dot(v.T, np.dot(self.gx, v))
+
+        if self.qy.shape[1] > self.maxRank:
+            v = _leading_eigvect(self.gy, self.maxRank)
+            self.qy = np.dot(self.qy, v)
+            self.a  = np.dot(v.T, self.a)
+            self.gy = np.dot(v.T, np.dot(self.gy, v))
+
+    def get_dmd(self):
+        '''
+        Output
+        ------
+            eigVals: (rank,) DMD eigenvalues
+            amplitudes: (rank,) amplitudes of the modes in the first snapshot
+            modes: (size of a snapshot, rank) complex DMD modes Qx W
+        '''
+
+        if self.count < 2:
+            raise ValueError('\n streaming DMD needs at least 2 snapshots ...')
+
+        # reduced operator Qx^T Qy A Gx^+ on the range of Gx, like the POD
+        # truncation of the exact DMD:
+        gxVals, gxVect = np.linalg.eigh(self.gx)
+        keep = gxVals > gxVals[-1]*self.gx.shape[0]*np.finfo(np.float64).eps
+        e = gxVect[:, keep]
+
+        qxy = np.dot(self.qx.T, self.qy)
+        k = np.dot(e.T, np.dot(qxy, np.dot(self.a, e)))/gxVals[keep]
+        eigVals, w = np.linalg.eig(k)
+
+        # modes in the basis Qx and amplitudes in the first snapshot:
+        w = np.dot(e, w)
+        amplitudes = np.linalg.lstsq(w, np.dot(self.qx.T, self._first), rcond=None)[0]
+        eigVals, amplitudes, w = _sort_by_amplitude(eigVals, amplitudes, w)
+
+        return eigVals, amplitudes, np.dot(self.qx, w)
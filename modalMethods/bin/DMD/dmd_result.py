@@ -0,0 +1,61 @@
+import numpy as np
+
+__all__=["DMDResult"]
+
+
+class DMDResult(object):
+    '''
+    Result of a DMD, exact or streaming.
+
+    Input
+    -----
+        coords: (nDim, nPts) coordinates of the DMD window
+        eigVals: (nModes,) complex DMD eigenvalues
+        amplitudes: (nModes,) complex amplitudes of the modes in the first
+                    snapshot
+        modes: (nDim, nPts, nModes) complex DMD modes
+        dt: time between two snapshots
+        patchName: name of the sampled surface
+        nSnaps: # of snapshots
+        method: 'exact' or 'streaming'
+    '''
+
+    __slots__ = ['coords', 'eigVals', 'amplitudes', 'modes', 'dt',
+                 'patchName', 'nSnaps', 'method']
+
+    def __init__(self, coords, eigVals, amplitudes, modes, dt, patchName,
+                 nSnaps, method='exact'):
+        self.coords     = np.asarray(coords)
+        self.eigVals    = eigVals
+        self.amplitudes = amplitudes
+        self.modes      = modes
+        self.dt         = dt
+        self.patchName  = patchName
+        self.nSnaps     = nSnaps
+        self.method     = method
+
+    @property
+    def nDim(self):
+        return self.coords.shape[0]
+
+    @property
+    def nPts(self):
+        return self.coords.shape[1]
+
+    @property
+    def nModes(self):
+        return self.eigVals.size
+
+    @property
+    def omega(self):
+        '''continuous-time eigenvalues log(eigVals)/dt'''
+        return np.log(self.eigVals.astype(np.complex128))/self.dt
+
+    @property
+    def frequencies(self):
+        '''frequencies of the modes in cycles per unit time'''
+        return self.omega.imag/(2*np.pi)
+
+    @property
+    def growthRates(self):
+        return self.omega.real
@@ -0,0 +1,86 @@
+import numpy as np
+import os
+import json
+from .dmd_result import *
+
+__all__=["write_dmd_store", "load_dmd_store"]
+
+_storeFormat  = 'modalMethods-dmd'
+_storeVersion = 1
+
+
+def write_dmd_store(storeDir, result):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+        result: DMDResult
+
+    Output
+    ------
+        writes coords.npy (nDim, nPts), modes.npy (nModes, nDim, nPts), with
+        every mode stored contiguously, eigVals.npy, amplitudes.npy and a
+        manifest.json with dt and the method
+    '''
+
+    os.makedirs(storeDir, exist_ok=True)
+
+    # the manifest is written last, a store without it is incomplete:
+    manifestFile = os.path.join(storeDir, 'manifest.json')
+    if os.path.exists(manifestFile):
+        os.remove(manifestFile)
+
+    np.save(os.path.join(storeDir, 'coords.npy'), result.coords)
+    np.save(os.path.join(storeDir, 'eigVals.npy'), result.eigVals)
+    np.save(os.path.join(storeDir, 'amplitudes.npy'), result.amplitudes)
+
+    modes = np.lib.format.open_memmap(os.path.join(storeDir, 'modes.npy'),
+                                      mode='w+', dtype=result.modes.dtype,
+                                      shape=(result.nModes, result.nDim,
+                                             result.nPts))
+    for k in range(result.nDim):
+        modes[:, k, :] = result.modes[k].T
+    modes.flush()
+    del modes
+
+    manifest = {'format': _storeFormat, 'version': _storeVersion,
+                'method': result.method, 'dt': float(result.dt),
+                'patchName': result.patchName, 'nSnaps': int(result.nSnaps),
+                'nDim': result.nDim, 'nPts': int(result.nPts),
+                'nModes': int(result.nModes),
+                'arrays': {'coords': 'coords.npy', 'modes': 'modes.npy',
+                           'eigVals': 'eigVals.npy',
+                           'amplitudes': 'amplitudes.npy'}}
+
+    tmpFile = manifestFile + '.tmp'
+    with open(tmpFile, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmpFile, manifestFile)
+
+
+def load_dmd_store(storeDir):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+
+    Output
+    ------
+        result: DMDResult with memory-mapped coordinates and modes
+    '''
+
+    with open(os.path.join(storeDir, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != _storeFormat:
+        raise ValueError('\n ' + storeDir + ' is not a DMD result store ...')
+
+    arrays = manifest['arrays']
+    coords = np.load(os.path.join(storeDir, arrays['coords']), mmap_mode='r')
+    modes  = np.load(os.path.join(storeDir, arrays['modes']), mmap_mode='r')
+    eigVals    = np.load(os.path.join(storeDir, arrays['eigVals']))
+    amplitudes = np.load(os.path.join(storeDir, arrays['amplitudes']))
+
+    return DMDResult(coords, eigVals, amplitudes, modes.transpose(1, 2, 0),
+                     manifest['dt'], manifest['patchName'], manifest['nSnaps'],
+                     manifest['method'])
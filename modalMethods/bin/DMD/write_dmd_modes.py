@@ -0,0 +1,82 @@
+import os
+import argparse
+from modalMethods.profiler import *
+from modalMethods.bin.POD.pod_store import *
+from .dmd_eval import *
+from .dmd_store import *
+
+
+def write_dmd_modes(result):
+    '''
+    Input
+    -----
+        result: DMDResult
+
+    Output
+    ------
+        writes the coordinates, DMD modes, eigenvalues and amplitudes in
+        postProcessing/DMD/<patchName>_<nSnaps>_<method> (3d_<nSnaps>_<method>
+        in 3d), the exact and streaming DMD do not overwrite each other
+    '''
+
+    with stage('write'):
+        print('\n writing DMD modes ...')
+        storeDir = get_store_dir(os.getcwd(), result.patchName, result.nSnaps,
+                                 result.nDim, 'DMD') + '_' + result.method
+        write_dmd_store(storeDir, result)
+
+    print('\n  mode   |amplitude|   frequency   growth rate')
+    for k in range( min(result.nModes, 10) ):
+        print('  %4d   %11.4e   %11.4e   %11.4e'
+              % (k, abs(result.amplitudes[k]), result.frequencies[k],
+                 result.growthRates[k]))
+
+
+def main(argv=None):
+    '''
+    Writes the DMD modes in the postProcessing directory
+    '''
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(
+            description="Write DMD modes, eigenvalues and amplitudes in \
+                         postProcessing/DMD. Modes are arranged in decreasing \
+                         amplitude order.")
+
+    parser.add_argument('-config',
+                        type=str,
+                        help='The config file',
+                        required=True)
+
+    parser.add_argument('-nWorkers', '--nWorkers',
+                        type=int,
+                        help='# of processes used to import the snapshots',
+                        default=None)
+
+    parser.add_argument('-profile', '--profile',
+                        type=str,
+                        help='write the time, memory and throughput of each \
+                              stage in this JSON file',
+                        default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.profile is None:
+        _run(args)
+        return
+
+    with profile() as profiler:
+        _run(args)
+
+    profiler.write_report(args.profile)
+    print('\n profile written in ' + args.profile)
+
+
+def _run(args):
+    with open(args.config, mode='r') as configFile:
+        result = get_dmd_result(configFile, args.nWorkers)
+
+    write_dmd_modes(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,16 @@
 import numpy as np
 import os
 import argparse
-from scipy.interpolate import griddata
-import matplotlib
-matplotlib.use('PDF')
-from matplotlib import pyplot as plt
-from matplotlib.path import Path
-import matplotlib.patches as patches
 from modalMethods.readers.reader_support_functions import *
 from modalMethods.readers.reader import *
+from .pod_store import *
+from .pod_interp import *
+from .pod_render import *
 
 __all__ = ['plot_setup']
 
-def plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps, points):
+def plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps, points,
+               result=None):
     '''
     Input
     -----
@@ -21,6 +19,7 @@ def plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps,
         nPltPts: # of plotting points in the smaller direction
         nSnaps: # of snap-shots to consider
         points: list of geometry coordinates
+        result: PODResult to plot, loaded from postProcessing/POD if None
     Output
     ------
         x1, x2: coordinates of the snap-shot window
@@ -29,40 +28,40 @@ def plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps,
         phi1, phi2: POD modes
         geometry: Path defining the geometry
     '''
+    from matplotlib.path import Path
 
-    print('\n importing data ...')
+    storeDir = get_store_dir(caseDir, patchName, nSnaps, 2)
+    if result is None and os.path.exists(storeDir + '/manifest.json'):
+        print('\n importing data ...')
+        result = load_pod_store(storeDir)
 
-    print('  - x1')
-    fname = caseDir + '/postProcessing/POD/x1_coord_' + patchName + '_' + \
-            str(nSnaps) + '.csv'
-    x1 = np.loadtxt(fname, delimiter=',')
+    if result is not None:
+        x1, x2, phi1, phi2 = result.x1, result.x2, result.phi1, result.phi2
 
-    print('  - x2')
-    fname = caseDir + '/postProcessing/POD/x2_coord_' + patchName + '_' + \
-            str(nSnaps) + '.csv'
-    x2 = np.loadtxt(fname, delimiter=',')
+    else:
+        print('\n importing data ...')
 
-    print('  - phi1')
-    fname = caseDir + '/postProcessing/POD/phi1_' + patchName + '_' + \
-            str(nSnaps) + '.csv'
-    phi1 = np.loadtxt(fname, delimiter=',')
+        print('  - x1')
+        fname = caseDir + '/postProcessing/POD/x1_coord_' + patchName + '_' + \
+                str(nSnaps) + '.csv'
+        x1 = np.loadtxt(fname, delimiter=',')
 
-    print('  - phi2')
-    fname = caseDir + '/postProcessing/POD/phi2_' + patchName + '_' + \
-            str(nSnaps) + '.csv'
-    phi2 = np.loadtxt(fname, delimiter=',')
+        print('  - x2')
+        fname = caseDir + '/postProcessing/POD/x2_coord_' + patchName + '_' + \
+                str(nSnaps) + '.csv'
+        x2 = np.loadtxt(fname, delimiter=',')
 
-    x1Plt = np.linspace(x1min, x1max, nPltPts)
-    x2Plt = np.linspace(x2min, x2max, nPltPts)
+        print('  - phi1')
+        fname = caseDir + '/postProcessing/POD/phi1_' + patchName + '_' + \
+                str(nSnaps) + '.csv'
+        phi1 = np.loadtxt(fname, delimiter=',')
 
-    samplePts = np.zeros((nPltPts*nPltPts, 2))
-    count = 0
+        print('  - phi2')
+        fname = caseDir + '/postProcessing/POD/phi2_' + patchName + '_' + \
+                str(nSnaps) + '.csv'
+        phi2 = np.loadtxt(fname, delimiter=',')
 
-    for i in range(nPltPts):
-        for j in range(nPltPts):
-            samplePts[count, 0] = x1Plt[j]
-            samplePts[count, 1] = x2Plt[i]
-            count += 1
+    samplePts = get_sample_points(x1min, x1max, x2min, x2max, nPltPts)
 
     # create the plot path:
     plotPath = [Path.MOVETO]
@@ -77,11 +76,65 @@ def plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps,
     return x1, x2, samplePts, nPltPts, phi1, phi2, geometry
 
 
-def pod_basic_plot(configFile):
+def _render_basic_plot(phiPlts, context, job):
+    '''saves the plot of mode context['modes'][i] in direction j, job = (i, j)'''
+    import matplotlib
+    matplotlib.use('PDF')
+    from matplotlib import pyplot as plt
+    import matplotlib.patches as patches
+
+    i, j = job
+    modes, direction = context['modes'], context['direction']
+    x1min, x1max, x2min, x2max = context['window']
+    nPltPts = context['nPltPts']
+
+    phiPlt = phiPlts[j, :, i].reshape(nPltPts, nPltPts)
+
+    # set before the figure is created, so every figure is rendered the same:
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
+
+    # generate plot:
+    fig = plt.figure(figsize=(13, 6))
+    ax = plt.gca()
+
+    patch = patches.PathPatch(context['geometry'], facecolor='black', lw=1)
+    ax.add_patch(patch)
+
+    im = plt.imshow(phiPlt, extent=(x1min, x1max, x2min, x2max),
+                    origin='lower', cmap='coolwarm', aspect=1)
+
+    plt.xlim(x1min, x1max)
+    plt.ylim(x2min, x2max)
+    plt.xticks(list( range(int(x1min), int(x1max)+1) ), fontsize=26)
+    plt.yticks(list( range(int(x2min), int(x2max)+1) ), fontsize=26)
+
+    cbar = plt.colorbar(im, fraction=0.03, pad=0.03, aspect=8.8)
+    cbar.set_label(r'$\phi_{' + direction[j] + '}^{(' + str(modes[i]) +
+                   ')}$', fontsize=20)
+    cbar.ax.tick_params(labelsize=18)
+    cbar.formatter.set_powerlimits((0,0))
+    cbar.ax.yaxis.set_offset_position('left')
+    cbar.ax.yaxis.get_offset_text().set(size=20)
+    cbar.update_ticks()
+
+    plt.xlabel(r'$x/H_{\rm{ramp}}$', fontsize=24)
+    plt.ylabel(r'$y/H_{\rm{ramp}}$', fontsize=24)
+
+    pltName = context['caseDir'] + '/postProcessing/POD/' + direction[j] + \
+              '_mode_' + str( modes[i] ) + '_' + context['patchName'] + '_' + \
+              str( context['nSnaps'] ) + '.pdf'
+    plt.savefig(pltName, metadata={'CreationDate': None})
+    plt.close(fig)
+
+
+def pod_basic_plot(configFile, result=None, nJobs=1):
     '''
     Input
     -----
         configFile: configuration file from "/constant/"
+        result: PODResult to plot, read from postProcessing/POD if None
+        nJobs: # of processes rendering the figures
     Output
     ------
         saves plots generated in /postProcessing/POD/"
@@ -105,63 +158,29 @@ def pod_basic_plot(configFile):
 
     # getting plotting info from configFile:
     x1, x2, samplePts, nPltPts, phi1, phi2, geometry = \
-    plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps, points)
+    plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps, points,
+               result)
 
     # directions to plot for:
     direction = [dir1, dir2]
 
-    print('\n plotting data ...')
-    for i in range( len( modes ) ):
-        for j in range( len( direction ) ):
-
-            if direction[j] == dir1:
-                phi = phi1
-            else:
-                phi = phi2
-
-            # interpolate data on a regular mesh:
-            phiTemp = griddata( (x1, x2), phi[:, modes[i]],
-                               samplePts, method='linear')
-            phiPlt = phiTemp.reshape(nPltPts, nPltPts)
-
-            # generate plot:
-            fig = plt.figure(figsize=(13, 6))
-            ax = plt.gca()
-
-            patch = patches.PathPatch(geometry, facecolor='black', lw=1)
-            ax.add_patch(patch)
-
-            plt.rc('text', usetex=True)
-            plt.rc('font', family='serif')
+    # interpolate all the modes on a regular mesh:
+    weights, outside = get_plot_weights(caseDir, patchName, nSnaps, x1, x2,
+                                        samplePts)
+    phiPlts = np.stack([interpolate_modes(weights, outside, phi, modes)
+                        for phi in [phi1, phi2]])
 
-            im = plt.imshow(phiPlt, extent=(x1min, x1max, x2min, x2max),
-                            origin='lower', cmap='coolwarm', aspect=1)
+    context = {'caseDir': caseDir, 'patchName': patchName, 'nSnaps': nSnaps,
+               'modes': modes, 'direction': direction, 'nPltPts': nPltPts,
+               'window': (x1min, x1max, x2min, x2max), 'geometry': geometry}
+    jobs = [(i, j) for i in range( len( modes ) ) for j in range( len( direction ) )]
 
-            plt.xlim(x1min, x1max)
-            plt.ylim(x2min, x2max)
-            plt.xticks(list( range(int(x1min), int(x1max)+1) ), fontsize=26)
-            plt.yticks(list( range(int(x2min), int(x2max)+1) ), fontsize=26)
-
-            cbar = plt.colorbar(im, fraction=0.03, pad=0.03, aspect=8.8)
-            cbar.set_label(r'$\phi_{' + direction[j] + '}^{(' + str(modes[i]) +
-                           ')}$', fontsize=20)
-            cbar.ax.tick_params(labelsize=18)
-            cbar.formatter.set_powerlimits((0,0))
-            cbar.ax.yaxis.set_offset_position('left')
-            cbar.ax.yaxis.get_offset_text().set(size=20)
-            cbar.update_ticks()
-
-            plt.xlabel(r'$x/H_{\rm{ramp}}$', fontsize=24)
-            plt.ylabel(r'$y/H_{\rm{ramp}}$', fontsize=24)
-
-            pltName = caseDir + '/postProcessing/POD/' + direction[j] + \
-                      '_mode_' + str( modes[i] ) + '_' + patchName + '_' + \
-                      str( nSnaps ) + '.pdf'
-            plt.savefig(pltName)
-            plt.close(fig)
+    print('\n plotting data ...')
+    render_figures(_render_basic_plot, phiPlts, context, jobs, nJobs,
+                   get_store_dir(caseDir, patchName, nSnaps, 2))
 
 
-def main():
+def main(argv=None):
     # Parse the command-line arguments
     parser = argparse.ArgumentParser(
             description="Save POD mode plots in postProcessing/POD.")
@@ -171,9 +190,14 @@ def main():
                         help='The config file',
                         required=True)
 
-    args = parser.parse_args()
+    parser.add_argument('-jobs', '--jobs',
+                        type=int,
+                        help='# of processes rendering the figures',
+                        default=1)
+
+    args = parser.parse_args(argv)
 
     # Parse the config
     configFile = open(args.config, mode='r')
 
-    pod_basic_plot(configFile)
+    pod_basic_plot(configFile, nJobs=args.jobs)
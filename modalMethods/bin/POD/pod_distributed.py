@@ -0,0 +1,313 @@
+import numpy as np
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from modalMethods.readers.reader_support_functions import *
+from modalMethods.profiler import *
+from .pod_kernels import *
+from .pod_kernels import _get_blocks
+from .pod_result import *
+
+__all__=["get_row_partition", "get_reduction_levels", "get_gram_slots",
+         "get_mpi_comm", "get_distributed_pod_result"]
+
+# state shared by every task of a worker process:
+_workerState = dict()
+
+
+def get_row_partition(nPts, nParts):
+    '''returns the (start, end) rows of nParts contiguous blocks of points'''
+    bounds = np.linspace(0, nPts, nParts + 1).astype(int)
+
+    return [(bounds[i], bounds[i+1]) for i in range(nParts)]
+
+
+def get_reduction_levels(nParts):
+    '''
+    returns the levels of a binary tree reduction of nParts partial results,
+    each a list of (i, j) pairs whose result j is added to result i; the
+    pairs of a level are independent and the total ends up in result 0
+    '''
+    levels = []
+    step = 1
+    while step < nParts:
+        levels.append([(i, i + step) for i in range(0, nParts - step, 2*step)])
+        step *= 2
+
+    return levels
+
+
+def get_gram_slots(nWorkers):
+    '''
+    returns the # of shared partial correlation matrices the worker
+    processes add their rows to, about log2(nWorkers) so that the memory of
+    the reduction stays a few nSnaps x nSnaps matrices
+    '''
+    return max(1, min(nWorkers, int( np.ceil(np.log2(max(nWorkers, 1))) )))
+
+
+def get_mpi_comm():
+    '''returns MPI.COMM_WORLD if mpi4py is installed and more than one rank runs'''
+    try:
+        from mpi4py import MPI
+    except ImportError:
+        return None
+
+    if MPI.COMM_WORLD.Get_size() < 2:
+        return None
+
+    return MPI.COMM_WORLD
+
+
+def _attach(name, shape, dtype):
+    shm = SharedMemory(name=name)
+    _workerState.setdefault('shm', []).append(shm)
+
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(names, locks, snapshotFile, shape, dtype, nSlots, nModes,
+                 indices, cols, cache, blockSize, blasThreads):
+    nComp, nPts, nSnaps = shape
+    uName, gramName, phiName = names
+
+    if snapshotFile is not None:
+        _workerState['u'] = open_snapshot_memmap(snapshotFile, shape, dtype)
+    else:
+        _workerState['u'] = _attach(uName, shape, dtype)
+
+    _workerState['gram'] = _attach(gramName, (nSlots, nSnaps, nSnaps), np.float64)
+    _workerState['locks'] = locks
+    _workerState['phi'] = _attach(phiName, (nComp, nPts, nModes), np.float64)
+
+    _workerState['indices'] = indices
+    _workerState['cols'] = cols
+    _workerState['cache'] = cache
+    _workerState['blockSize'] = blockSize
+    _workerState['blasThreads'] = blasThreads
+
+
+def _read_worker(jobs):
+    '''reads the (column, file name) snapshots of jobs into the shared matrix'''
+    u = _workerState['u']
+    for i, fname in jobs:
+        u[:, :, i] = read_snapshot(fname, _workerState['indices'],
+                                   _workerState['cols'], _workerState['cache'],
+                                   u.dtype)
+
+    return len(jobs)
+
+
+def _gram_worker(job):
+    '''
+    adds the upper triangle of the correlation matrix of the rows start:end
+    to the shared slot p % nSlots, one block of columns at a time: only a
+    (nSnaps, # of columns) block is computed outside the shared slots and
+    the slot is locked while the block is added
+    '''
+    p, start, end = job
+    u = _workerState['u']
+    gram   = _workerState['gram']
+    slot   = p % gram.shape[0]
+    nSnaps = u.shape[2]
+
+    # 64 MB blocks of columns and of points:
+    nCols = max(1, 2**23 // max(nSnaps, 1))
+    blockSize = _workerState['blockSize'] or max(1024, nCols)
+
+    with blas_threads(_workerState['blasThreads']):
+        for a, b in _get_blocks(nSnaps, nCols):
+            c = np.zeros((b, b - a))
+            for s, e in _get_blocks(end - start, blockSize):
+                for k in range(u.shape[0]):
+                    block = u[k, start + s:start + e, :b].astype(np.float64,
+                                                               copy=False)
+                    c += np.dot(block.T, block[:, a:b])
+
+            with _workerState['locks'][slot]:
+                gram[slot, :b, a:b] += c
+
+
+def _add_worker(job):
+    '''adds the partial correlation matrix j to i'''
+    i, j = job
+    gram = _workerState['gram']
+    gram[i] += gram[j]
+
+
+def _project_worker(job):
+    '''
+    projects the rows start:end on the eigenvectors, returns the squared
+    norm of the local part of each mode
+    '''
+    start, end, eigVect = job
+    u, phi = _workerState['u'], _workerState['phi']
+
+    with blas_threads(_workerState['blasThreads']):
+        for k in range(u.shape[0]):
+            phi[k, start:end] = np.dot(u[k, start:end], eigVect)
+
+    return np.sum( np.square(phi[:, start:end]), axis=(0, 1) )
+
+
+def get_distributed_pod_result(setup, coords, indices, nPts, snapshotFile=None):
+    '''
+    Input
+    -----
+        setup: output of get_pod_setup
+        coords: list of coordinate arrays in the POD window
+        indices: indices of the POD window points in the snapshot files
+        nPts: # of points in the POD window
+        snapshotFile: file of the out-of-core snapshot matrix, in shared
+                      memory if None
+
+    Output
+    ------
+        result: PODResult with the modes already projected, None on the
+                MPI ranks other than 0
+
+    The points are split in contiguous blocks of rows, one per worker
+    process (or MPI rank if mpi4py runs on more than one rank). Every
+    worker computes the correlation matrix of its rows, the partial
+    matrices are summed by a binary tree reduction, the eigenvectors are
+    computed once and every worker projects its own rows. The worker
+    processes add their rows to get_gram_slots(nWorkers) shared matrices
+    reduced by the tree, not to one matrix each.
+    '''
+
+    comm = get_mpi_comm()
+    if comm is not None:
+        return _get_mpi_pod_result(comm, setup, coords, indices, nPts)
+
+    nComp, nSnaps = setup['nDim'], setup['nSnaps']
+    nWorkers = max(1, setup['nWorkers'])
+    nModes   = min(setup['nModes'], nSnaps)
+    shape    = (nComp, nPts, nSnaps)
+    dtype    = setup['precision']
+    parts    = get_row_partition(nPts, nWorkers)
+    nSlots   = get_gram_slots(nWorkers)
+
+    with stage('listDirs'):
+        timeDirs = get_time_dirs(setup['filePath'], nSnaps,
+                                 setup['timeSelection'],
+                                 get_snapshot_field(setup['patchName'], nComp))
+        fnames = get_snapshot_files(setup['filePath'], setup['patchName'],
+                                    timeDirs, nComp)
+
+    if snapshotFile is not None:
+        # creates the file opened by the workers:
+        open_snapshot_memmap(snapshotFile, shape, dtype, mode='w+')
+        sizes = [0]
+    else:
+        sizes = [nComp*nPts*nSnaps*np.dtype(dtype).itemsize]
+    sizes += [nSlots*nSnaps*nSnaps*8, nComp*nPts*nModes*8]
+
+    shms = [SharedMemory(create=True, size=max(size, 1)) for size in sizes]
+
+    try:
+        names = [shm.name for shm in shms]
+        locks = [mp.Lock() for i in range(nSlots)]
+        initArgs = (names, locks, snapshotFile, shape, dtype, nSlots, nModes,
+                    indices, setup['cols'] if nComp == 2 else [0, 1, 2],
+                    setup['cache'], setup['blockSize'], setup['blasThreads'])
+
+        with mp.Pool(nWorkers, initializer=_init_worker, initargs=initArgs) as pool:
+            print('\n importing velocity snapshots ...')
+            with stage('readSnapshots'):
+                nChunks = min(nSnaps, 4*nWorkers)
+                jobs = [list(zip(chunk, [fnames[i] for i in chunk]))
+                        for chunk in np.array_split(np.arange(nSnaps), nChunks)]
+                pool.map(_read_worker, jobs)
+                add_snapshots(nSnaps)
+
+            with stage('gram'):
+                pool.map(_gram_worker, [(p, start, end)
+                                        for p, (start, end) in enumerate(parts)])
+                for level in get_reduction_levels(nSlots):
+                    pool.map(_add_worker, level)
+
+                gram = np.ndarray((nSlots, nSnaps, nSnaps), dtype=np.float64,
+                                  buffer=shms[1].buf)
+                c = (np.triu(gram[0]) + np.triu(gram[0], 1).T)/nSnaps
+                del gram
+
+            print('\n performing SVD ...')
+            with stage('eigen'), blas_threads(setup['blasThreads']):
+                singVals, eigVect = get_eigen_modes(c, nModes, setup['solver'])
+
+            with stage('projection'):
+                phiNorm = np.sqrt( np.sum(pool.map(_project_worker,
+                                   [(start, end, eigVect) for start, end in parts]),
+                                   axis=0) )
+
+                phi = np.ndarray((nComp, nPts, nModes), dtype=np.float64,
+                                 buffer=shms[2].buf)
+                modes = phi/phiNorm
+                del phi
+
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    return PODResult(coords, singVals, eigVect, None, setup['patchName'], nSnaps,
+                     snapshotFile=snapshotFile, modes=modes)
+
+
+def _get_mpi_pod_result(comm, setup, coords, indices, nPts):
+    '''distributed POD over the ranks of comm, see get_distributed_pod_result'''
+    from mpi4py import MPI
+
+    rank, size = comm.Get_rank(), comm.Get_size()
+    nComp, nSnaps = setup['nDim'], setup['nSnaps']
+    nModes = min(setup['nModes'], nSnaps)
+    cols   = setup['cols'] if nComp == 2 else [0, 1, 2]
+    start, end = get_row_partition(nPts, size)[rank]
+
+    with stage('listDirs'):
+        timeDirs = get_time_dirs(setup['filePath'], nSnaps,
+                                 setup['timeSelection'],
+                                 get_snapshot_field(setup['patchName'], nComp))
+        fnames = get_snapshot_files(setup['filePath'], setup['patchName'],
+                                    timeDirs, nComp)
+
+    # every rank reads its own rows of the snapshots:
+    with stage('readSnapshots'):
+        u = np.zeros((nComp, end - start, nSnaps), dtype=setup['precision'])
+        for i, fname in enumerate(fnames):
+            u[:, :, i] = read_snapshot(fname, indices[start:end], cols,
+                                       setup['cache'], u.dtype)
+        add_snapshots(nSnaps)
+
+    with stage('gram'), blas_threads(setup['blasThreads']):
+        c = np.ascontiguousarray( get_correlation_matrix(u, setup['blockSize']) )
+
+        # binary tree reduction to rank 0:
+        for level in get_reduction_levels(size):
+            for i, j in level:
+                if rank == i:
+                    cj = np.empty_like(c)
+                    comm.Recv(cj, source=j, tag=0)
+                    c += cj
+                elif rank == j:
+                    comm.Send(c, dest=i, tag=0)
+
+    if rank == 0:
+        print('\n performing SVD ...')
+        with stage('eigen'), blas_threads(setup['blasThreads']):
+            singVals, eigVect = get_eigen_modes(c/nSnaps, nModes, setup['solver'])
+    else:
+        singVals, eigVect = None, None
+    singVals, eigVect = comm.bcast((singVals, eigVect), root=0)
+
+    with stage('projection'), blas_threads(setup['blasThreads']):
+        phi = np.stack([np.dot(u[k], eigVect) for k in range(nComp)])
+        phiNorm = np.sqrt( comm.allreduce(np.sum(np.square(phi), axis=(0, 1)),
+                                          op=MPI.SUM) )
+        phi /= phiNorm
+        phi = comm.gather(phi, root=0)
+
+    if rank != 0:
+        return None
+
+    return PODResult(coords, singVals, eigVect, None, setup['patchName'], nSnaps,
+                     modes=np.concatenate(phi, axis=1))
@@ -1,38 +1,47 @@
 import os
 import argparse
 import numpy as np
-import matplotlib
-matplotlib.use('PDF')
-from matplotlib import pyplot as plt
 from modalMethods.readers.reader import *
+from .pod_store import *
 
 
-def pod_energy_plot(configFile):
+def pod_energy_plot(configFile, result=None):
     '''
     Input
     -----
         configFile: file with input details
+        result: PODResult to plot, read from postProcessing/POD if None
     Output
     ------
         saves a plot of energy v/s modes
     '''
+    import matplotlib
+    matplotlib.use('PDF')
+    from matplotlib import pyplot as plt
 
     configDict, _, _ = config_to_dict(configFile)
 
     # read data from configDict:
     patchName = configDict['patchName']
     nSnaps    = int( configDict['nSnaps'] )
+    nDim      = int( configDict['nDim'] )
 
     caseDir = os.getcwd();
-    fname = caseDir + '/postProcessing/POD/singVals_' + patchName + '_' + \
-            str( nSnaps ) + '.csv'
-    singVals = np.loadtxt(fname)
+    storeDir = get_store_dir(caseDir, patchName, nSnaps, nDim)
+    if result is None and os.path.exists(storeDir + '/manifest.json'):
+        result = load_pod_store(storeDir)
+
+    if result is not None:
+        singVals = result.singVals
+    else:
+        fname = caseDir + '/postProcessing/POD/singVals_' + patchName + '_' + \
+                str( nSnaps ) + '.csv'
+        singVals = np.loadtxt(fname)
 
     totalEnergy = np.sum( singVals[1:] )
     perEnergy = singVals[1:]*(100/totalEnergy)
 
-    modes = np.linspace(1, nSnaps-1, nSnaps-1)
-    modes.astype(int)
+    modes = np.arange(1, singVals.size)
 
     print('\n plotting energy ...')
 
@@ -56,7 +65,7 @@ def pod_energy_plot(configFile):
     plt.close(fig)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
             description="Save energy v/s modes plot in postProcessing/POD.")
 
@@ -65,7 +74,7 @@ def main():
                         help='The config file',
                         required=True)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Parse the config
     configFile = open(args.config, mode='r')
@@ -1,109 +1,335 @@
 import numpy as np
 import os
+import multiprocessing as mp
+from collections import deque
 from modalMethods.readers.reader_support_functions import *
 from modalMethods.readers.reader import *
+from modalMethods.readers.parse_cache import *
+from modalMethods.readers.decomposed import *
+from modalMethods.readers.parallel_reader import *
+from modalMethods.profiler import *
+from .pod_kernels import *
+from .pod_result import *
+from .pod_distributed import *
 
-__all__=["get_modes", "get_normal_phi"]
+__all__=["get_pod_setup", "read_window_points", "get_snapshot_file",
+         "read_snapshot_matrix", "iter_snapshots", "get_pod_result",
+         "get_modes", "get_normal_phi"]
 
-def get_modes(configFile):
+# state shared by every task of a worker process:
+_workerState = dict()
+
+
+def get_pod_setup(configDict, nWorkers=None):
     '''
     Input
     -----
-        configFile: path of configuration file
+        configDict: dictionary of the config file entries
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
 
     Output
     ------
-        phi1: POD modes in direction 1
-        phi2: POD modes in direction 2
-        singVals: singular values
+        setup: dictionary with the POD window, the snapshot files location
+               and the import options
     '''
 
-    [configDict, modes, points] = config_to_dict(configFile)
+    setup = dict()
 
     # read data from configDict:
     filePath  = os.getcwd()
-    patchName = configDict["patchName"]
-    nSnaps    = int( configDict["nSnaps"] )
-    nModes    = int( configDict["nModes"] )
-    nDim      = int( configDict['nDim'] ) 
+    setup['caseDir']   = filePath
+    setup['patchName'] = configDict["patchName"]
+    setup['nSnaps']    = int( configDict["nSnaps"] )
+    setup['nModes']    = int( configDict["nModes"] )
+    setup['nDim']      = nDim = int( configDict['nDim'] ) 
+
+    if nWorkers is None:
+        nWorkers = int( configDict.get('nWorkers', 1) )
+    setup['nWorkers'] = nWorkers
+
+    # cache of parsed files in postProcessing/POD/.cache:
+    if configDict.get('parseCache', 'yes') == 'no':
+        setup['cache'] = None
+    else:
+        cacheSize = float( configDict.get('cacheSize', 10240) )*1024**2
+        setup['cache'] = get_parse_cache(filePath, cacheSize)
 
     if nDim == 2:
-        filePath  = filePath + '/postProcessing/cuttingPlane'
-        dir1      = configDict["direction1"]
-        dir2      = configDict["direction2"]
+        filePath = filePath + '/postProcessing/cuttingPlane'
+
+        # columns to read based on POD window:
+        setup['cols'] = get_columns(configDict["direction1"],
+                                    configDict["direction2"])
+
+    elif nDim == 3:
+        setup['cols'] = None
+
+    else:
+        raise ValueError('Oops! Number of dimensions not defined ...')
+
+    setup['filePath'] = filePath
 
     # region of interest:
     minX, maxX = dict(), dict()
-    minX['x1'] = float( configDict["x1min"] )
-    minX['x2'] = float( configDict["x2min"] )
-
-    maxX['x1'] = float( configDict["x1max"] )
-    maxX['x2'] = float( configDict["x2max"] )
+    for i in range(nDim):
+        x = 'x' + str(i+1)
+        minX[x] = float( configDict[x + 'min'] )
+        maxX[x] = float( configDict[x + 'max'] )
 
-    if nDim == 3:
-        minX['x3'] = float( configDict['x3min'] )
-        maxX['x3'] = float( configDict['x3max'] )
+    setup['minX'], setup['maxX'] = minX, maxX
+    setup['roi'] = configDict.get('roi')
 
     # non-dim parameter:
-    h = float( configDict['h'] )
+    setup['h'] = float( configDict['h'] )
 
-    # a container for velocity vectors:
-    uDict = dict()
+    # storage precision of the snapshots, the correlation matrix is always
+    # accumulated in double precision:
+    setup['precision'] = np.dtype( configDict.get('precision', 'float64') )
+    if setup['precision'] not in (np.float32, np.float64):
+        raise ValueError('\n precision should be float32 or float64 ...')
 
-    if nDim == 2:
-        # columns to read based on POD window:
-        cols = get_columns(dir1, dir2)
-
-        [x1, x2, indices, nPts] = read_points_from_foamFile(filePath, nSnaps, 
-                                                            patchName, minX, maxX, h, 
-                                                            nDim, cols)
-        [u1, u2] = read_velocity_from_foamFile(filePath, patchName, indices, 
-                                               nSnaps, nPts, nDim, cols)
-        
-        c1 = np.dot(u1.T, u1)
-        c2 = np.dot(u2.T, u2)
-        c = np.add(c1, c2)/nSnaps
+    # eigensolver of the correlation matrix:
+    setup['solver'] = configDict.get('solver', 'svd')
 
-        print('\n performing SVD ...')
-        eigVect, singVals, _ = np.linalg.svd(c)
+    # # of BLAS threads, BLAS default if 0:
+    setup['blasThreads'] = int( configDict.get('blasThreads', 0) )
 
-        uDict['u1'], uDict['u2'] = u1, u2
-        phi1, phi2 = get_normal_phi(uDict, eigVect, nSnaps, nPts)
+    # out-of-core snapshot matrix:
+    setup['outOfCore'] = configDict.get('outOfCore', 'no') == 'yes'
+    setup['blockSize'] = int( configDict.get('blockSize', 0) ) or None
+    if setup['outOfCore'] and setup['blockSize'] is None:
+        setup['blockSize'] = 65536
 
-        singVals = np.delete(singVals, np.s_[nModes::])
-        phi1     = np.delete(phi1, np.s_[nModes::], 1)
-        phi2     = np.delete(phi2, np.s_[nModes::], 1)
+    # row-partitioned POD over the worker processes or MPI ranks:
+    setup['distributed'] = configDict.get('distributed', 'no') == 'yes'
 
-        return x1, x2, phi1, phi2, singVals, patchName, nSnaps
+    # snapshots: the last nSnaps time directories of the time range, every
+    # timeStride-th one:
+    setup['timeSelection'] = dict()
+    for key in ['timeStart', 'timeEnd']:
+        if key in configDict:
+            setup['timeSelection'][key] = float( configDict[key] )
+    if 'timeStride' in configDict:
+        setup['timeSelection']['stride'] = int( configDict['timeStride'] )
 
-    elif nDim == 3:
-        [x1, x2, x3, indices, nPts] = read_points_from_foamFile(filePath, nSnaps, 
-                                                                patchName, minX, maxX, 
-                                                                h, nDim)
+    # fields read from the processorN directories of a decomposed case:
+    setup['decomposed'] = configDict.get('decomposed', 'no') == 'yes'
+    if setup['decomposed'] and setup['distributed']:
+        raise ValueError('\n distributed POD of decomposed cases is not supported ...')
 
-        [u1, u2, u3] = read_velocity_from_foamFile(filePath, patchName, indices, 
-                                                   nSnaps, nPts, nDim)
+    return setup
 
-        c1 = np.dot(u1.T, u1)
-        c2 = np.dot(u2.T, u2)
-        c3 = np.dot(u3.T, u3)
-        c = np.add(np.add(c1, c2), c3)/nSnaps
 
-        print('\n performing SVD ...')
-        eigVect, singVals, _ = np.linalg.svd(c)
+def read_window_points(setup):
+    '''
+    Input
+    -----
+        setup: output of get_pod_setup
+
+    Output
+    ------
+        coords: list of coordinate arrays x1, x2(, x3) in the POD window
+        indices: list of indices in the POD window, the read plan of the
+                 subdomains for decomposed cases (see read_decomposed_points)
+        nPts: # of points in the POD window
+    '''
 
-        uDict['u1'], uDict['u2'], uDict['u3'] = u1, u2, u3
-        phi1, phi2, phi3 = get_normal_phi(uDict, eigVect, nSnaps, nPts)
+    if setup['decomposed']:
+        out = read_decomposed_points(setup['filePath'], setup['nSnaps'],
+                                     setup['minX'], setup['maxX'], setup['h'],
+                                     setup['nDim'], setup['cache'], setup['roi'],
+                                     setup['nWorkers'], setup['timeSelection'])
 
-        singVals = np.delete(singVals, np.s_[nModes::])
-        phi1     = np.delete(phi1, np.s_[nModes::], 1)
-        phi2     = np.delete(phi2, np.s_[nModes::], 1)
-        phi3     = np.delete(phi3, np.s_[nModes::], 1)
+        return list(out[:-2]), out[-2], out[-1]
 
-        return x1, x2, x3, phi1, phi2, phi3, singVals, patchName, nSnaps
+    out = read_points_from_foamFile(setup['filePath'], setup['nSnaps'],
+                                    setup['patchName'], setup['minX'],
+                                    setup['maxX'], setup['h'], setup['nDim'],
+                                    setup['cols'], setup['cache'], setup['roi'],
+                                    setup['timeSelection'])
 
+    return list(out[:-2]), out[-2], out[-1]
+
+
+def get_snapshot_file(setup, method='POD'):
+    '''
+    Returns the file of the out-of-core snapshot matrix in
+    postProcessing/<method>, None if the snapshots are kept in memory
+    '''
+
+    if not setup['outOfCore']:
+        return None
+
+    outDir = setup['caseDir'] + '/postProcessing/' + method
+    os.makedirs(outDir, exist_ok=True)
+
+    return outDir + '/.snapshots_' + setup['patchName'] + '_' + \
+           str(setup['nSnaps']) + '.dat'
+
+
+def read_snapshot_matrix(setup, indices, nPts, snapshotFile=None):
+    '''
+    Input
+    -----
+        setup: output of get_pod_setup
+        indices: output of read_window_points
+        nPts: # of points in the POD window
+        snapshotFile: file of the out-of-core snapshot matrix, in memory
+                      if None
+
+    Output
+    ------
+        u: (nDim, nPts, nSnaps) snapshot matrix
+    '''
+
+    nSnaps, nDim = setup['nSnaps'], setup['nDim']
+
+    if snapshotFile is not None:
+        u = open_snapshot_memmap(snapshotFile, (nDim, nPts, nSnaps),
+                                 setup['precision'], mode='w+')
+    elif setup['nWorkers'] > 1:
+        # the worker processes read straight into shared memory:
+        u = get_shared_array((nDim, nPts, nSnaps), setup['precision'])
     else:
-        raise ValueError('Oops! Number of dimensions not defined ...')
+        u = np.zeros((nDim, nPts, nSnaps), dtype=setup['precision'])
+
+    if setup['decomposed']:
+        read_decomposed_velocity(indices, nSnaps, u, setup['nWorkers'],
+                                 setup['cache'], setup['timeSelection'])
+    else:
+        read_velocity_from_foamFile(setup['filePath'], setup['patchName'], indices,
+                                    nSnaps, nPts, nDim, setup['cols'],
+                                    setup['nWorkers'], setup['cache'], out=u,
+                                    timeSelection=setup['timeSelection'])
+
+    return u
+
+
+def _read_time(t, setup, indices, nPts):
+    '''returns the (nDim, nPts) snapshot of the time directory t'''
+    nDim, cache = setup['nDim'], setup['cache']
+
+    if setup['decomposed']:
+        x = np.empty((nDim, nPts))
+        for procDir, localIdx, rows in indices:
+            x[:, rows] = read_snapshot(os.path.join(procDir, str(t), 'U'),
+                                       localIdx, [0, 1, 2], cache)
+        return x
+
+    fname = get_snapshot_files(setup['filePath'], setup['patchName'], [t], nDim)[0]
+    cols = setup['cols'] if nDim == 2 else [0, 1, 2]
+
+    return read_snapshot(fname, indices, cols, cache)
+
+
+def _init_worker(setup, indices, nPts):
+    _workerState['args'] = (setup, indices, nPts)
+
+
+def _read_worker(t):
+    return _read_time(t, *_workerState['args'])
+
+
+def iter_snapshots(setup, indices, nPts, timeDirs):
+    '''
+    Input
+    -----
+        setup: output of get_pod_setup
+        indices: output of read_window_points
+        nPts: # of points in the window
+        timeDirs: time directories to read
+
+    Output
+    ------
+        yields the (nDim, nPts) snapshots in time order; with nWorkers > 1
+        the next 2*nWorkers snapshots at most are read by the worker
+        processes meanwhile
+    '''
+
+    nWorkers = setup['nWorkers']
+    if nWorkers <= 1:
+        for t in timeDirs:
+            yield _read_time(t, setup, indices, nPts)
+        return
+
+    with mp.Pool(nWorkers, initializer=_init_worker,
+                 initargs=(setup, indices, nPts)) as pool:
+        # the next read is only submitted once a snapshot is consumed, the
+        # memory does not depend on the # of snapshots:
+        pending = deque()
+        for t in timeDirs:
+            if len(pending) == 2*nWorkers:
+                yield pending.popleft().get()
+            pending.append( pool.apply_async(_read_worker, (t,)) )
+
+        while pending:
+            yield pending.popleft().get()
+
+
+def get_pod_result(configFile, nWorkers=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        result: PODResult, the modes are projected when first accessed;
+                None on the MPI ranks other than 0 of a distributed POD
+    '''
+
+    [configDict, modes, points] = config_to_dict(configFile)
+    setup = get_pod_setup(configDict, nWorkers)
+
+    patchName, nSnaps = setup['patchName'], setup['nSnaps']
+    blockSize = setup['blockSize']
+
+    coords, indices, nPts = read_window_points(setup)
+
+    snapshotFile = get_snapshot_file(setup)
+
+    if setup['distributed'] and (setup['nWorkers'] > 1 or get_mpi_comm() is not None):
+        return get_distributed_pod_result(setup, coords, indices, nPts,
+                                          snapshotFile)
+
+    u = read_snapshot_matrix(setup, indices, nPts, snapshotFile)
+
+    with blas_threads(setup['blasThreads']):
+        with stage('gram'):
+            c = get_correlation_matrix(u, blockSize)/nSnaps
+
+        print('\n performing SVD ...')
+        with stage('eigen'):
+            singVals, eigVect = get_eigen_modes(c, setup['nModes'], setup['solver'])
+
+    return PODResult(coords, singVals, eigVect, u, patchName, nSnaps,
+                     blockSize, snapshotFile, setup['blasThreads'])
+
+
+def get_modes(configFile, nWorkers=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        phi1: POD modes in direction 1
+        phi2: POD modes in direction 2
+        singVals: singular values
+    '''
+
+    result = get_pod_result(configFile, nWorkers)
+    if result is None:
+        return None
+    result.close()
+
+    return result.as_tuple()
 
 
 def get_normal_phi(uDict, eigVect, nSnaps, nPts):
@@ -120,32 +346,6 @@ def get_normal_phi(uDict, eigVect, nSnaps, nPts):
         phi1, phi2: normalized POD modes in direction 1, 2
     '''
 
-    u1, u2 = uDict['u1'], uDict['u2']
-    phi1   = np.dot(u1, eigVect)
-    phi2   = np.dot(u2, eigVect)
-    
-    if len(uDict) == 2:
-        phiNorm = np.sum( np.square(phi1) + np.square(phi2), axis=0)
-
-    elif len(uDict) == 3:
-        u3   = uDict['u3']
-        phi3 = np.dot(u3, eigVect)
-        phiNorm = np.sum( np.square(phi1) + np.square(phi2) + np.square(phi3), axis=0)
-
-    phiNorm = np.sqrt( phiNorm )
-
-    if len(uDict) == 2:
-        for j in range(nSnaps):
-            phi1[:, j] = np.divide(phi1[:, j], phiNorm[j])
-            phi2[:, j] = np.divide(phi2[:, j], phiNorm[j])
-
-            return phi1, phi2
-            
-    elif len(uDict) == 3:
-        for j in range(nSnaps):
-            phi1[:, j] = np.divide(phi1[:, j], phiNorm[j])
-            phi2[:, j] = np.divide(phi2[:, j], phiNorm[j])
-            phi3[:, j] = np.divide(phi3[:, j], phiNorm[j])
-
-            return phi1, phi2, phi3
+    u = [uDict['u' + str(k+1)] for k in range(len(uDict))]
 
+    return tuple( get_projected_modes(u, eigVect) )
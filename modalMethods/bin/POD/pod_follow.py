@@ -0,0 +1,203 @@
+import numpy as np
+import time
+from modalMethods.readers.reader_support_functions import *
+from modalMethods.readers.time_catalog import *
+from modalMethods.readers.reader import *
+from modalMethods.readers.parallel_reader import *
+from modalMethods.readers.decomposed import *
+from .pod_eval import *
+from .pod_eval import _read_time
+from .pod_kernels import *
+from .pod_kernels import _get_blocks
+
+__all__=["IncrementalPOD", "follow_modes"]
+
+
+class IncrementalPOD(object):
+    '''
+    Snapshot POD over a sliding window of the last nSnaps snapshots. The
+    snapshot Gram matrix is updated with one bordered row/column per new
+    snapshot instead of being rebuilt from scratch, in blocks of blockSize
+    points promoted to float64 (64 MB blocks if None).
+    '''
+
+    def __init__(self, nComp, nPts, nSnaps, dtype=np.float64, blockSize=None):
+        self.nSnaps = nSnaps
+        self.count  = 0
+        self.blockSize = blockSize or max(1024, 2**23 // max(nSnaps, 1))
+
+        # ring buffer of snapshots, the Gram matrix is in buffer order:
+        self.u = np.zeros((nComp, nPts, nSnaps), dtype=dtype)
+        self.g = np.zeros((nSnaps, nSnaps))
+
+    @property
+    def nFilled(self):
+        return min(self.count, self.nSnaps)
+
+    def add_snapshot(self, snapshot):
+        '''
+        Input
+        -----
+            snapshot: (nComp, nPts) velocity in the POD window, replaces the
+                      oldest snapshot once the window is full
+        '''
+
+        slot = self.count % self.nSnaps
+        self.u[:, :, slot] = snapshot
+
+        # bordered update of the Gram matrix:
+        n = min(self.count + 1, self.nSnaps)
+        border = np.zeros(n)
+        for start, end in _get_blocks(self.u.shape[1], self.blockSize):
+            for k in range(self.u.shape[0]):
+                block = self.u[k, start:end]
+                border += np.dot(block[:, :n].T.astype(np.float64, copy=False),
+                                 block[:, slot].astype(np.float64, copy=False))
+
+        self.g[slot, :n] = border
+        self.g[:n, slot] = border
+        self.count += 1
+
+    def get_modes(self, nModes, solver='eigh'):
+        '''
+        Input
+        -----
+            nModes: # of modes to compute
+            solver: eigensolver of the correlation matrix, see get_eigen_modes
+
+        Output
+        ------
+            phi: (nComp, nPts, nModes) normalized POD modes
+            singVals: eigenvalues of the correlation matrix
+        '''
+
+        n = self.nFilled
+        eigVals, eigVect = get_eigen_modes(self.g[:n, :n]/n, nModes, solver)
+
+        phi = get_projected_modes(self.u[:, :, :n], eigVect)
+
+        return phi, eigVals
+
+
+def list_time_dirs(filePath, timeSelection=None, field=None):
+    '''
+    Returns the time directories in filePath in increasing time order,
+    among those selected by timeSelection and holding the file field (see
+    get_time_dirs), the latest time directory is scanned again in case it
+    was still being written
+    '''
+
+    catalog = get_time_catalog(filePath)
+    catalog.refresh(latest=True)
+
+    return list( catalog.select(None, field=field, **(timeSelection or {})) )
+
+
+def follow_modes(configFile, writeModes, nWorkers=None, interval=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file
+        writeModes: function called with the output of get_modes and nDim
+                    every time the modes are updated
+        nWorkers: # of processes used to import the initial snapshots
+        interval: minimum time in seconds between two updates of the modes,
+                  overrides the 'followInterval' entry of the config file
+
+    Output
+    ------
+        watches the case for new time directories until interrupted, or
+        until none appeared for 'followTimeout' seconds
+    '''
+
+    [configDict, modes, points] = config_to_dict(configFile)
+    setup = get_pod_setup(configDict, nWorkers)
+
+    filePath, patchName = setup['filePath'], setup['patchName']
+    nSnaps, nDim = setup['nSnaps'], setup['nDim']
+    cols = setup['cols'] if nDim == 2 else [0, 1, 2]
+
+    if interval is None:
+        interval = float( configDict.get('followInterval', 60) )
+    pollTime = float( configDict.get('followPoll', 5) )
+    timeout  = float( configDict.get('followTimeout', 0) )
+
+    # a running case may have fewer than nSnaps time directories yet:
+    coords, indices, nPts = read_window_points(dict(setup, nSnaps=None))
+    pod = IncrementalPOD(nDim, nPts, nSnaps, setup['precision'],
+                         setup['blockSize'])
+
+    # time directories of a decomposed case are listed in processor0:
+    timePath = filePath
+    if setup['decomposed']:
+        timePath = get_processor_dirs(filePath)[0]
+    field = get_snapshot_field(patchName, nDim)
+
+    # start from the last nSnaps existing time directories:
+    timeDirs = list_time_dirs(timePath, setup['timeSelection'], field)[-nSnaps:]
+    u = np.zeros((nDim, nPts, len(timeDirs)), dtype=setup['precision'])
+    fnames = get_snapshot_files(filePath, patchName, timeDirs, nDim)
+    print('\n importing velocity snapshots ...')
+    if setup['decomposed']:
+        for i, x in enumerate( iter_snapshots(setup, indices, nPts, timeDirs) ):
+            u[:, :, i] = x
+    elif setup['nWorkers'] > 1:
+        read_snapshots_parallel(fnames, indices, cols, u, setup['nWorkers'],
+                                setup['cache'])
+    else:
+        for i in range( len(fnames) ):
+            u[:, :, i] = read_snapshot(fnames[i], indices, cols, setup['cache'],
+                                       u.dtype)
+
+    pod.u[:, :, :len(timeDirs)] = u
+    pod.g[:len(timeDirs), :len(timeDirs)] = get_correlation_matrix(u)
+    pod.count = len(timeDirs)
+    del u
+
+    latest = float(timeDirs[-1]) if timeDirs else -np.inf
+    nNew, lastWrite, lastNew = pod.count, -np.inf, time.time()
+
+    print('\n following ' + timePath + ' ...')
+    try:
+        while True:
+            if nNew > 0 and time.time() - lastWrite >= interval:
+                phi, singVals = pod.get_modes(setup['nModes'], setup['solver'])
+                writeModes(tuple(coords) + tuple(phi) +
+                           (singVals, patchName, nSnaps), nDim)
+                print(' modes updated with ' + str(pod.nFilled) +
+                      ' snapshots up to time ' + str(latest))
+                nNew, lastWrite = 0, time.time()
+
+            if timeout > 0 and time.time() - lastNew > timeout:
+                break
+
+            time.sleep(pollTime)
+
+            for t in list_time_dirs(timePath, setup['timeSelection'], field):
+                if float(t) <= latest:
+                    continue
+
+                fname = get_snapshot_files(filePath, patchName, [t], nDim)[0]
+
+                # the time directory may still be being written:
+                try:
+                    if setup['decomposed']:
+                        snapshot = _read_time(t, dict(setup, cache=None),
+                                              indices, nPts)
+                    else:
+                        snapshot = read_snapshot(fname, indices, cols, None,
+                                                 setup['precision'])
+                except (OSError, ValueError):
+                    break
+
+                pod.add_snapshot(snapshot)
+                latest, lastNew = float(t), time.time()
+                nNew += 1
+
+    except KeyboardInterrupt:
+        pass
+
+    if nNew > 0:
+        phi, singVals = pod.get_modes(setup['nModes'], setup['solver'])
+        writeModes(tuple(coords) + tuple(phi) + (singVals, patchName, nSnaps),
+                   nDim)
@@ -0,0 +1,128 @@
+import numpy as np
+import os
+import hashlib
+from .pod_store import *
+
+__all__=["get_sample_points", "get_interp_weights", "get_plot_weights", "interpolate_modes"]
+
+
+def get_sample_points(x1min, x1max, x2min, x2max, nPltPts):
+    '''
+    Input
+    -----
+        x1min, x2min, x1max, x2max: coordinates of the plotting window
+        nPltPts: # of plotting points in each direction
+
+    Output
+    ------
+        samplePts: (nPltPts*nPltPts, 2) coordinates of the uniform plotting
+                   mesh, x1 varying fastest
+    '''
+
+    x1Plt, x2Plt = np.meshgrid(np.linspace(x1min, x1max, nPltPts),
+                               np.linspace(x2min, x2max, nPltPts))
+
+    return np.column_stack((x1Plt.ravel(), x2Plt.ravel()))
+
+
+def get_interp_weights(x1, x2, samplePts):
+    '''
+    Input
+    -----
+        x1, x2: coordinates of the POD window
+        samplePts: (nSample, 2) coordinates of the plotting mesh
+
+    Output
+    ------
+        weights: (nSample, nPts) sparse matrix of the barycentric weights of
+                 the Delaunay triangle containing each sample point, the
+                 same linear interpolation as griddata
+        outside: (nSample,) mask of the sample points outside the convex hull
+    '''
+    from scipy.spatial import Delaunay
+    from scipy.sparse import csr_matrix
+
+    tri = Delaunay(np.column_stack((x1, x2)))
+
+    simplex = tri.find_simplex(samplePts)
+    outside = simplex < 0
+    simplex[outside] = 0
+
+    # barycentric coordinates from the affine transform of each triangle:
+    trans = tri.transform[simplex]
+    bary  = np.einsum('ijk,ik->ij', trans[:, :2], samplePts - trans[:, 2])
+    bary  = np.column_stack((bary, 1 - bary.sum(axis=1)))
+    bary[outside] = 0
+
+    nSample = samplePts.shape[0]
+    indptr  = np.arange(0, 3*nSample + 1, 3)
+    weights = csr_matrix((bary.ravel(), tri.simplices[simplex].ravel(), indptr),
+                         shape=(nSample, len(x1)))
+    weights.eliminate_zeros()
+
+    return weights, outside
+
+
+def get_plot_weights(caseDir, patchName, nSnaps, x1, x2, samplePts):
+    '''
+    Input
+    -----
+        caseDir: case directory path
+        patchName: name of the sampled surface
+        nSnaps: # of snap-shots
+        x1, x2: coordinates of the POD window
+        samplePts: (nSample, 2) coordinates of the plotting mesh
+
+    Output
+    ------
+        weights, outside: see get_interp_weights, read from the
+                          interp_weights.npz file next to the POD results
+                          when it matches the window and plotting mesh
+    '''
+    from scipy.sparse import csr_matrix
+
+    sha = hashlib.sha1()
+    for arr in [x1, x2, samplePts]:
+        sha.update(np.ascontiguousarray(arr, dtype=np.float64).tobytes())
+    key = sha.hexdigest()
+
+    storeDir = get_store_dir(caseDir, patchName, nSnaps, 2)
+    fname = os.path.join(storeDir, 'interp_weights.npz')
+
+    if os.path.exists(fname):
+        with np.load(fname) as f:
+            if str(f['key']) == key:
+                weights = csr_matrix((f['data'], f['indices'], f['indptr']),
+                                     shape=tuple(f['shape']))
+                return weights, f['outside']
+
+    print('\n computing interpolation weights ...')
+    weights, outside = get_interp_weights(x1, x2, samplePts)
+
+    os.makedirs(storeDir, exist_ok=True)
+    tmpFile = fname + '.tmp.npz'
+    np.savez(tmpFile, key=key, data=weights.data, indices=weights.indices,
+             indptr=weights.indptr, shape=weights.shape, outside=outside)
+    os.replace(tmpFile, fname)
+
+    return weights, outside
+
+
+def interpolate_modes(weights, outside, phi, modes):
+    '''
+    Input
+    -----
+        weights, outside: see get_interp_weights
+        phi: (nPts, nModes) POD modes, may be memory-mapped
+        modes: list of modes to interpolate
+
+    Output
+    ------
+        phiPlt: (nSample, len(modes)) modes on the plotting mesh, nan outside
+                the convex hull of the POD window
+    '''
+
+    phiPlt = weights.dot( np.asarray(phi[:, modes], dtype=np.float64) )
+    phiPlt[outside] = np.nan
+
+    return phiPlt
@@ -0,0 +1,178 @@
+import numpy as np
+from contextlib import contextmanager
+
+__all__=["blas_threads", "get_correlation_matrix", "get_projected_modes", "get_eigen_modes"]
+
+
+def _get_blocks(nPts, blockSize):
+    '''returns the (start, end) rows of the blocks of the snapshot matrix'''
+    if not blockSize:
+        blockSize = max(nPts, 1)
+
+    return [(i, min(i + blockSize, nPts)) for i in range(0, nPts, blockSize)]
+
+
+@contextmanager
+def blas_threads(nThreads=None):
+    '''
+    limits the # of BLAS threads inside the context, requires threadpoolctl
+    '''
+    if not nThreads:
+        yield
+        return
+
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        print('\n threadpoolctl not found, the # of BLAS threads is not set ...')
+        yield
+        return
+
+    with threadpool_limits(limits=nThreads, user_api='blas'):
+        yield
+
+
+def _syrk_update(c, block):
+    '''adds block.T*block to the upper triangle of c, a float64 F-ordered array'''
+    from scipy.linalg.blas import dsyrk
+
+    if block.dtype != np.float64:
+        block = block.astype(np.float64)
+
+    # block.T is F-contiguous for C-contiguous blocks, no copy is made
+    dsyrk(1.0, block.T, beta=1.0, c=c, trans=0, lower=0, overwrite_c=1)
+
+
+def get_correlation_matrix(u, blockSize=None):
+    '''
+    Input
+    -----
+        u: (nComp, nPts, nSnaps) snapshot matrix or list of (nPts, nSnaps)
+           velocity components, may be memory-mapped
+        blockSize: # of points per block, chosen to keep blocks around
+                   64 MB if None
+
+    Output
+    ------
+        c: (nSnaps, nSnaps) correlation matrix summed over the components
+    '''
+
+    nPts, nSnaps = u[0].shape
+    if not blockSize:
+        blockSize = max(1024, 2**23 // max(nSnaps, 1))
+
+    c = np.zeros((nSnaps, nSnaps), order='F')
+
+    # all the components in a single stacked (nComp*nPts, nSnaps) matrix:
+    if isinstance(u, np.ndarray) and u.flags.c_contiguous:
+        stacked = u.reshape(-1, nSnaps)
+        for start, end in _get_blocks(stacked.shape[0], blockSize):
+            _syrk_update(c, stacked[start:end])
+
+    else:
+        for start, end in _get_blocks(nPts, blockSize):
+            for uk in u:
+                _syrk_update(c, uk[start:end])
+
+    # fill the lower triangle in place, one block of columns at a time:
+    for start, end in _get_blocks(nSnaps, 256):
+        diag = c[start:end, start:end]
+        c[start:end, start:end] = np.triu(diag) + np.triu(diag, 1).T
+        c[end:, start:end] = c[start:end, end:].T
+
+    return c
+
+
+def get_projected_modes(u, eigVect, blockSize=None):
+    '''
+    Input
+    -----
+        u: (nComp, nPts, nSnaps) snapshot matrix or list of (nPts, nSnaps)
+           velocity components, may be memory-mapped
+        eigVect: (nSnaps, nModes) eigenvectors of the correlation matrix
+        blockSize: # of points per block, all points at once if None
+
+    Output
+    ------
+        phi: (nComp, nPts, nModes) POD modes normalized to unit norm
+    '''
+
+    nPts  = u[0].shape[0]
+    nComp = len(u)
+    phi   = np.zeros((nComp, nPts, eigVect.shape[1]))
+
+    for start, end in _get_blocks(nPts, blockSize):
+        for k in range(nComp):
+            phi[k, start:end] = np.dot(u[k][start:end], eigVect)
+
+    phiNorm = np.sqrt( np.sum( np.square(phi), axis=(0, 1) ) )
+    phi /= phiNorm
+
+    return phi
+
+
+def get_eigen_modes(c, nModes, solver='svd'):
+    '''
+    Input
+    -----
+        c: (nSnaps, nSnaps) symmetric positive semi-definite correlation matrix
+        nModes: # of modes to compute
+        solver: 'svd' (full svd), 'eigh' (partial symmetric eigensolver),
+                'eigsh' (Lanczos) or 'randomized' (randomized range finder)
+
+    Output
+    ------
+        eigVals: (nModes,) largest eigenvalues in decreasing order
+        eigVect: (nSnaps, nModes) corresponding eigenvectors
+    '''
+
+    nSnaps = c.shape[0]
+    nModes = min(nModes, nSnaps)
+
+    # Lanczos needs fewer modes than snapshots:
+    if solver == 'eigsh' and nModes >= nSnaps - 1:
+        solver = 'eigh'
+
+    if solver == 'svd':
+        eigVect, eigVals, _ = np.linalg.svd(c)
+        return eigVals[:nModes], eigVect[:, :nModes]
+
+    elif solver == 'eigh':
+        from scipy.linalg import eigh
+        eigVals, eigVect = eigh(c, subset_by_index=[nSnaps - nModes, nSnaps - 1])
+
+    elif solver == 'eigsh':
+        from scipy.sparse.linalg import eigsh
+        eigVals, eigVect = eigsh(c, k=nModes, which='LA')
+
+    elif solver == 'randomized':
+        eigVals, eigVect = _randomized_eigh(c, nModes)
+
+    else:
+        raise ValueError('\n unknown solver ' + solver + ' ...')
+
+    order = np.argsort(eigVals)[::-1]
+
+    return eigVals[order], eigVect[:, order]
+
+
+def _randomized_eigh(c, nModes, nOversample=None, nPowerIter=4, seed=0):
+    '''
+    eigenpairs of the symmetric matrix c from a randomized range finder
+    with power iterations (Halko, Martinsson & Tropp, 2011)
+    '''
+    from scipy.linalg import eigh
+
+    nSnaps = c.shape[0]
+    if nOversample is None:
+        nOversample = max(nModes, 10)
+    nCols = min(nModes + nOversample, nSnaps)
+
+    omega = np.random.default_rng(seed).standard_normal((nSnaps, nCols))
+    q, _  = np.linalg.qr( np.dot(c, omega) )
+    for i in range(nPowerIter):
+        q, _ = np.linalg.qr( np.dot(c, q) )
+
+    eigVals, w = eigh( np.dot(q.T, np.dot(c, q)) )
+
+    return eigVals[-nModes:], np.dot(q, w[:, -nModes:])
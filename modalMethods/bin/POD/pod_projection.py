@@ -0,0 +1,291 @@
+import numpy as np
+import os
+import json
+import argparse
+from modalMethods.readers.reader_support_functions import *
+from modalMethods.readers.reader import *
+from modalMethods.readers.decomposed import *
+from modalMethods.profiler import *
+from .pod_kernels import *
+from .pod_kernels import _get_blocks
+from .pod_eval import *
+from .pod_store import *
+
+__all__=["project_snapshots", "get_time_coefficients", "write_time_coefficients",
+         "LowRankReconstruction", "load_reconstruction", "get_point_indices"]
+
+
+def project_snapshots(phi, u, blockSize=None):
+    '''
+    Input
+    -----
+        phi: (nDim, nPts, nModes) POD modes, may be memory-mapped
+        u: (nDim, nPts, nBatch) snapshots
+        blockSize: # of points per block, all points at once if None
+
+    Output
+    ------
+        a: (nBatch, nModes) coefficients of the snapshots on the modes
+    '''
+
+    nDim, nPts, nModes = phi.shape
+    a = np.zeros((u.shape[2], nModes))
+
+    for start, end in _get_blocks(nPts, blockSize):
+        for k in range(nDim):
+            a += np.dot(u[k][start:end].T, np.ascontiguousarray(phi[k][start:end]))
+
+    return a
+
+
+def get_time_coefficients(configFile, result=None, timeDirs=None, batchSize=64,
+                          nWorkers=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file of the POD
+        result: PODResult of the modes, read from the result store of the
+                case if None
+        timeDirs: time directories of the snapshots to project, all the
+                  time directories of the time range of the config file
+                  (timeStart, timeEnd, timeStride) if None
+        batchSize: # of snapshots projected at once
+        nWorkers: # of processes reading the next snapshots meanwhile,
+                  overrides the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        times: (nTimes,) times of the snapshots
+        a: (nTimes, nModes) temporal coefficients a_k(t) of the snapshots
+
+    The snapshots are streamed from the time directories, only batchSize
+    of them are in memory, and may be other than those of the POD.
+    '''
+
+    [configDict, modes, points] = config_to_dict(configFile)
+    setup = get_pod_setup(configDict, nWorkers)
+    nDim = setup['nDim']
+
+    coords, indices, nPts = read_window_points(setup)
+
+    if result is None:
+        result = load_pod_store(get_store_dir(setup['caseDir'], setup['patchName'],
+                                              setup['nSnaps'], nDim))
+    if result.nPts != nPts:
+        raise ValueError('\n the POD window of the config file does not match ' +
+                         'the modes ...')
+
+    if timeDirs is None:
+        with stage('listDirs'):
+            if setup['decomposed']:
+                filePath = get_processor_dirs(setup['filePath'])[0]
+            else:
+                filePath = setup['filePath']
+            timeDirs = get_time_dirs(filePath, None, setup['timeSelection'],
+                                     get_snapshot_field(setup['patchName'], nDim))
+
+    phi, nTimes = result.modes, len(timeDirs)
+    a = np.zeros((nTimes, phi.shape[2]))
+    batch = np.zeros((nDim, nPts, min(batchSize, nTimes)))
+
+    print('\n projecting ' + str(nTimes) + ' snapshots ...')
+    with stage('projection'), blas_threads(setup['blasThreads']):
+        for i, x in enumerate( iter_snapshots(setup, indices, nPts, timeDirs) ):
+            batch[:, :, i % batch.shape[2]] = x
+            add_snapshots(1)
+
+            if (i + 1) % batch.shape[2] == 0 or i + 1 == nTimes:
+                n = i % batch.shape[2] + 1
+                a[i+1-n:i+1] = project_snapshots(phi, batch[:, :, :n],
+                                                 setup['blockSize'])
+
+    return np.asarray(timeDirs, dtype=np.float64), a
+
+
+def write_time_coefficients(storeDir, times, a):
+    '''
+    Input
+    -----
+        storeDir: directory of the POD results, see get_store_dir
+        times: (nTimes,) times of the snapshots
+        a: (nTimes, nModes) temporal coefficients
+
+    Output
+    ------
+        writes times.npy and coeffs.npy in the store and adds them to its
+        manifest
+    '''
+
+    manifestFile = os.path.join(storeDir, 'manifest.json')
+    with open(manifestFile) as f:
+        manifest = json.load(f)
+
+    np.save(os.path.join(storeDir, 'times.npy'), np.asarray(times))
+    np.save(os.path.join(storeDir, 'coeffs.npy'), np.asarray(a))
+
+    manifest['arrays'].update(times='times.npy', coeffs='coeffs.npy')
+
+    tmpFile = manifestFile + '.tmp'
+    with open(tmpFile, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmpFile, manifestFile)
+
+
+class LowRankReconstruction(object):
+    '''
+    Rank-r reconstruction u(x, t_i) = sum_k phi_k(x) a_k(t_i) served from
+    the modes and the temporal coefficients, a full (nPts, nTimes) field is
+    never formed: each request only reads the rows of the requested points
+    and the first r modes.
+
+    Input
+    -----
+        coords: (nDim, nPts) coordinates of the POD window
+        modes: (nDim, nPts, nModes) POD modes, may be memory-mapped
+        coeffs: (nTimes, nModes) temporal coefficients
+        times: (nTimes,) times of the coefficients
+    '''
+
+    __slots__ = ['coords', 'modes', 'coeffs', 'times']
+
+    def __init__(self, coords, modes, coeffs, times=None):
+        self.coords = np.asarray(coords)
+        self.modes  = modes
+        self.coeffs = np.asarray(coeffs)
+        self.times  = None if times is None else np.asarray(times)
+
+    @property
+    def nDim(self):
+        return self.coords.shape[0]
+
+    @property
+    def nPts(self):
+        return self.coords.shape[1]
+
+    @property
+    def nModes(self):
+        return self.coeffs.shape[1]
+
+    @property
+    def nTimes(self):
+        return self.coeffs.shape[0]
+
+    def get_time_index(self, time):
+        '''returns the index of the coefficients closest to time'''
+        return int( np.argmin(np.abs(self.times - time)) )
+
+    def reconstruct(self, i, rank=None, points=None):
+        '''
+        Input
+        -----
+            i: index, or array of indices, of the times to reconstruct
+            rank: # of modes used, all of them if None
+            points: indices of the points to reconstruct, all if None
+
+        Output
+        ------
+            u: (nDim, nPoints) field, or (nDim, nPoints, len(i)) fields
+        '''
+
+        rank = self.nModes if rank is None else min(rank, self.nModes)
+        a = self.coeffs[i, :rank]
+
+        if points is None:
+            phi = self.modes[:, :, :rank]
+        else:
+            phi = self.modes[:, np.asarray(points), :rank]
+
+        return np.dot(phi, a.T)
+
+
+def load_reconstruction(storeDir):
+    '''
+    Input
+    -----
+        storeDir: directory of the POD results with temporal coefficients,
+                  see write_time_coefficients
+
+    Output
+    ------
+        rec: LowRankReconstruction with memory-mapped modes
+    '''
+
+    result = load_pod_store(storeDir)
+
+    with open(os.path.join(storeDir, 'manifest.json')) as f:
+        arrays = json.load(f)['arrays']
+
+    if 'coeffs' not in arrays:
+        raise ValueError('\n no temporal coefficients in ' + storeDir + ', ' +
+                         'run modalMethods project first ...')
+
+    coeffs = np.load(os.path.join(storeDir, arrays['coeffs']))
+    times  = np.load(os.path.join(storeDir, arrays['times']))
+
+    return LowRankReconstruction(result.coords, result.modes, coeffs, times)
+
+
+def get_point_indices(coords, points):
+    '''
+    Input
+    -----
+        coords: (nDim, nPts) coordinates of the POD window
+        points: list of points, in the units of coords
+
+    Output
+    ------
+        indices: index of the closest point of the window to each point
+    '''
+    from scipy.spatial import cKDTree
+
+    tree = cKDTree(np.asarray(coords).T)
+
+    return tree.query(np.asarray(points, dtype=np.float64))[1]
+
+
+def main(argv=None):
+    '''
+    Writes the temporal coefficients of the snapshots in the POD result store
+    '''
+    parser = argparse.ArgumentParser(
+            description="Project the snapshots of time directories on the POD \
+                         modes and write the temporal coefficients in the result \
+                         store of postProcessing/POD.")
+
+    parser.add_argument('-config',
+                        type=str,
+                        help='The config file',
+                        required=True)
+
+    parser.add_argument('-times', '--times',
+                        nargs='+',
+                        help='time directories to project, all of them if not given',
+                        default=None)
+
+    parser.add_argument('-batchSize', '--batchSize',
+                        type=int,
+                        help='# of snapshots projected at once',
+                        default=64)
+
+    parser.add_argument('-nWorkers', '--nWorkers',
+                        type=int,
+                        help='# of processes used to read the snapshots',
+                        default=None)
+
+    args = parser.parse_args(argv)
+
+    with open(args.config, mode='r') as configFile:
+        [configDict, _, _] = config_to_dict(configFile)
+
+    with open(args.config, mode='r') as configFile:
+        times, a = get_time_coefficients(configFile, None, args.times,
+                                         args.batchSize, args.nWorkers)
+
+    storeDir = get_store_dir(os.getcwd(), configDict['patchName'],
+                             int( configDict['nSnaps'] ), int( configDict['nDim'] ))
+    write_time_coefficients(storeDir, times, a)
+    print('\n temporal coefficients written in ' + storeDir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+import numpy as np
+import os
+import json
+from modalMethods.readers.reader_support_functions import *
+from modalMethods.readers.reader import *
+from modalMethods.readers.decomposed import *
+from modalMethods.profiler import *
+from .pod_kernels import *
+from .pod_result import *
+from .pod_eval import *
+from .pod_store import *
+
+__all__=["get_quicklook_setup", "get_decimation", "decimate_indices",
+         "get_sampled_times", "get_quicklook_result", "write_quicklook"]
+
+
+def get_quicklook_setup(configDict, nWorkers=None):
+    '''
+    Input
+    -----
+        configDict: dictionary of the config file entries
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        setup: output of get_pod_setup with the quick-look entries:
+               'qlStride' (every k-th point), 'qlVoxel' (voxel size of the
+               coarsening, None for none), 'qlTimeStride' (every k-th
+               snapshot), 'qlSample' (# of snapshots drawn at random, None
+               for all), 'qlCheck' (# of snapshots read at full resolution
+               for the error estimates) and 'qlSeed'
+    '''
+
+    setup = get_pod_setup(configDict, nWorkers)
+
+    setup['qlStride'] = int( configDict.get('qlStride', 1) )
+    setup['qlVoxel']  = float( configDict.get('qlVoxel', 0) ) or None
+    if setup['qlVoxel'] is not None and setup['qlStride'] > 1:
+        raise ValueError('\n qlStride and qlVoxel cannot be used together ...')
+
+    setup['qlTimeStride'] = int( configDict.get('qlTimeStride', 1) )
+    setup['qlSample'] = int( configDict.get('qlSample', 0) ) or None
+    setup['qlCheck']  = int( configDict.get('qlCheck', 16) )
+    setup['qlSeed']   = int( configDict.get('qlSeed', 0) )
+
+    if setup['distributed']:
+        print('\n distributed quick-look POD is not supported, running on ' +
+              'one process ...')
+
+    return setup
+
+
+def get_decimation(coords, stride=1, voxel=None):
+    '''
+    Input
+    -----
+        coords: (nDim, nPts) coordinates of the POD window
+        stride: keep every stride-th point of the window
+        voxel: size of the cells of a regular grid, one point is kept per
+               cell (in the units of coords), overrides stride
+
+    Output
+    ------
+        keep: sorted indices of the kept points in the window
+        weights: # of points of the window represented by each kept point
+    '''
+
+    coords = np.asarray(coords)
+    nPts = coords.shape[1]
+
+    if voxel is None:
+        keep = np.arange(0, nPts, max(1, stride))
+        return keep, np.diff( np.append(keep, nPts) )
+
+    cells = np.floor( (coords - coords.min(axis=1)[:, None])/voxel ).astype(np.int64)
+    _, first, counts = np.unique(cells.T, axis=0, return_index=True,
+                                 return_counts=True)
+    order = np.argsort(first)
+
+    return first[order], counts[order]
+
+
+def decimate_indices(indices, keep, decomposed=False):
+    '''
+    Input
+    -----
+        indices: output of read_window_points
+        keep: sorted indices of the kept points in the window
+        decomposed: indices is the read plan of a decomposed case
+
+    Output
+    ------
+        indices: indices, or read plan, of the kept points only
+    '''
+
+    if not decomposed:
+        return np.asarray(indices)[keep]
+
+    plan = []
+    for procDir, localIdx, rows in indices:
+        pos  = np.searchsorted(keep, rows)
+        mask = pos < keep.size
+        mask[mask] = keep[pos[mask]] == rows[mask]
+        if np.any(mask):
+            plan.append( (procDir, np.asarray(localIdx)[mask], pos[mask]) )
+
+    return plan
+
+
+def get_sampled_times(timeDirs, stride=1, nSample=None, seed=0):
+    '''
+    Input
+    -----
+        timeDirs: time directories of the snapshots in time order
+        stride: keep every stride-th time directory
+        nSample: # of time directories drawn at random among those, all
+                 of them if None
+        seed: seed of the random draw
+
+    Output
+    ------
+        timeDirs: sampled time directories in time order
+    '''
+
+    timeDirs = np.asarray(timeDirs)[::max(1, stride)]
+
+    if nSample is not None and nSample < timeDirs.size:
+        rng = np.random.default_rng(seed)
+        timeDirs = timeDirs[np.sort( rng.choice(timeDirs.size, nSample,
+                                                replace=False) )]
+
+    return timeDirs
+
+
+def _get_subspace_errors(cross):
+    '''
+    returns, for k = 1, 2, ..., the sine of the largest principal angle
+    between the spans of the first k vectors of two orthonormal bases,
+    cross being the matrix of their inner products
+    '''
+    errors = np.empty(cross.shape[0])
+    for k in range(cross.shape[0]):
+        s = np.linalg.svd(cross[:k+1, :k+1], compute_uv=False)[-1]
+        errors[k] = np.sqrt( max(0.0, 1.0 - s**2) )
+
+    return errors
+
+
+def _get_spatial_errors(full, keep, weights, nModes):
+    '''
+    singular-value and subspace errors of the decimation on the snapshots
+    full (nDim, nPts, nCheck) read at full resolution
+    '''
+    nCheck = full.shape[2]
+    x = full.reshape(-1, nCheck)
+    xc = (full[:, keep]*np.sqrt(weights)[:, None]).reshape(-1, nCheck)
+
+    eigVals, eigVect = get_eigen_modes(np.dot(x.T, x)/nCheck, nModes)
+    eigValsC, eigVectC = get_eigen_modes(np.dot(xc.T, xc)/nCheck, nModes)
+
+    # full resolution modes, and those of the eigenvectors of the decimation:
+    phi = np.dot(x, eigVect)
+    phi /= np.maximum(np.linalg.norm(phi, axis=0), np.finfo(float).tiny)
+    q = np.linalg.qr( np.dot(x, eigVectC) )[0]
+
+    tiny = np.finfo(float).tiny
+    singValErr = np.abs(eigValsC - eigVals)/np.maximum(eigVals, tiny)
+
+    return singValErr, _get_subspace_errors( np.dot(phi.T, q) )
+
+
+def _get_temporal_errors(c, nModes, nSnaps, seed):
+    '''
+    singular-value and subspace errors of the snapshot sampling, from the
+    difference between the POD of two random halves of the m sampled
+    snapshots of correlation matrix c, c = u^T u/m
+    '''
+    m = c.shape[0]
+    halves = np.array_split(np.random.default_rng(seed + 1).permutation(m), 2)
+    tiny = np.finfo(float).tiny
+
+    out = []
+    for h in halves:
+        eigVals, eigVect = get_eigen_modes(c[np.ix_(h, h)]*m/h.size, nModes)
+        out.append( (eigVals, eigVect/np.sqrt( np.maximum(eigVals, tiny)*h.size )) )
+
+    (eigValsA, va), (eigValsB, vb) = out
+    cross = np.dot(va.T, np.dot(c[np.ix_(halves[0], halves[1])]*m, vb))
+
+    # the halves differ by about twice the error of the whole sample, which
+    # vanishes when every snapshot is sampled:
+    scale = np.sqrt(1.0 - m/nSnaps)/2
+    singValErr = 2*np.abs(eigValsA - eigValsB)/np.maximum(eigValsA + eigValsB, tiny)
+
+    return scale*singValErr, scale*_get_subspace_errors(cross)
+
+
+def get_quicklook_result(configFile, nWorkers=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file
+        nWorkers: # of processes used to import the snapshots, overrides
+                  the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        result: PODResult of the decimated window and sampled snapshots
+        errors: dictionary of the estimated relative errors of the
+                eigenvalues and sines of the largest principal angle of the
+                leading k = 1, 2, ... modes: 'singValError' and
+                'subspaceError', their parts due to the decimation
+                ('spatialSingValError', 'spatialSubspaceError') and to the
+                sampling ('temporalSingValError', 'temporalSubspaceError'),
+                NaN when not estimated, and the sampled and total # of
+                points 'nPts' and snapshots 'nSnaps', and 'nCheck'
+
+    Approximates the POD of the config file from every qlStride-th point
+    (or one point per qlVoxel cell) of the window and every qlTimeStride-th
+    snapshot, or qlSample snapshots drawn at random. The eigenvalues are
+    those of the full window, each kept point being weighted by the points
+    it represents. qlCheck of the sampled snapshots are read at full
+    resolution to estimate the error of the decimation, the error of the
+    sampling is estimated from two halves of the sampled snapshots.
+    '''
+
+    [configDict, modes, points] = config_to_dict(configFile)
+    setup = get_quicklook_setup(configDict, nWorkers)
+    setup['outOfCore'] = False
+
+    patchName, nSnaps, nDim = setup['patchName'], setup['nSnaps'], setup['nDim']
+
+    coords, indices, nPts = read_window_points(setup)
+    keep, weights = get_decimation(coords, setup['qlStride'], setup['qlVoxel'])
+    coarse = decimate_indices(indices, keep, setup['decomposed'])
+
+    with stage('listDirs'):
+        filePath = setup['filePath']
+        if setup['decomposed']:
+            filePath = get_processor_dirs(filePath)[0]
+        timeDirs = get_time_dirs(filePath, nSnaps, setup['timeSelection'],
+                                 get_snapshot_field(patchName, nDim))
+        timeDirs = get_sampled_times(timeDirs, setup['qlTimeStride'],
+                                     setup['qlSample'], setup['qlSeed'])
+
+    m = timeDirs.size
+    nCheck = min(setup['qlCheck'], m)
+    check = np.sort( np.random.default_rng(setup['qlSeed']).choice(m, nCheck,
+                                                                    replace=False) )
+    rest = np.setdiff1d(np.arange(m), check)
+
+    print('\n quick-look POD of ' + str(keep.size) + ' of ' + str(nPts) +
+          ' points and ' + str(m) + ' of ' + str(nSnaps) + ' snapshots ...')
+
+    u = np.zeros((nDim, keep.size, m), dtype=setup['precision'])
+    full = np.zeros((nDim, nPts, nCheck))
+
+    with stage('readSnapshots'):
+        for i, x in enumerate( iter_snapshots(setup, indices, nPts, timeDirs[check]) ):
+            full[:, :, i] = x
+            u[:, :, check[i]] = x[:, keep]
+            add_snapshots(1)
+
+        for i, x in enumerate( iter_snapshots(setup, coarse, keep.size, timeDirs[rest]) ):
+            u[:, :, rest[i]] = x
+            add_snapshots(1)
+
+    with blas_threads(setup['blasThreads']):
+        with stage('gram'):
+            c = get_correlation_matrix(u*np.sqrt(weights)[:, None], None)/m
+
+        print('\n performing SVD ...')
+        with stage('eigen'):
+            singVals, eigVect = get_eigen_modes(c, setup['nModes'], setup['solver'])
+
+        with stage('errors'):
+            nErr = singVals.size
+            if nCheck > 0:
+                spatial = _get_spatial_errors(full, keep, weights,
+                                              min(nErr, nCheck))
+            else:
+                spatial = (np.zeros(0), np.zeros(0))
+            if m >= 4:
+                temporal = _get_temporal_errors(c, min(nErr, m//2), nSnaps,
+                                                setup['qlSeed'])
+            else:
+                temporal = (np.zeros(0), np.zeros(0))
+
+    errors = {'nPts': [int(keep.size), int(nPts)], 'nSnaps': [int(m), int(nSnaps)],
+              'nCheck': int(nCheck)}
+    for i, key in enumerate(['singValError', 'subspaceError']):
+        s = np.full(nErr, np.nan)
+        s[:spatial[i].size] = spatial[i]
+        t = np.full(nErr, np.nan)
+        t[:temporal[i].size] = temporal[i]
+
+        errors['spatial' + key[0].upper() + key[1:]] = s
+        errors['temporal' + key[0].upper() + key[1:]] = t
+        errors[key] = np.sqrt(np.square(s) + np.square(t))
+
+    coords = np.asarray(coords)[:, keep]
+    result = PODResult(coords, singVals, eigVect, u, patchName, nSnaps,
+                       setup['blockSize'], None, setup['blasThreads'])
+
+    return result, errors
+
+
+def write_quicklook(result, errors):
+    '''
+    Input
+    -----
+        result, errors: output of get_quicklook_result
+
+    Output
+    ------
+        writes the modes in postProcessing/POD/quickLook/<patchName>_<nSnaps>
+        (3d_<nSnaps> in 3d), the errors in the 'quickLook' entry of its
+        manifest, and prints the errors
+    '''
+
+    with stage('write'):
+        print('\n writing quick-look POD modes ...')
+        storeDir = get_store_dir(os.getcwd(), result.patchName, result.nSnaps,
+                                 result.nDim, os.path.join('POD', 'quickLook'))
+        write_pod_store(storeDir, result.coords, result.modes, result.singVals,
+                        result.patchName, result.nSnaps)
+
+        manifestFile = os.path.join(storeDir, 'manifest.json')
+        with open(manifestFile) as f:
+            manifest = json.load(f)
+
+        manifest['quickLook'] = {key: np.asarray(value).tolist()
+                                 for key, value in errors.items()}
+
+        tmpFile = manifestFile + '.tmp'
+        with open(tmpFile, 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmpFile, manifestFile)
+
+    print('\n  mode   singular value   est. rel. error   est. subspace error')
+    for k in range(result.nModes):
+        print('  %4d   %11.4e      %11.4e       %11.4e'
+              % (k+1, result.singVals[k], errors['singValError'][k],
+                 errors['subspaceError'][k]))
@@ -1,22 +1,71 @@
 import numpy as np
 import os
 import argparse
-from scipy.interpolate import griddata
-import matplotlib
-matplotlib.use('PDF')
-from matplotlib import pyplot as plt
-from matplotlib.path import Path
-import matplotlib.patches as patches
 from modalMethods.readers.reader_support_functions import *
 from modalMethods.readers.reader import *
 from modalMethods.bin.POD.pod_basic_plot import *
+from modalMethods.bin.POD.pod_interp import *
+from modalMethods.bin.POD.pod_store import *
+from modalMethods.bin.POD.pod_render import *
 
 
-def pod_quiver_plot(configFile):
+def _render_quiver_plot(phiPlts, context, i):
+    '''saves the quiver plot of mode context['modes'][i]'''
+    import matplotlib
+    matplotlib.use('PDF')
+    from matplotlib import pyplot as plt
+    import matplotlib.patches as patches
+
+    modes = context['modes']
+    x1min, x1max, x2min, x2max = context['window']
+    x1Plt, x2Plt = context['x1Plt'], context['x2Plt']
+    nPltPts = x1Plt.shape[0]
+
+    phi1Plt = phiPlts[0, :, i].reshape(nPltPts, nPltPts)
+    phi2Plt = phiPlts[1, :, i].reshape(nPltPts, nPltPts)
+
+    # set before the figure is created, so every figure is rendered the same:
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
+
+    # generate plot:
+    fig = plt.figure(figsize=(12, 4))
+    ax = fig.add_axes([0.08, 0.25, 0.85, 0.6])
+
+    patch = patches.PathPatch(context['geometry'], facecolor='black', lw=1)
+    ax.add_patch(patch)
+
+    nAltPts = 18
+    Q = plt.quiver(x1Plt[::nAltPts, ::nAltPts], x2Plt[::nAltPts, ::nAltPts],
+    phi1Plt[::nAltPts, ::nAltPts], phi2Plt[::nAltPts, ::nAltPts],
+    scale_units='width', scale=0.22)
+
+    qk = plt.quiverkey(Q, 0.9, 0.9, 0.01, r'$0.01 \frac{m}{s}$', labelpos='E',
+         coordinates='figure', fontproperties={'size': 20})
+
+    plt.xlim(x1min, x1max)
+    plt.ylim(x2min, x2max)
+    plt.xticks(list( range(int(x1min), int(x1max)+1) ), fontsize=26)
+    plt.yticks(list( range(int(x2min), int(x2max)+1) ), fontsize=26)
+
+    plt.xlabel(r'$x/H_{\rm{cube}}$', fontsize=24)
+    plt.ylabel(r'$y/H_{\rm{cube}}$', fontsize=24)
+
+    pltName = context['caseDir'] + '/postProcessing/POD/quiver'  + \
+              '_mode_' + str( modes[i] ) + '_' + context['patchName'] + '_' + \
+              str( context['nSnaps'] ) + '.pdf'
+
+    plt.savefig(pltName, metadata={'CreationDate': None})
+    plt.close(fig)
+
+
+def pod_quiver_plot(configFile, result=None, nJobs=1):
     '''
     Input
     -----
         configFile: configuration file from "/constant/"
+        result: PODResult to plot, read from postProcessing/POD if None
+        nJobs: # of processes rendering the figures
     Output
     ------
         saves plots generated in /postProcessing/POD/"
@@ -40,55 +89,27 @@ def pod_quiver_plot(configFile):
 
     # getting plotting info from configFile:
     x1, x2, samplePts, nPltPts, phi1, phi2, geometry = \
-    plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps, points)
+    plot_setup(caseDir, x1min, x1max, x2min, x2max, nPltPts, patchName, nSnaps, points,
+               result)
 
     x1Plt = samplePts[:, 0].reshape(nPltPts, nPltPts)
     x2Plt = samplePts[:, 1].reshape(nPltPts, nPltPts)
 
-    print('\n plotting data ...')
-    for i in range( len( modes ) ):
-        # interpolate data on a regular mesh:
-        phi1Temp = griddata( (x1, x2), phi1[:, modes[i]],
-                           samplePts, method='linear')
-        phi1Plt = phi1Temp.reshape(nPltPts, nPltPts)
-        phi2Temp = griddata( (x1, x2), phi2[:, modes[i]],
-                           samplePts, method='linear')
-        phi2Plt = phi2Temp.reshape(nPltPts, nPltPts)
-
-        # generate plot:
-        fig = plt.figure(figsize=(12, 4))
-        ax = fig.add_axes([0.08, 0.25, 0.85, 0.6])
-
-        patch = patches.PathPatch(geometry, facecolor='black', lw=1)
-        ax.add_patch(patch)
-
-        plt.rc('text', usetex=True)
-        plt.rc('font', family='serif')
-
-        nAltPts = 18
-        Q = plt.quiver(x1Plt[::nAltPts, ::nAltPts], x2Plt[::nAltPts, ::nAltPts],
-        phi1Plt[::nAltPts, ::nAltPts], phi2Plt[::nAltPts, ::nAltPts],
-        scale_units='width', scale=0.22)
+    # interpolate all the modes on a regular mesh:
+    weights, outside = get_plot_weights(caseDir, patchName, nSnaps, x1, x2,
+                                        samplePts)
+    phiPlts = np.stack([interpolate_modes(weights, outside, phi, modes)
+                        for phi in [phi1, phi2]])
 
-        qk = plt.quiverkey(Q, 0.9, 0.9, 0.01, r'$0.01 \frac{m}{s}$', labelpos='E',
-             coordinates='figure', fontproperties={'size': 20})
+    context = {'caseDir': caseDir, 'patchName': patchName, 'nSnaps': nSnaps,
+               'modes': modes, 'x1Plt': x1Plt, 'x2Plt': x2Plt,
+               'window': (x1min, x1max, x2min, x2max), 'geometry': geometry}
 
-        plt.xlim(x1min, x1max)
-        plt.ylim(x2min, x2max)
-        plt.xticks(list( range(int(x1min), int(x1max)+1) ), fontsize=26)
-        plt.yticks(list( range(int(x2min), int(x2max)+1) ), fontsize=26)
-
-        plt.xlabel(r'$x/H_{\rm{cube}}$', fontsize=24)
-        plt.ylabel(r'$y/H_{\rm{cube}}$', fontsize=24)
-
-        pltName = caseDir + '/postProcessing/POD/quiver'  + \
-                  '_mode_' + str( modes[i] ) + '_' + patchName + '_' + str( nSnaps ) + \
-                  '.pdf'
-
-        plt.savefig(pltName)
-        plt.close(fig)
+    print('\n plotting data ...')
+    render_figures(_render_quiver_plot, phiPlts, context, list( range( len( modes ) ) ),
+                   nJobs, get_store_dir(caseDir, patchName, nSnaps, 2))
 
-def main():
+def main(argv=None):
     # Parse the command-line arguments
     parser = argparse.ArgumentParser(
             description="Save POD mode plots in postProcessing/POD.")
@@ -98,9 +119,14 @@ def main():
                         help='The config file',
                         required=True)
 
-    args = parser.parse_args()
+    parser.add_argument('-jobs', '--jobs',
+                        type=int,
+                        help='# of processes rendering the figures',
+                        default=1)
+
+    args = parser.parse_args(argv)
 
     # Parse the config
     configFile = open(args.config, mode='r')
 
-    pod_quiver_plot(configFile)
+    pod_quiver_plot(configFile, nJobs=args.jobs)
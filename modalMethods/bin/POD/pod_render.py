@@ -0,0 +1,59 @@
+import numpy as np
+import os
+import multiprocessing as mp
+
+__all__=["render_figures"]
+
+# state shared by every figure of a worker process:
+_workerState = dict()
+
+
+def _init_worker(fieldsFile, renderFunc, context):
+    _workerState['fields'] = np.load(fieldsFile, mmap_mode='r')
+    _workerState['renderFunc'] = renderFunc
+    _workerState['context'] = context
+
+
+def _render_worker(job):
+    _workerState['renderFunc'](_workerState['fields'], _workerState['context'], job)
+
+    return job
+
+
+def render_figures(renderFunc, fields, context, jobs, nJobs=1, tmpDir=None):
+    '''
+    Input
+    -----
+        renderFunc: module level function renderFunc(fields, context, job)
+                    saving the figure of one job
+        fields: array of the interpolated fields, shared by every figure
+        context: dict of plot settings passed to renderFunc
+        jobs: list of jobs, one per figure
+        nJobs: # of worker processes rendering the figures
+        tmpDir: directory of the memmap of fields read by the workers
+
+    Output
+    ------
+        saves the figures, the files are identical for any nJobs
+    '''
+
+    nJobs = min(nJobs, len(jobs))
+    if nJobs <= 1:
+        for job in jobs:
+            renderFunc(fields, context, job)
+        return
+
+    # the workers memory-map the fields instead of receiving a copy:
+    if tmpDir is None:
+        tmpDir = os.getcwd()
+    fieldsFile = os.path.join(tmpDir, '.plot_fields_' + str(os.getpid()) + '.npy')
+    np.save(fieldsFile, np.asarray(fields))
+
+    try:
+        with mp.Pool(nJobs, initializer=_init_worker,
+                     initargs=(fieldsFile, renderFunc, context)) as pool:
+            for job in pool.imap_unordered(_render_worker, jobs):
+                pass
+
+    finally:
+        os.remove(fieldsFile)
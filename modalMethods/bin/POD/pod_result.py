@@ -0,0 +1,118 @@
+import numpy as np
+import os
+from modalMethods.profiler import *
+from .pod_kernels import *
+
+__all__=["PODResult"]
+
+
+class PODResult(object):
+    '''
+    Result of a snapshot POD. The modes are projected from the snapshots
+    the first time they are accessed; coordinates and modes of each
+    direction are views of single stacked arrays.
+
+    Input
+    -----
+        coords: (nDim, nPts) coordinates of the POD window
+        singVals: (nModes,) eigenvalues of the correlation matrix
+        eigVect: (nSnaps, nModes) eigenvectors of the correlation matrix
+        u: (nDim, nPts, nSnaps) snapshot matrix, may be memory-mapped
+        patchName: name of the sampled surface
+        nSnaps: # of snapshots
+        blockSize: # of points per block when projecting the modes
+        snapshotFile: file backing u, removed by close()
+        blasThreads: # of BLAS threads when projecting the modes
+        modes: (nDim, nPts, nModes) modes already computed, e.g. loaded
+               from a result store
+    '''
+
+    __slots__ = ['coords', 'singVals', 'eigVect', 'patchName', 'nSnaps',
+                 'blockSize', 'blasThreads', '_u', '_phi', '_snapshotFile']
+
+    def __init__(self, coords, singVals, eigVect, u, patchName, nSnaps,
+                 blockSize=None, snapshotFile=None, blasThreads=None, modes=None):
+        self.coords    = np.asarray(coords)
+        self.singVals  = singVals
+        self.eigVect   = eigVect
+        self.patchName = patchName
+        self.nSnaps    = nSnaps
+        self.blockSize = blockSize
+        self.blasThreads = blasThreads
+
+        self._u   = u
+        self._phi = modes
+        self._snapshotFile = snapshotFile
+
+    @property
+    def nDim(self):
+        return self.coords.shape[0]
+
+    @property
+    def nPts(self):
+        return self.coords.shape[1]
+
+    @property
+    def nModes(self):
+        return self.singVals.size
+
+    @property
+    def modes(self):
+        '''(nDim, nPts, nModes) normalized POD modes'''
+        if self._phi is None:
+            if self._u is None:
+                raise RuntimeError('Oops! Snapshots released before the ' +
+                                   'modes were computed ...')
+            with blas_threads(self.blasThreads), stage('projection'):
+                self._phi = get_projected_modes(self._u, self.eigVect,
+                                                self.blockSize)
+
+        return self._phi
+
+    @property
+    def x1(self):
+        return self.coords[0]
+
+    @property
+    def x2(self):
+        return self.coords[1]
+
+    @property
+    def x3(self):
+        return self.coords[2]
+
+    @property
+    def phi1(self):
+        return self.modes[0]
+
+    @property
+    def phi2(self):
+        return self.modes[1]
+
+    @property
+    def phi3(self):
+        return self.modes[2]
+
+    def as_tuple(self):
+        '''returns the output of get_modes: coordinates, modes, singular
+        values, patch name and # of snapshots'''
+        return tuple(self.coords) + tuple(self.modes) + \
+               (self.singVals, self.patchName, self.nSnaps)
+
+    def close(self):
+        '''computes the modes if needed and releases the snapshots'''
+        try:
+            if self._u is not None:
+                self.modes
+                self._u = None
+
+        finally:
+            if self._snapshotFile is not None:
+                os.remove(self._snapshotFile)
+                self._snapshotFile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,100 @@
+import numpy as np
+import os
+import json
+from .pod_result import *
+
+__all__=["get_store_dir", "write_pod_store", "load_pod_store"]
+
+_storeFormat  = 'modalMethods-pod'
+_storeVersion = 1
+
+
+def get_store_dir(caseDir, patchName, nSnaps, nDim, method='POD'):
+    '''
+    Returns the directory of the results in postProcessing/<method>, named
+    like the csv files: <patchName>_<nSnaps> in 2d and 3d_<nSnaps> in 3d
+    '''
+
+    if nDim == 3:
+        name = '3d_' + str(nSnaps)
+    else:
+        name = patchName + '_' + str(nSnaps)
+
+    return os.path.join(caseDir, 'postProcessing', method, name)
+
+
+def write_pod_store(storeDir, coords, phi, singVals, patchName, nSnaps):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+        coords: list of coordinate arrays x1, x2(, x3)
+        phi: list of (nPts, nModes) POD modes in each direction
+        singVals: singular values
+        patchName: name of the sampled surface
+        nSnaps: # of snapshots
+
+    Output
+    ------
+        writes coords.npy (nDim, nPts), modes.npy (nModes, nDim, nPts), with
+        every mode stored contiguously, singVals.npy and a manifest.json
+    '''
+
+    os.makedirs(storeDir, exist_ok=True)
+
+    nDim = len(coords)
+    nPts, nModes = phi[0].shape
+
+    # the manifest is written last, a store without it is incomplete:
+    manifestFile = os.path.join(storeDir, 'manifest.json')
+    if os.path.exists(manifestFile):
+        os.remove(manifestFile)
+
+    np.save(os.path.join(storeDir, 'coords.npy'), np.asarray(coords))
+    np.save(os.path.join(storeDir, 'singVals.npy'), np.asarray(singVals))
+
+    modes = np.lib.format.open_memmap(os.path.join(storeDir, 'modes.npy'),
+                                      mode='w+', dtype=phi[0].dtype,
+                                      shape=(nModes, nDim, nPts))
+    for k in range(nDim):
+        modes[:, k, :] = phi[k].T
+    modes.flush()
+    del modes
+
+    manifest = {'format': _storeFormat, 'version': _storeVersion,
+                'patchName': patchName, 'nSnaps': int(nSnaps), 'nDim': nDim,
+                'nPts': int(nPts), 'nModes': int(nModes),
+                'arrays': {'coords': 'coords.npy', 'modes': 'modes.npy',
+                           'singVals': 'singVals.npy'}}
+
+    tmpFile = manifestFile + '.tmp'
+    with open(tmpFile, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmpFile, manifestFile)
+
+
+def load_pod_store(storeDir):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+
+    Output
+    ------
+        result: PODResult with memory-mapped coordinates and modes, only the
+                modes that are accessed are read from disk
+    '''
+
+    with open(os.path.join(storeDir, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != _storeFormat:
+        raise ValueError('\n ' + storeDir + ' is not a POD result store ...')
+
+    arrays = manifest['arrays']
+    coords = np.load(os.path.join(storeDir, arrays['coords']), mmap_mode='r')
+    modes  = np.load(os.path.join(storeDir, arrays['modes']), mmap_mode='r')
+    singVals = np.load(os.path.join(storeDir, arrays['singVals']))
+
+    return PODResult(coords, singVals, None, None, manifest['patchName'],
+                     manifest['nSnaps'], modes=modes.transpose(1, 2, 0))
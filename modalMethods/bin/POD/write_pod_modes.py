@@ -3,34 +3,46 @@ import numpy as np
 import argparse
 from modalMethods.readers.reader_support_functions import *
 from modalMethods.readers.reader import *
+from modalMethods.profiler import *
 from .pod_eval import *
-
-def main():
+from .pod_store import *
+from .pod_follow import *
+from .pod_quicklook import *
+from .pod_basic_plot import pod_basic_plot
+from .pod_quiver_plot import pod_quiver_plot
+from .pod_energy_plot import pod_energy_plot
+
+def write_modes(output, nDim, csv=False):
     '''
-    Writes the POD modes in the postProcessing directory
+    Input
+    -----
+        output: output of get_modes
+        nDim: # of dimensions
+        csv: also export the results as csv files
+
+    Output
+    ------
+        writes the coordinates, POD modes and singular values in
+        postProcessing/POD
     '''
-    # Parse the command-line arguments
-    parser = argparse.ArgumentParser(
-            description="Write POD modes and singular values in the postProcessing/POD. \
-                         Modes are arranged in decreasing singular value order.")
 
-    parser.add_argument('-config',
-                        type=str,
-                        help='The config file',
-                        required=True)
+    with stage('write'):
+        _write_modes(output, nDim, csv)
 
-    args = parser.parse_args()
 
-    # Parse the config
-    configFile = open(args.config, mode='r')
-    [configDict, _, _] = config_to_dict(configFile)
-    nDim       = int( configDict['nDim'] ) 
-    configFile.close()
+def _write_modes(output, nDim, csv):
+    coords, phi = output[:nDim], output[nDim:2*nDim]
+    singVals, patchName, nSnaps = output[2*nDim:]
 
-    configFile = open(args.config, mode='r')
+    print('\n writing POD modes ...')
+    storeDir = get_store_dir(os.getcwd(), patchName, nSnaps, nDim)
+    write_pod_store(storeDir, coords, phi, singVals, patchName, nSnaps)
+
+    if not csv:
+        return
 
     if nDim == 2:
-        [x1, x2, phi1, phi2, singVals, patchName, nSnaps] = get_modes(configFile)
+        [x1, x2, phi1, phi2, singVals, patchName, nSnaps] = output
 
         # make POD directory in postProcessing:
         podDir = './postProcessing'
@@ -41,7 +53,6 @@ def main():
             os.mkdir(podDir)
 
         # write the files:
-        print('\n writing POD modes ...')
         fname = podDir + '/x1_coord_' + patchName + '_' + str(nSnaps) + '.csv'
         np.savetxt(fname, x1, delimiter = ',', fmt='%1.4e')
 
@@ -58,7 +69,7 @@ def main():
         np.savetxt(fname, singVals, delimiter = ',', fmt='%1.4e')
         
     elif nDim == 3:
-        [x1, x2, x3, phi1, phi2, phi3, singVals, patchName, nSnaps] = get_modes(configFile)
+        [x1, x2, x3, phi1, phi2, phi3, singVals, patchName, nSnaps] = output
 
         # make POD directory in postProcessing:
         podDir = './postProcessing'
@@ -69,7 +80,6 @@ def main():
             os.mkdir(podDir)
 
         # write the files:
-        print('\n writing POD modes ...')
         fname = podDir + '/x1_coord_3d_' + str(nSnaps) + '.csv'
         np.savetxt(fname, x1, delimiter = ',', fmt='%1.4e')
 
@@ -94,5 +104,114 @@ def main():
     else:
         raise ValueError('Oops! number of dimensions not specified ...')
 
+
+def main(argv=None):
+    '''
+    Writes the POD modes in the postProcessing directory
+    '''
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(
+            description="Write POD modes and singular values in the postProcessing/POD. \
+                         Modes are arranged in decreasing singular value order.")
+
+    parser.add_argument('-config',
+                        type=str,
+                        help='The config file',
+                        required=True)
+
+    parser.add_argument('-nWorkers', '--nWorkers',
+                        type=int,
+                        help='# of processes used to import the snapshots',
+                        default=None)
+
+    parser.add_argument('-follow', '--follow',
+                        action='store_true',
+                        help='keep watching the case and update the modes as new \
+                              time directories are written')
+
+    parser.add_argument('-interval', '--interval',
+                        type=float,
+                        help='minimum time in seconds between two updates of the \
+                              modes in follow mode',
+                        default=None)
+
+    parser.add_argument('-quickLook', '--quickLook',
+                        action='store_true',
+                        help='approximate the modes from a subset of the points \
+                              and snapshots and estimate their error, written in \
+                              postProcessing/POD/quickLook')
+
+    parser.add_argument('-plot', '--plot',
+                        nargs='+',
+                        choices=['basic', 'quiver', 'energy'],
+                        help='plots to generate from the modes in the same run',
+                        default=[])
+
+    parser.add_argument('-csv', '--csv',
+                        action='store_true',
+                        help='also export the results as csv files')
+
+    parser.add_argument('-profile', '--profile',
+                        type=str,
+                        help='write the time, memory and throughput of each \
+                              stage in this JSON file',
+                        default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.profile is None:
+        _run(args)
+        return
+
+    with profile() as profiler:
+        _run(args)
+
+    profiler.write_report(args.profile)
+    print('\n profile written in ' + args.profile)
+
+
+def _run(args):
+    # Parse the config
+    configFile = open(args.config, mode='r')
+    [configDict, _, _] = config_to_dict(configFile)
+    nDim       = int( configDict['nDim'] ) 
+    csv        = args.csv or configDict.get('writeCSV', 'no') == 'yes'
+    configFile.close()
+
+    def write(output, nDim):
+        write_modes(output, nDim, csv)
+
+    configFile = open(args.config, mode='r')
+
+    if args.follow:
+        follow_modes(configFile, write, args.nWorkers, args.interval)
+        return
+
+    if args.quickLook:
+        result, errors = get_quicklook_result(configFile, args.nWorkers)
+        write_quicklook(result, errors)
+        return
+
+    result = get_pod_result(configFile, args.nWorkers)
+
+    # MPI ranks other than 0 of a distributed POD:
+    if result is None:
+        return
+
+    # the out-of-core snapshot file is removed even if writing fails:
+    try:
+        write(result.as_tuple(), nDim)
+
+        # plot the modes in memory instead of reading back the files:
+        plotFunctions = {'basic': pod_basic_plot, 'quiver': pod_quiver_plot,
+                         'energy': pod_energy_plot}
+        for plot in args.plot:
+            with open(args.config, mode='r') as configFile, stage('plot'):
+                plotFunctions[plot](configFile, result)
+
+    finally:
+        result.close()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,178 @@
+import numpy as np
+import os
+import multiprocessing as mp
+from modalMethods.readers.reader import *
+from modalMethods.profiler import *
+from modalMethods.bin.POD.pod_kernels import *
+from modalMethods.bin.POD.pod_eval import *
+from modalMethods.bin.POD.pod_store import *
+from modalMethods.bin.DMD.dmd_eval import get_snapshot_times
+from .spod_kernels import *
+from .spod_result import *
+from .spod_store import *
+
+__all__=["get_spod_setup", "get_spod_result"]
+
+# state shared by every task of a worker process:
+_workerState = dict()
+
+
+def get_spod_setup(configDict, nWorkers=None):
+    '''
+    Input
+    -----
+        configDict: dictionary of the config file entries
+        nWorkers: # of processes used to import the snapshots and solve the
+                  frequencies, overrides the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        setup: output of get_pod_setup with the SPOD entries: 'dt' (None to
+               take it from the time directories), 'nFFT', 'nOvlp',
+               'window' and 'freqs' (None for all the frequencies)
+    '''
+
+    setup = get_pod_setup(configDict, nWorkers)
+
+    setup['dt'] = float( configDict['dt'] ) if 'dt' in configDict else None
+
+    # Welch blocks, the default length is that of Towne et al. 2018:
+    nFFT = int( configDict.get('nFFT', 0) )
+    if nFFT == 0:
+        nFFT = 2**max(1, int( np.log2(setup['nSnaps']/10) ))
+    setup['nFFT']   = nFFT
+    setup['nOvlp']  = int( configDict.get('nOvlp', nFFT//2) )
+    setup['window'] = configDict.get('spodWindow', 'hamming')
+    setup['freqs']  = configDict.get('spodFreqs')
+
+    if setup['distributed']:
+        print('\n distributed SPOD is not supported, the frequencies are ' +
+              'solved in parallel instead ...')
+
+    return setup
+
+
+def _init_worker(fourierFile, shape, dtype, modesFile, mean, meanTransform,
+                 scale, nModes, blockSize, blasThreads):
+    _workerState['fourier'] = np.memmap(fourierFile, dtype=dtype, mode='r',
+                                        shape=shape)
+    _workerState['modes'] = np.load(modesFile, mmap_mode='r+')
+    _workerState['args'] = (mean, meanTransform, scale, nModes, blockSize,
+                            blasThreads)
+
+
+def _frequency_worker(i):
+    '''
+    centers, scales and solves the realizations of the frequency i, the
+    modes are written in the modes file and only the eigenvalues returned
+    '''
+    mean, meanTransform, scale, nModes, blockSize, blasThreads = \
+        _workerState['args']
+    modes = _workerState['modes']
+
+    with blas_threads(blasThreads):
+        eigVals, _ = get_spod_modes(_workerState['fourier'][i], nModes,
+                                    blockSize, meanTransform[i]*mean, scale[i],
+                                    modes[i].reshape(modes.shape[1], -1).T)
+
+    return eigVals
+
+
+def get_spod_result(configFile, nWorkers=None):
+    '''
+    Input
+    -----
+        configFile: path of configuration file
+        nWorkers: # of processes used to import the snapshots and solve the
+                  frequencies, overrides the 'nWorkers' entry of the config file
+
+    Output
+    ------
+        result: SPODResult
+
+    The snapshots are streamed from the time directories: only the last
+    nFFT are kept in memory and each Welch block is transformed as soon as
+    it is complete, at the requested frequencies only. The transforms of
+    the blocks go to a temporary file in postProcessing/SPOD, one
+    contiguous (nBlks, nDim*nPts) slab per frequency, and the
+    cross-spectral eigenproblem of every frequency is then solved in blocks
+    of points by the worker processes, which write the modes straight into
+    the modes.npy of the result store (see open_spod_modes).
+    '''
+
+    [configDict, modes, points] = config_to_dict(configFile)
+    setup = get_spod_setup(configDict, nWorkers)
+
+    patchName, nSnaps, nDim = setup['patchName'], setup['nSnaps'], setup['nDim']
+    nFFT, nWorkers = setup['nFFT'], setup['nWorkers']
+
+    coords, indices, nPts = read_window_points(setup)
+
+    with stage('listDirs'):
+        timeDirs, dt = get_snapshot_times(setup)
+
+    nBlks  = len( get_block_starts(nSnaps, nFFT, setup['nOvlp']) )
+    bins   = get_frequency_bins(setup['freqs'], nFFT, dt)
+    freqs  = bins/(nFFT*dt)
+    window = get_window(setup['window'], nFFT)
+
+    # complex64 transforms of single precision snapshots:
+    dtype = np.result_type(setup['precision'], np.complex64)
+    shape = (bins.size, nBlks, nDim*nPts)
+
+    spodDir = setup['caseDir'] + '/postProcessing/SPOD'
+    os.makedirs(spodDir, exist_ok=True)
+    fourierFile = spodDir + '/.fourier_' + patchName + '_' + str(nSnaps) + '.dat'
+
+    try:
+        fourier = np.memmap(fourierFile, dtype=dtype, mode='w+', shape=shape)
+        welch = WelchBlocks(nFFT, setup['nOvlp'], bins, window, fourier)
+
+        print('\n streaming Welch blocks ...')
+        with stage('streaming'):
+            for x in iter_snapshots(setup, indices, nPts, timeDirs):
+                welch.add_snapshot(x)
+                add_snapshots(1)
+        fourier.flush()
+
+        # one-sided spectral density, Towne et al. 2018 normalization:
+        scale = np.full(bins.size, dt/(np.sum(np.square(window))*nBlks))
+        scale[(bins > 0) & (2*bins < nFFT)] *= 2
+        scale = np.sqrt(scale)
+
+        # the modes of every frequency go straight to the result store:
+        storeDir = get_store_dir(setup['caseDir'], patchName, nSnaps, nDim,
+                                 'SPOD')
+        nModes = min(setup['nModes'], nBlks)
+        modes  = open_spod_modes(storeDir, bins.size, nModes, nDim, nPts)
+
+        mean, meanTransform = welch.mean, welch.get_mean_transform()
+        initArgs = (fourierFile, shape, dtype, modes.filename, mean,
+                    meanTransform, scale, nModes, setup['blockSize'],
+                    setup['blasThreads'])
+
+        print('\n solving ' + str(bins.size) + ' frequencies ...')
+        with stage('eigen'):
+            if nWorkers > 1 and bins.size > 1:
+                modes.flush()
+                with mp.Pool(min(nWorkers, bins.size), initializer=_init_worker,
+                             initargs=initArgs) as pool:
+                    eigVals = pool.map(_frequency_worker, range(bins.size),
+                                       chunksize=1)
+            else:
+                with blas_threads(setup['blasThreads']):
+                    eigVals = [get_spod_modes(fourier[i], nModes,
+                                              setup['blockSize'],
+                                              meanTransform[i]*mean, scale[i],
+                                              modes[i].reshape(nModes, -1).T)[0]
+                               for i in range(bins.size)]
+
+        del fourier, welch
+
+    finally:
+        if os.path.exists(fourierFile):
+            os.remove(fourierFile)
+
+    return SPODResult(coords, freqs, np.stack(eigVals),
+                      modes.transpose(0, 2, 3, 1), patchName, nSnaps, nFFT,
+                      nBlks)
@@ -0,0 +1,181 @@
+import numpy as np
+from modalMethods.bin.POD.pod_kernels import _get_blocks
+
+__all__=["get_window", "get_block_starts", "get_frequency_bins",
+         "WelchBlocks", "get_spod_modes"]
+
+_windows = {'hamming': np.hamming, 'hann': np.hanning, 'rect': np.ones}
+
+
+def get_window(name, nFFT):
+    '''returns the (nFFT,) window of the Welch blocks: hamming, hann or rect'''
+    if name not in _windows:
+        raise ValueError('\n spodWindow should be one of ' +
+                         ', '.join(_windows) + ' ...')
+
+    return _windows[name](nFFT)
+
+
+def get_block_starts(nSnaps, nFFT, nOvlp):
+    '''returns the first snapshot of every Welch block'''
+    if not 0 <= nOvlp < nFFT:
+        raise ValueError('\n nOvlp should be between 0 and nFFT - 1 ...')
+
+    starts = list( range(0, nSnaps - nFFT + 1, nFFT - nOvlp) )
+    if not starts:
+        raise ValueError('\n nFFT is larger than the # of snapshots ...')
+
+    return starts
+
+
+def get_frequency_bins(freqs, nFFT, dt):
+    '''
+    Input
+    -----
+        freqs: requested frequencies, None for all of them
+        nFFT: # of snapshots per block
+        dt: time between two snapshots
+
+    Output
+    ------
+        bins: indices k of the discrete frequencies k/(nFFT dt) closest to
+              the requested ones, 0 to nFFT/2
+    '''
+
+    if freqs is None:
+        return np.arange(nFFT//2 + 1)
+
+    bins = np.rint(np.asarray(freqs)*nFFT*dt).astype(int)
+    if np.any(bins < 0) or np.any(bins > nFFT//2):
+        raise ValueError('\n spodFreqs should be between 0 and the Nyquist ' +
+                         'frequency ' + str(0.5/dt) + ' ...')
+
+    # unique bins, in the requested order:
+    return bins[np.sort( np.unique(bins, return_index=True)[1] )]
+
+
+class WelchBlocks(object):
+    '''
+    Fourier transform in time of overlapping Welch blocks of a stream of
+    snapshots. Only the last nFFT snapshots are kept in a ring buffer;
+    every time a block is complete, its windowed transform at the requested
+    frequency bins is written in out. With all the bins the transform is an
+    FFT, otherwise a DFT at the requested bins only.
+
+    The snapshots are not centered: the transform of the long-time mean is
+    subtracted afterwards, see get_mean_transform.
+
+    Input
+    -----
+        nFFT: # of snapshots per block
+        nOvlp: # of snapshots shared by two consecutive blocks
+        bins: frequency bins, see get_frequency_bins
+        window: (nFFT,) window
+        out: (nFreq, nBlks, size of a snapshot) complex array receiving the
+             transforms, may be memory-mapped
+    '''
+
+    def __init__(self, nFFT, nOvlp, bins, window, out):
+        self.nFFT  = nFFT
+        self.step  = nFFT - nOvlp
+        self.bins  = np.asarray(bins)
+        self.window = window
+        self.out   = out
+        self.count = 0
+        self.nBlks = 0
+
+        self._buffer = None
+        self._sum    = None
+        self._allBins = np.array_equal(self.bins, np.arange(nFFT//2 + 1))
+
+        # windowed DFT coefficients, row j for the j-th snapshot of a block:
+        j = np.arange(nFFT)[:, None]
+        self._dft = window[:, None]*np.exp(-2j*np.pi*j*self.bins[None, :]/nFFT)
+
+    def add_snapshot(self, x):
+        '''adds the snapshot x, of any shape, after the previous one'''
+        x = np.asarray(x).ravel()
+
+        if self._buffer is None:
+            self._buffer = np.zeros((self.nFFT, x.size))
+            self._sum    = np.zeros(x.size)
+
+        self._buffer[self.count % self.nFFT] = x
+        self._sum += x
+        self.count += 1
+
+        start = self.count - self.nFFT
+        if start >= 0 and start % self.step == 0:
+            self._transform(start)
+
+    def _transform(self, start):
+        # snapshot j of the block is in row (start + j) % nFFT of the buffer:
+        shift = start % self.nFFT
+
+        if self._allBins:
+            block = np.roll(self._buffer, -shift, axis=0)*self.window[:, None]
+            qHat = np.fft.rfft(block, axis=0)
+        else:
+            qHat = np.dot(np.roll(self._dft, shift, axis=0).T, self._buffer)
+
+        self.out[:, self.nBlks] = qHat
+        self.nBlks += 1
+
+    @property
+    def mean(self):
+        '''long-time mean of the snapshots added so far'''
+        return self._sum/self.count
+
+    def get_mean_transform(self):
+        '''(nFreq,) transform of a constant unit signal over one block'''
+        return np.sum(self._dft, axis=0)
+
+
+def get_spod_modes(qHat, nModes, blockSize=None, offset=None, scale=1.0,
+                   out=None):
+    '''
+    Input
+    -----
+        qHat: (nBlks, n) Fourier realizations of the blocks at one frequency,
+              may be memory-mapped
+        nModes: # of modes
+        blockSize: # of points per block, chosen to keep blocks around
+                   64 MB if None
+        offset: (n,) transform of the mean subtracted from every realization
+        scale: factor applied to the centered realizations
+        out: (n, min(nModes, nBlks)) array, e.g. a view of the modes of a
+             result store, filled with the modes instead of a new array
+
+    Output
+    ------
+        eigVals: (nModes,) SPOD eigenvalues in decreasing order
+        modes: (n, nModes) complex SPOD modes of unit norm
+    '''
+
+    nBlks, n = qHat.shape
+    nModes = min(nModes, nBlks)
+    if not blockSize:
+        blockSize = max(1024, 2**22 // max(nBlks, 1))
+
+    def get_block(start, end):
+        block = np.array(qHat[:, start:end], dtype=np.complex128)
+        if offset is not None:
+            block -= offset[start:end]
+        block *= scale
+        return block
+
+    # cross-spectral density in the space of the blocks:
+    m = np.zeros((nBlks, nBlks), dtype=np.complex128)
+    for start, end in _get_blocks(n, blockSize):
+        block = get_block(start, end)
+        m += np.dot(block.conj(), block.T)
+
+    eigVals, eigVect = np.linalg.eigh(m)
+    eigVals, eigVect = eigVals[::-1][:nModes], eigVect[:, ::-1][:, :nModes]
+
+    coeff = eigVect/np.sqrt(np.maximum(eigVals, np.finfo(np.float64).tiny))
+    modes = np.zeros((n, nModes), dtype=np.complex128) if out is None else out
+    for start, end in _get_blocks(n, blockSize):
+        modes[start:end] = np.dot(get_block(start, end).T, coeff)
+
+    return eigVals, modes
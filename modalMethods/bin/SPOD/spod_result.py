@@ -0,0 +1,51 @@
+import numpy as np
+
+__all__=["SPODResult"]
+
+
+class SPODResult(object):
+    '''
+    Result of a spectral POD.
+
+    Input
+    -----
+        coords: (nDim, nPts) coordinates of the SPOD window
+        freqs: (nFreq,) frequencies of the modes
+        eigVals: (nFreq, nModes) SPOD eigenvalues of each frequency, in
+                 decreasing order
+        modes: (nFreq, nDim, nPts, nModes) complex SPOD modes of unit norm
+        patchName: name of the sampled surface
+        nSnaps: # of snapshots
+        nFFT: # of snapshots per Welch block
+        nBlks: # of Welch blocks
+    '''
+
+    __slots__ = ['coords', 'freqs', 'eigVals', 'modes', 'patchName', 'nSnaps',
+                 'nFFT', 'nBlks']
+
+    def __init__(self, coords, freqs, eigVals, modes, patchName, nSnaps, nFFT,
+                 nBlks):
+        self.coords    = np.asarray(coords)
+        self.freqs     = freqs
+        self.eigVals   = eigVals
+        self.modes     = modes
+        self.patchName = patchName
+        self.nSnaps    = nSnaps
+        self.nFFT      = nFFT
+        self.nBlks     = nBlks
+
+    @property
+    def nDim(self):
+        return self.coords.shape[0]
+
+    @property
+    def nPts(self):
+        return self.coords.shape[1]
+
+    @property
+    def nFreq(self):
+        return self.freqs.size
+
+    @property
+    def nModes(self):
+        return self.eigVals.shape[1]
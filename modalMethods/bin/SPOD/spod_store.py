@@ -0,0 +1,116 @@
+import numpy as np
+import os
+import json
+from .spod_result import *
+
+__all__=["open_spod_modes", "write_spod_store", "load_spod_store"]
+
+_storeFormat  = 'modalMethods-spod'
+_storeVersion = 1
+
+
+def open_spod_modes(storeDir, nFreq, nModes, nDim, nPts):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+        nFreq, nModes, nDim, nPts: shape of the modes
+
+    Output
+    ------
+        modes: (nFreq, nModes, nDim, nPts) complex memmap of a new modes.npy,
+               filled by the caller and then passed to write_spod_store in
+               an SPODResult; the store is incomplete until then
+    '''
+
+    os.makedirs(storeDir, exist_ok=True)
+
+    manifestFile = os.path.join(storeDir, 'manifest.json')
+    if os.path.exists(manifestFile):
+        os.remove(manifestFile)
+
+    return np.lib.format.open_memmap(os.path.join(storeDir, 'modes.npy'),
+                                     mode='w+', dtype=np.complex128,
+                                     shape=(nFreq, nModes, nDim, nPts))
+
+
+def write_spod_store(storeDir, result):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+        result: SPODResult
+
+    Output
+    ------
+        writes coords.npy (nDim, nPts), modes.npy (nFreq, nModes, nDim, nPts),
+        with every mode stored contiguously, freqs.npy, eigVals.npy
+        (nFreq, nModes) and a manifest.json; modes.npy is kept as is if
+        the modes are already mapped from it (see open_spod_modes)
+    '''
+
+    os.makedirs(storeDir, exist_ok=True)
+
+    # the manifest is written last, a store without it is incomplete:
+    manifestFile = os.path.join(storeDir, 'manifest.json')
+    if os.path.exists(manifestFile):
+        os.remove(manifestFile)
+
+    np.save(os.path.join(storeDir, 'coords.npy'), result.coords)
+    np.save(os.path.join(storeDir, 'freqs.npy'), result.freqs)
+    np.save(os.path.join(storeDir, 'eigVals.npy'), result.eigVals)
+
+    modesFile = os.path.abspath(os.path.join(storeDir, 'modes.npy'))
+    if getattr(result.modes, 'filename', None) == modesFile:
+        result.modes.flush()
+    else:
+        modes = np.lib.format.open_memmap(modesFile, mode='w+',
+                                          dtype=result.modes.dtype,
+                                          shape=(result.nFreq, result.nModes,
+                                                 result.nDim, result.nPts))
+        for i in range(result.nFreq):
+            for k in range(result.nDim):
+                modes[i, :, k, :] = result.modes[i, k].T
+        modes.flush()
+        del modes
+
+    manifest = {'format': _storeFormat, 'version': _storeVersion,
+                'patchName': result.patchName, 'nSnaps': int(result.nSnaps),
+                'nFFT': int(result.nFFT), 'nBlks': int(result.nBlks),
+                'nDim': result.nDim, 'nPts': int(result.nPts),
+                'nFreq': int(result.nFreq), 'nModes': int(result.nModes),
+                'arrays': {'coords': 'coords.npy', 'modes': 'modes.npy',
+                           'freqs': 'freqs.npy', 'eigVals': 'eigVals.npy'}}
+
+    tmpFile = manifestFile + '.tmp'
+    with open(tmpFile, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmpFile, manifestFile)
+
+
+def load_spod_store(storeDir):
+    '''
+    Input
+    -----
+        storeDir: directory of the results, see get_store_dir
+
+    Output
+    ------
+        result: SPODResult with memory-mapped coordinates and modes
+    '''
+
+    with open(os.path.join(storeDir, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != _storeFormat:
+        raise ValueError('\n ' + storeDir + ' is not a SPOD result store ...')
+
+    arrays = manifest['arrays']
+    coords = np.load(os.path.join(storeDir, arrays['coords']), mmap_mode='r')
+    modes  = np.load(os.path.join(storeDir, arrays['modes']), mmap_mode='r')
+    freqs   = np.load(os.path.join(storeDir, arrays['freqs']))
+    eigVals = np.load(os.path.join(storeDir, arrays['eigVals']))
+
+    return SPODResult(coords, freqs, eigVals, modes.transpose(0, 2, 3, 1),
+                      manifest['patchName'], manifest['nSnaps'],
+                      manifest['nFFT'], manifest['nBlks'])
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+import argparse
+from modalMethods.profiler import *
+from modalMethods.bin.POD.pod_store import *
+from .spod_eval import *
+from .spod_store import *
+
+
+def write_spod_modes(result):
+    '''
+    Input
+    -----
+        result: SPODResult
+
+    Output
+    ------
+        writes the coordinates, frequencies, SPOD modes and eigenvalues in
+        postProcessing/SPOD/<patchName>_<nSnaps> (3d_<nSnaps> in 3d)
+    '''
+
+    with stage('write'):
+        print('\n writing SPOD modes ...')
+        storeDir = get_store_dir(os.getcwd(), result.patchName, result.nSnaps,
+                                 result.nDim, 'SPOD')
+        write_spod_store(storeDir, result)
+
+    print('\n  frequency   leading eigenvalue   fraction of the energy')
+    for i in range(result.nFreq):
+        eigVals = result.eigVals[i]
+        print('  %11.4e   %11.4e          %6.3f'
+              % (result.freqs[i], eigVals[0], eigVals[0]/max(np.sum(eigVals),
+                                                             np.finfo(float).tiny)))
+
+
+def main(argv=None):
+    '''
+    Writes the SPOD modes in the postProcessing directory
+    '''
+    # Parse the command-line arguments
+    parser = argparse.ArgumentParser(
+            description="Write SPOD modes, frequencies and eigenvalues in \
+                         postProcessing/SPOD. Modes of each frequency are \
+                         arranged in decreasing eigenvalue order.")
+
+    parser.add_argument('-config',
+                        type=str,
+                        help='The config file',
+                        required=True)
+
+    parser.add_argument('-nWorkers', '--nWorkers',
+                        type=int,
+                        help='# of processes used to import the snapshots and \
+                              solve the frequencies',
+                        default=None)
+
+    parser.add_argument('-profile', '--profile',
+                        type=str,
+                        help='write the time, memory and throughput of each \
+                              stage in this JSON file',
+                        default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.profile is None:
+        _run(args)
+        return
+
+    with profile() as profiler:
+        _run(args)
+
+    profiler.write_report(args.profile)
+    print('\n profile written in ' + args.profile)
+
+
+def _run(args):
+    with open(args.config, mode='r') as configFile:
+        result = get_spod_result(configFile, args.nWorkers)
+
+    write_spod_modes(result)
+
+
+if __name__ == "__main__":
+    main()
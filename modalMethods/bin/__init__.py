@@ -1,3 +1,10 @@
-from . import POD
+import importlib
 
-__all__ = ["POD"]
+__all__ = ["POD", "DMD", "SPOD"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
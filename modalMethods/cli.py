@@ -0,0 +1,106 @@
+'''
+Single command line entry point: modalMethods <command> [options]. The
+module of a command is only imported when the command is run, and the
+modules themselves import matplotlib, scipy and tqdm inside the functions
+that need them, so that short runs (e.g. from batch job arrays) start fast.
+'''
+
+import sys
+import argparse
+import importlib
+
+__all__=["main", "run_command"]
+
+# command: (module with a main(argv) function, help):
+_commands = {
+    'pod':         ('modalMethods.bin.POD.write_pod_modes',
+                    'compute the POD modes and write them in postProcessing/POD'),
+    'basic-plot':  ('modalMethods.bin.POD.pod_basic_plot',
+                    'plot the POD modes of each direction'),
+    'quiver-plot': ('modalMethods.bin.POD.pod_quiver_plot',
+                    'quiver plots of the POD modes'),
+    'energy-plot': ('modalMethods.bin.POD.pod_energy_plot',
+                    'plot the energy of the POD modes'),
+    'project':     ('modalMethods.bin.POD.pod_projection',
+                    'project time directories on the POD modes (temporal coefficients)'),
+    'dmd':         ('modalMethods.bin.DMD.write_dmd_modes',
+                    'compute the DMD modes and write them in postProcessing/DMD'),
+    'spod':        ('modalMethods.bin.SPOD.write_spod_modes',
+                    'compute the SPOD modes and write them in postProcessing/SPOD'),
+}
+
+
+def run_command(command, argv=None):
+    '''
+    Input
+    -----
+        command: name of the command, see modalMethods -h
+        argv: command line arguments of the command, sys.argv[1:] if None
+    '''
+
+    if command not in _commands:
+        raise ValueError('\n unknown command ' + command + ' ...')
+
+    module = importlib.import_module(_commands[command][0])
+
+    return module.main(argv)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    epilog = 'commands:\n' + '\n'.join('  %-13s %s' % (name, info[1])
+                                       for name, info in _commands.items())
+
+    parser = argparse.ArgumentParser(
+            prog='modalMethods',
+            description="Modal decomposition of OpenFOAM cases.",
+            epilog=epilog + '\n\nrun modalMethods <command> -h for the options of a command',
+            formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument('command',
+                        choices=list(_commands),
+                        metavar='command',
+                        help='one of the commands below')
+
+    parser.add_argument('args',
+                        nargs=argparse.REMAINDER,
+                        help='options of the command')
+
+    args = parser.parse_args(argv)
+
+    return run_command(args.command, args.args)
+
+
+# entry points of the individual tools:
+def write_pod_modes():
+    return run_command('pod')
+
+
+def pod_basic_plot():
+    return run_command('basic-plot')
+
+
+def pod_quiver_plot():
+    return run_command('quiver-plot')
+
+
+def pod_energy_plot():
+    return run_command('energy-plot')
+
+
+def pod_project():
+    return run_command('project')
+
+
+def write_dmd_modes():
+    return run_command('dmd')
+
+
+def write_spod_modes():
+    return run_command('spod')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+'''
+Instrumentation of the POD pipeline: wall time of each stage, peak RSS,
+bytes read and throughput. Nothing is recorded unless a Profiler is active,
+the stage() calls in the pipeline then return a shared no-op context.
+
+    with profile(hooks=[print_hook]) as prof:
+        get_modes(configFile)
+    prof.write_report('report.json')
+'''
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+__all__=["Profiler", "profile", "get_profiler", "stage", "add_bytes",
+         "add_snapshots", "get_peak_rss", "print_hook"]
+
+# active profiler, None when profiling is disabled:
+_profiler = None
+
+
+class _NullStage(object):
+    '''context manager doing nothing, used when profiling is disabled'''
+    __slots__ = []
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_nullStage = _NullStage()
+
+
+def get_peak_rss():
+    '''
+    returns the peak resident set size in bytes of this process and of its
+    finished child processes (e.g. the import workers), None where the
+    resource module is not available
+    '''
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is in kilobytes on linux and in bytes on macOS:
+    scale = 1 if os.uname().sysname == 'Darwin' else 1024
+    own   = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    return scale*own, scale*child
+
+
+class _Stage(object):
+    '''times one stage of the active profiler'''
+    __slots__ = ['profiler', 'name', 'tStart']
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._start(self.name)
+        self.tStart = time.perf_counter()
+        return self.profiler.stages[self.name]
+
+    def __exit__(self, *exc):
+        self.profiler._end(self.name, time.perf_counter() - self.tStart)
+        return False
+
+
+class Profiler(object):
+    '''
+    Records the stages of a run. Each stage holds its total wall time, the
+    # of calls, the bytes read, the # of snapshots processed and the peak
+    RSS of the process at its end. Stages may be nested, the time of a
+    stage includes that of the stages run inside it.
+
+    Input
+    -----
+        hooks: list of functions hook(event, name, record) called with
+               event 'start' and 'end' around every stage, record being
+               the dictionary of the stage
+    '''
+
+    def __init__(self, hooks=None):
+        self.stages = dict()
+        self.hooks  = list(hooks or [])
+        self._stack = []
+        self.tStart = time.perf_counter()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def _start(self, name):
+        record = self.stages.setdefault(name, {'time': 0.0, 'calls': 0,
+                                               'bytesRead': 0, 'snapshots': 0})
+        self._stack.append(name)
+        for hook in self.hooks:
+            hook('start', name, record)
+
+    def _end(self, name, elapsed):
+        self._stack.pop()
+        record = self.stages[name]
+        record['time']  += elapsed
+        record['calls'] += 1
+        peakRSS = get_peak_rss()
+        record['peakRSS'] = peakRSS and peakRSS[0]
+        for hook in self.hooks:
+            hook('end', name, record)
+
+    def _current(self):
+        '''record of the innermost running stage'''
+        if not self._stack:
+            return self.stages.setdefault('other', {'time': 0.0, 'calls': 0,
+                                                    'bytesRead': 0, 'snapshots': 0})
+        return self.stages[self._stack[-1]]
+
+    def report(self):
+        '''
+        returns the stages, with the throughput of the stages that read
+        snapshots or bytes, the total wall time and the peak RSS
+        '''
+        stages = dict()
+        for name, record in self.stages.items():
+            record = dict(record)
+            if record['snapshots'] and record['time'] > 0:
+                record['snapshotsPerSec'] = record['snapshots']/record['time']
+            if record['bytesRead'] and record['time'] > 0:
+                record['bytesPerSec'] = record['bytesRead']/record['time']
+            stages[name] = record
+
+        peakRSS = get_peak_rss()
+
+        return {'wallTime': time.perf_counter() - self.tStart,
+                'peakRSS': peakRSS and peakRSS[0],
+                'peakRSSChildren': peakRSS and peakRSS[1],
+                'stages': stages}
+
+    def write_report(self, fname):
+        '''writes the report as JSON in fname'''
+        with open(fname, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def get_profiler():
+    '''returns the active Profiler, None if profiling is disabled'''
+    return _profiler
+
+
+@contextmanager
+def profile(profiler=None, hooks=None):
+    '''
+    activates profiler, or a new Profiler with hooks, inside the context
+    '''
+    global _profiler
+
+    if profiler is None:
+        profiler = Profiler(hooks)
+
+    previous, _profiler = _profiler, profiler
+    try:
+        yield profiler
+    finally:
+        _profiler = previous
+
+
+def stage(name):
+    '''
+    returns a context manager timing the stage name of the active profiler,
+    a shared no-op context if profiling is disabled
+    '''
+    if _profiler is None:
+        return _nullStage
+
+    return _Stage(_profiler, name)
+
+
+def add_bytes(nBytes):
+    '''adds nBytes read to the innermost running stage'''
+    if _profiler is not None:
+        _profiler._current()['bytesRead'] += int(nBytes)
+
+
+def add_snapshots(nSnaps):
+    '''adds nSnaps snapshots processed to the innermost running stage'''
+    if _profiler is not None:
+        _profiler._current()['snapshots'] += int(nSnaps)
+
+
+def print_hook(event, name, record):
+    '''hook printing the time of every stage when it ends'''
+    if event == 'end':
+        print('\n [profile] %s: %.3f s' % (name, record['time']))
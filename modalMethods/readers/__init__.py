@@ -2,9 +2,22 @@
 Module containing functions for reading in data from various file formats
 '''
 
+from .foam_file import *
+from .parse_cache import *
+from .region import *
+from .time_catalog import *
 from .reader_support_functions import *
+from .parallel_reader import *
 from .reader import *
+from .decomposed import *
 
-__all__ = ["reader_support_functions", "reader"]
+__all__ = ["foam_file", "parse_cache", "region", "time_catalog", "reader_support_functions", "parallel_reader",
+           "reader", "decomposed"]
+__all__.extend(foam_file.__all__)
+__all__.extend(parse_cache.__all__)
+__all__.extend(region.__all__)
+__all__.extend(time_catalog.__all__)
 __all__.extend(reader_support_functions.__all__)
+__all__.extend(parallel_reader.__all__)
 __all__.extend(reader.__all__)
+__all__.extend(decomposed.__all__)
@@ -0,0 +1,232 @@
+import numpy as np
+import os
+import re
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from .foam_file import *
+from .parse_cache import *
+from .region import *
+from .reader_support_functions import *
+from .parallel_reader import *
+from ..profiler import *
+
+__all__=["get_processor_dirs", "read_cell_proc_addressing",
+         "read_decomposed_points", "read_decomposed_velocity"]
+
+_processorRegex = re.compile(r'processor(\d+)$')
+
+# state shared by every task of a worker process:
+_workerState = dict()
+
+
+def get_processor_dirs(caseDir):
+    '''
+    Returns the processorN directories of a decomposed case sorted by N
+    '''
+
+    dirs = []
+    for name in os.listdir(caseDir):
+        match = _processorRegex.match(name)
+        if match and os.path.isdir(os.path.join(caseDir, name)):
+            dirs.append( (int(match.group(1)), os.path.join(caseDir, name)) )
+
+    if not dirs:
+        raise ValueError('\n no processor directories in ' + caseDir + ' ...')
+
+    return [path for _, path in sorted(dirs)]
+
+
+def read_cell_proc_addressing(procDir):
+    '''
+    Returns the global index of every cell of the subdomain from
+    constant/polyMesh/cellProcAddressing, None if the file does not exist
+    '''
+
+    fname = os.path.join(procDir, 'constant', 'polyMesh', 'cellProcAddressing')
+    if not os.path.exists(fname):
+        return None
+
+    return np.asarray( read_foam_field(fname, np.int64) )[:, 0]
+
+
+def _read_processor_points(job):
+    '''
+    reads the cell centres of one subdomain and selects the points in the
+    POD window, returns their local indices, coordinates and global indices
+    '''
+    procDir, timeDir, window, shapes, h, cache = job
+
+    fname = os.path.join(procDir, timeDir, 'cellCentres')
+    coordData = read_cached_field(fname, cache)/h
+
+    if cache is not None and use_region_index(coordData, window, shapes):
+        key   = cache.get_key(fname, 'regionIndex', h)
+        index = get_region_index(coordData, cache, key)
+    else:
+        index = None
+    indices, nPts = select_region(coordData, window, shapes, index)
+
+    address = read_cell_proc_addressing(procDir)
+    if address is not None:
+        address = address[indices]
+
+    return indices, coordData[indices], address
+
+
+def read_decomposed_points(caseDir, nSnaps, minX, maxX, h, nDim, cache=None,
+                           roi=None, nWorkers=1, timeSelection=None):
+    '''
+    Input
+    -----
+        caseDir: case directory with the processorN directories
+        nSnaps: # of snapshots, the points are read from the first one
+        minX, maxX: lower and upper bounds of the POD window
+        h: non-dimensionalization length
+        nDim: # of dimensions, only 3d cases are decomposed
+        cache: ParseCache of parsed files, None to always parse the files
+        roi: list of (name, values) regions of interest, see get_roi_shapes
+        nWorkers: # of processes reading the subdomains
+        timeSelection: timeStart, timeEnd and stride of the snapshots, see
+                       get_time_dirs
+
+    Output
+    ------
+        x1, x2, x3: coordinates of the points in the POD window
+        plan: list of (processor directory, local indices, rows), the
+              points of each subdomain in the window and their rows in the
+              snapshot matrix
+        nPts: # of points in the POD window
+
+    The points are ordered by their global cell index from
+    processorN/constant/polyMesh/cellProcAddressing, the order of the
+    reconstructed case, or by processor and local index if any subdomain
+    has no addressing.
+    '''
+
+    if nDim != 3:
+        raise ValueError('\n only 3d cases can be read decomposed ...')
+
+    procDirs = get_processor_dirs(caseDir)
+
+    with stage('listDirs'):
+        timeDir = str( get_time_dirs(procDirs[0], nSnaps, timeSelection, 'U')[0] )
+
+    window = get_window(minX, maxX, nDim)
+    shapes = get_roi_shapes(roi, nDim)
+    jobs = [(procDir, timeDir, window, shapes, h, cache) for procDir in procDirs]
+
+    with stage('readPoints'):
+        if nWorkers > 1:
+            with mp.Pool(min(nWorkers, len(jobs))) as pool:
+                parts = pool.map(_read_processor_points, jobs)
+        else:
+            parts = [_read_processor_points(job) for job in jobs]
+
+    # stable global ordering of the points in the window:
+    if all(address is not None for _, _, address in parts):
+        globalIds = np.concatenate([address for _, _, address in parts])
+        order = np.argsort(globalIds, kind='stable')
+    else:
+        order = np.arange( sum(len(indices) for indices, _, _ in parts) )
+
+    rows = np.empty_like(order)
+    rows[order] = np.arange(order.size)
+
+    plan, start = [], 0
+    for procDir, (indices, _, _) in zip(procDirs, parts):
+        plan.append( (procDir, indices, rows[start:start + len(indices)]) )
+        start += len(indices)
+
+    coords = np.concatenate([coords for _, coords, _ in parts])[order]
+
+    return coords[:, 0], coords[:, 1], coords[:, 2], plan, order.size
+
+
+def _init_worker(shmName, snapshotFile, shape, dtype, timeDirs, cache):
+    if snapshotFile is not None:
+        _workerState['u'] = open_snapshot_memmap(snapshotFile, shape, dtype)
+    else:
+        shm = SharedMemory(name=shmName)
+        _workerState['shm'] = shm
+        _workerState['u'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    _workerState['timeDirs'] = timeDirs
+    _workerState['cache'] = cache
+
+
+def _read_processor_velocity(job, u=None, timeDirs=None, cache=None):
+    '''reads every snapshot of one subdomain into its rows of u'''
+    procDir, indices, rows = job
+    if u is None:
+        u, timeDirs, cache = (_workerState['u'], _workerState['timeDirs'],
+                              _workerState['cache'])
+
+    for i, t in enumerate(timeDirs):
+        fname = os.path.join(procDir, str(t), 'U')
+        u[:, rows, i] = read_snapshot(fname, indices, [0, 1, 2], cache, u.dtype)
+
+    return len(timeDirs)
+
+
+def read_decomposed_velocity(plan, nSnaps, u, nWorkers=1, cache=None,
+                             timeSelection=None):
+    '''
+    Input
+    -----
+        plan: output of read_decomposed_points
+        nSnaps: # of snapshots
+        u: (3, nPts, nSnaps) array filled with the snapshots, the workers
+           write straight into it if it is a snapshot memmap or a
+           SharedArray (see get_shared_array), otherwise into a shared copy
+        nWorkers: # of processes, each reads whole subdomains
+        cache: ParseCache used to skip parsing previously read files
+        timeSelection: timeStart, timeEnd and stride of the snapshots, see
+                       get_time_dirs
+
+    Output
+    ------
+        u: the snapshot matrix
+    '''
+
+    with stage('listDirs'):
+        timeDirs = get_time_dirs(plan[0][0], nSnaps, timeSelection, 'U')
+
+    print('\n importing velocity snapshots ...')
+
+    with stage('readSnapshots'):
+        if nWorkers <= 1:
+            for job in plan:
+                _read_processor_velocity(job, u, timeDirs, cache)
+
+        elif isinstance(u, np.memmap) and u.filename is not None:
+            u.flush()
+            _run_pool(plan, nWorkers, (None, u.filename, u.shape, u.dtype,
+                                       timeDirs, cache))
+
+        elif get_shared_name(u) is not None:
+            _run_pool(plan, nWorkers, (get_shared_name(u), None, u.shape,
+                                       u.dtype, timeDirs, cache))
+
+        else:
+            shm = SharedMemory(create=True, size=max(u.nbytes, 1))
+            try:
+                uShared = np.ndarray(u.shape, dtype=u.dtype, buffer=shm.buf)
+                _run_pool(plan, nWorkers, (shm.name, None, u.shape, u.dtype,
+                                           timeDirs, cache))
+                u[...] = uShared
+                del uShared
+            finally:
+                shm.close()
+                shm.unlink()
+
+        add_snapshots(nSnaps)
+
+    return u
+
+
+def _run_pool(plan, nWorkers, initArgs):
+    # the largest subdomains first, so that the load stays balanced:
+    jobs = sorted(plan, key=lambda job: -len(job[1]))
+    with mp.Pool(min(nWorkers, len(jobs)), initializer=_init_worker,
+                 initargs=initArgs) as pool:
+        pool.map(_read_processor_velocity, jobs, chunksize=1)
@@ -0,0 +1,301 @@
+import numpy as np
+import re
+
+__all__=["read_foam_header", "read_foam_field", "get_row_runs", "read_foam_rows",
+         "pop_bytes_read"]
+
+# number of components for the OpenFOAM primitive types
+_nComponents = {'label': 1, 'scalar': 1, 'vector': 3, 'sphericalTensor': 1,
+                'symmTensor': 6, 'tensor': 9}
+
+_headerRegex   = re.compile(rb'FoamFile\s*\{(.*?)\}', re.DOTALL)
+_entryRegex    = re.compile(rb'(\w+)\s+("[^"]*"|[^;]*);')
+_internalRegex = re.compile(rb'internalField\s+(nonuniform\s+List<(\w+)>|uniform)'
+                            rb'\s*(\d*)\s*\(')
+_listRegex     = re.compile(rb'(?:^|\n)[ \t]*(\d+)\s*\(')
+
+# strips the brackets of vector/tensor entries in ascii files
+_bracketTable = bytes.maketrans(b'()', b'  ')
+
+# size of the chunks read from ascii files until the last requested row:
+_chunkSize = 1 << 24
+
+# bytes of field files read by this process, see pop_bytes_read:
+_bytesRead = 0
+
+
+def pop_bytes_read():
+    '''returns the bytes of field files read by this process since the last call'''
+    global _bytesRead
+
+    nBytes, _bytesRead = _bytesRead, 0
+
+    return nBytes
+
+
+def _get_data_type(className):
+    '''
+    returns the primitive type ('vector', 'scalar', ...) of an OpenFOAM class
+    name such as 'volVectorField' or 'labelList'
+    '''
+    className = className.lower()
+    for dataType in ['symmTensor', 'sphericalTensor', 'tensor', 'vector',
+                     'scalar', 'label']:
+        if dataType.lower() in className:
+            return dataType
+
+    return None
+
+
+def _count_ascii_cols(buf):
+    '''
+    returns the number of components of the first entry of an ascii list
+    '''
+    buf = buf.lstrip()
+    if not buf.startswith(b'('):
+        return 1
+
+    return len( buf[1:buf.index(b')')].split() )
+
+
+def _get_binary_dtype(header):
+    '''
+    returns the numpy dtype of the entries of a binary field from the 'arch'
+    entry of the FoamFile header, e.g. "LSB;label=32;scalar=64"
+    '''
+    arch = dict(label='32', scalar='64')
+    for entry in (header['arch'] or 'LSB').split(';'):
+        key, _, value = entry.partition('=')
+        arch[key.strip()] = value.strip()
+
+    byteOrder = '>' if 'MSB' in arch else '<'
+    if header['dataType'] == 'label':
+        return np.dtype(byteOrder + 'i' + str(int(arch['label'])//8))
+
+    return np.dtype(byteOrder + 'f' + str(int(arch['scalar'])//8))
+
+
+def read_foam_header(fname):
+    '''
+    Input
+    -----
+        fname: path of an OpenFOAM field file (with or without FoamFile header)
+
+    Output
+    ------
+        header: dictionary with the FoamFile entries ('format', 'class',
+                'object', 'arch') and the layout of the field list:
+                'nPts' (# of entries), 'nComp' (# of components per entry),
+                'dataType' and 'offset' (byte offset of the first entry)
+    '''
+
+    global _bytesRead
+
+    chunkSize = 1 << 16
+    with open(fname, 'rb') as f:
+        while True:
+            buf  = f.read(chunkSize)
+            size = len(buf)
+            f.seek(0)
+
+            match = _headerRegex.search(buf)
+            start = match.end() if match else 0
+
+            internal = _internalRegex.search(buf, start)
+            if internal is not None:
+                listMatch = internal
+            elif b'internalField' in buf:
+                listMatch = None
+            else:
+                listMatch = _listRegex.search(buf, start)
+
+            # found the start of the list, or read the whole file:
+            if (listMatch is not None) or (size < chunkSize):
+                break
+
+            chunkSize *= 4
+
+    header = {'format': 'ascii', 'class': None, 'object': None, 'arch': None}
+    if match:
+        for key, value in _entryRegex.findall(match.group(1)):
+            header[key.decode()] = value.decode().strip().strip('"')
+
+    if listMatch is None:
+        raise ValueError('\n could not find a field list in ' + fname + ' ...')
+
+    if internal is not None:
+        if internal.group(2) is None:
+            raise ValueError('\n uniform internalField in ' + fname +
+                             ' is not supported ...')
+        dataType = internal.group(2).decode()
+        nPts     = int( internal.group(3) )
+    else:
+        dataType = _get_data_type(header['class'] or '')
+        nPts     = int( listMatch.group(1) )
+
+    offset = listMatch.end()
+
+    # the entries are counted by the readers of the list:
+    _bytesRead += offset
+
+    if dataType is None:
+        if header['format'] != 'ascii':
+            raise ValueError('\n unknown data type in ' + fname + ' ...')
+        nComp = _count_ascii_cols(buf[offset:])
+    else:
+        nComp = _nComponents[dataType]
+
+    header['dataType'] = dataType
+    header['nPts']     = nPts
+    header['nComp']    = nComp
+    header['offset']   = offset
+
+    return header
+
+
+def read_foam_field(fname, dtype=np.float64, header=None):
+    '''
+    Input
+    -----
+        fname: path of an OpenFOAM field file
+        dtype: data type of the returned array
+        header: output of read_foam_header, read from fname if not given
+
+    Output
+    ------
+        data: (nPts, nComp) array of the field values, binary files are
+              memory-mapped and only copied if dtype differs from the file
+    '''
+    global _bytesRead
+
+    if header is None:
+        header = read_foam_header(fname)
+
+    nPts, nComp = header['nPts'], header['nComp']
+
+    if header['format'] == 'binary':
+        data = np.memmap(fname, dtype=_get_binary_dtype(header), mode='r',
+                         offset=header['offset'], shape=(nPts, nComp))
+        _bytesRead += data.nbytes
+
+        if data.dtype != np.dtype(dtype):
+            data = data.astype(dtype)
+
+        return data
+
+    with open(fname, 'rb') as f:
+        f.seek(header['offset'])
+        buf = f.read()
+    _bytesRead += len(buf)
+
+    # parse all the entries in a single pass:
+    buf  = buf.translate(_bracketTable)
+    data = np.fromstring(buf, dtype=dtype, sep=' ', count=nPts*nComp)
+
+    if data.size != nPts*nComp:
+        raise ValueError('\n expected ' + str(nPts*nComp) + ' values in ' +
+                         fname + ', found ' + str(data.size) + ' ...')
+
+    return data.reshape(nPts, nComp)
+
+
+def get_row_runs(indices):
+    '''
+    Input
+    -----
+        indices: indices of the rows to read
+
+    Output
+    ------
+        runs: (nRuns, 2) start and end of the runs of consecutive rows,
+              in increasing order
+        inverse: position of every index in the rows of the runs
+    '''
+
+    rows, inverse = np.unique(np.asarray(indices, dtype=np.int64),
+                              return_inverse=True)
+    if rows.size == 0:
+        return np.zeros((0, 2), dtype=np.int64), inverse
+
+    breaks = np.flatnonzero(np.diff(rows) != 1) + 1
+    starts = rows[np.concatenate(([0], breaks))]
+    ends   = rows[np.concatenate((breaks - 1, [rows.size - 1]))] + 1
+
+    return np.stack([starts, ends], axis=1), inverse
+
+
+def read_foam_rows(fname, runs, dtype=np.float64, header=None):
+    '''
+    Input
+    -----
+        fname: path of an OpenFOAM field file
+        runs: output of get_row_runs
+        dtype: data type of the returned array
+        header: output of read_foam_header, read from fname if not given
+
+    Output
+    ------
+        data: (# of rows, nComp) array of the rows of the runs, in order;
+              None if the ascii list is not written one entry per line
+
+    The rows of binary files are read at their byte offsets. Ascii lines
+    have no fixed width, so the newlines of the file are located in one
+    vectorized scan up to the last requested row, and only the lines of
+    the runs are parsed.
+    '''
+    global _bytesRead
+
+    if header is None:
+        header = read_foam_header(fname)
+
+    nPts, nComp = header['nPts'], header['nComp']
+    nRows = int( np.sum(runs[:, 1] - runs[:, 0]) )
+
+    if runs.size and runs[-1, 1] > nPts:
+        raise ValueError('\n row ' + str(runs[-1, 1] - 1) + ' out of the ' +
+                         str(nPts) + ' entries of ' + fname + ' ...')
+
+    if header['format'] == 'binary':
+        # entry i is at offset + i*nComp*itemsize, only the pages of the
+        # runs are read:
+        field = np.memmap(fname, dtype=_get_binary_dtype(header), mode='r',
+                          offset=header['offset'], shape=(nPts, nComp))
+        lengths = runs[:, 1] - runs[:, 0]
+        rows = np.arange(nRows) + np.repeat(runs[:, 0] - np.cumsum(lengths) +
+                                            lengths, lengths)
+
+        _bytesRead += nRows*field.strides[0]
+
+        return field[rows].astype(dtype, copy=False)
+
+    # read up to the newline ending the last requested row:
+    nLines = int( runs[-1, 1] ) + 1 if runs.size else 0
+    chunks, count, eof = [], 0, False
+    with open(fname, 'rb') as f:
+        f.seek(header['offset'])
+        while count < nLines and not eof:
+            chunk = f.read(_chunkSize)
+            eof = len(chunk) < _chunkSize
+            chunks.append(chunk)
+            count += chunk.count(b'\n')
+    buf = b''.join(chunks)
+    _bytesRead += len(buf)
+
+    # line i of the list holds the entry i, after the newline of the '(',
+    # and the list is closed on line nPts when the whole file was read:
+    lines = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == ord('\n'))
+    if lines.size < nLines or (lines.size and buf[:lines[0]].strip()):
+        return None
+    if eof and (lines.size <= nPts or
+                not buf[lines[nPts] + 1:].lstrip().startswith(b')')):
+        return None
+
+    parts = [buf[lines[start] + 1:lines[end]] for start, end in runs]
+    parts = b' '.join(parts).translate(_bracketTable)
+    data  = np.fromstring(parts, dtype=dtype, sep=' ')
+
+    # more values if several entries share a line:
+    if data.size != nRows*nComp:
+        return None
+
+    return data.reshape(nRows, nComp)
@@ -0,0 +1,156 @@
+import numpy as np
+import weakref
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from .reader_support_functions import *
+from .foam_file import *
+from ..profiler import *
+
+__all__=["SharedArray", "get_shared_array", "get_shared_name",
+         "read_snapshots_parallel"]
+
+# state shared by every task of a worker process:
+_workerState = dict()
+
+
+class SharedArray(np.ndarray):
+    '''
+    Array in a SharedMemory block that worker processes attach to by name,
+    see get_shared_array; views keep the block alive
+    '''
+
+    def __array_finalize__(self, obj):
+        self.shm = getattr(obj, 'shm', None)
+
+
+def _release(shm):
+    shm.close()
+    shm.unlink()
+
+
+def get_shared_array(shape, dtype=np.float64):
+    '''
+    Input
+    -----
+        shape: shape of the array
+        dtype: data type of the array
+
+    Output
+    ------
+        u: zero-filled SharedArray, the block is unlinked once u and all
+           its views are released
+    '''
+
+    nBytes = int( np.prod(shape) )*np.dtype(dtype).itemsize
+    shm = SharedMemory(create=True, size=max(nBytes, 1))
+
+    u = np.ndarray(shape, dtype=dtype, buffer=shm.buf).view(SharedArray)
+    u.shm = shm
+    weakref.finalize(u, _release, shm)
+
+    return u
+
+
+def get_shared_name(u):
+    '''
+    returns the name of the SharedMemory block holding all of u, None if u
+    is not a whole SharedArray
+    '''
+    if not isinstance(u, SharedArray) or u.shm is None or not u.flags.c_contiguous:
+        return None
+
+    start = np.frombuffer(u.shm.buf, dtype=np.uint8, count=1).ctypes.data
+    if u.ctypes.data != start:
+        return None
+
+    return u.shm.name
+
+
+def _init_worker(shmName, snapshotFile, shape, dtype, indices, cols, cache):
+    if snapshotFile is not None:
+        _workerState['u'] = open_snapshot_memmap(snapshotFile, shape, dtype)
+    else:
+        shm = SharedMemory(name=shmName)
+        _workerState['shm'] = shm
+        _workerState['u'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    _workerState['indices'] = indices
+    _workerState['cols'] = cols
+    _workerState['cache'] = cache
+    pop_bytes_read()
+
+
+def _read_snapshots_worker(jobs):
+    '''
+    reads the snapshots in jobs, a list of (column, file name), straight into
+    the shared snapshot matrix; returns the # of snapshots and of bytes read
+    '''
+    u = _workerState['u']
+    for i, fname in jobs:
+        u[:, :, i] = read_snapshot(fname, _workerState['indices'],
+                                   _workerState['cols'], _workerState['cache'],
+                                   u.dtype)
+
+    return len(jobs), pop_bytes_read()
+
+
+def read_snapshots_parallel(fnames, indices, cols, u, nWorkers, cache=None):
+    '''
+    Input
+    -----
+        fnames: list of velocity files, one per snapshot
+        indices: list of indices in the snapshot window
+        cols: list of cols to read from the files
+        u: (len(cols), nPts, nSnaps) array filled with the snapshots, the
+           workers write straight into it if it is a snapshot memmap or a
+           SharedArray (see get_shared_array), otherwise into a shared
+           copy
+        nWorkers: # of worker processes
+        cache: ParseCache used to skip parsing previously read files
+
+    Output
+    ------
+        u: the snapshot matrix, column i holds the snapshot of fnames[i]; the
+           bytes read by the workers are added to the profiler stage
+    '''
+    from tqdm import tqdm
+
+    nSnaps = len(fnames)
+
+    # contiguous chunks of time directories, a few per worker so that
+    # the load stays balanced:
+    nChunks = min(nSnaps, 4*nWorkers)
+    jobs = [list(zip(chunk, [fnames[i] for i in chunk]))
+            for chunk in np.array_split(np.arange(nSnaps), nChunks)]
+
+    def run_pool(initArgs):
+        with mp.Pool(nWorkers, initializer=_init_worker, initargs=initArgs) as pool:
+            with tqdm(total=nSnaps, ncols=100) as progress:
+                for n, nBytes in pool.imap_unordered(_read_snapshots_worker, jobs):
+                    progress.update(n)
+                    add_bytes(nBytes)
+
+    if isinstance(u, np.memmap) and u.filename is not None:
+        u.flush()
+        run_pool((None, u.filename, u.shape, u.dtype, indices, cols, cache))
+        return u
+
+    shmName = get_shared_name(u)
+    if shmName is not None:
+        run_pool((shmName, None, u.shape, u.dtype, indices, cols, cache))
+        return u
+
+    shm = SharedMemory(create=True, size=max(u.nbytes, 1))
+
+    try:
+        uShared = np.ndarray(u.shape, dtype=u.dtype, buffer=shm.buf)
+        run_pool((shm.name, None, u.shape, u.dtype, indices, cols, cache))
+
+        u[...] = uShared
+        del uShared
+
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return u
@@ -0,0 +1,240 @@
+import numpy as np
+import os
+import hashlib
+import pickle
+from .foam_file import *
+
+# ascii files are parsed whole when more rows than this fraction are read:
+_maxRowFraction = 0.5
+
+# row runs of the last indices read, by digest of the indices:
+_rowPlans = dict()
+
+__all__=["ParseCache", "get_parse_cache", "read_cached_field", "read_cached_rows"]
+
+
+class ParseCache(object):
+    '''
+    On-disk cache of parsed ascii fields stored as .npy files, and of data
+    derived from them (e.g. the region index) stored as pickles. Entries
+    are keyed by the path, size and modification time of the source file
+    and the least recently used entries are evicted once the cache grows
+    beyond maxSize bytes.
+    '''
+
+    def __init__(self, cacheDir, maxSize=10*1024**3):
+        self.cacheDir = cacheDir
+        self.maxSize  = maxSize
+        self._size    = None
+
+    def __getstate__(self):
+        # worker processes recount the cache size themselves
+        return {'cacheDir': self.cacheDir, 'maxSize': self.maxSize,
+                '_size': None}
+
+    def get_key(self, fname, *args):
+        '''
+        returns the cache key of the current version of fname, args are
+        added to the key of data derived from the file
+        '''
+        stat = os.stat(fname)
+        key  = '%s:%d:%d' % (os.path.abspath(fname), stat.st_size,
+                             stat.st_mtime_ns)
+        key += ''.join(':' + repr(x) for x in args)
+
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def get_path(self, key, ext='.npy'):
+        return os.path.join(self.cacheDir, key + ext)
+
+    def load(self, key):
+        '''returns the memory-mapped entry for key, None on a cache miss'''
+        path = self.get_path(key)
+        try:
+            data = np.load(path, mmap_mode='r')
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return data
+
+    def load_object(self, key):
+        '''returns the pickled entry for key, None on a cache miss'''
+        path = self.get_path(key, '.pkl')
+        try:
+            with open(path, 'rb') as f:
+                obj = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        return obj
+
+    def store(self, key, data):
+        '''adds data to the cache and evicts the oldest entries if needed'''
+        self._write(self.get_path(key),
+                    lambda f: np.save(f, np.ascontiguousarray(data)))
+
+    def store_object(self, key, obj):
+        '''adds a picklable object to the cache'''
+        self._write(self.get_path(key, '.pkl'),
+                    lambda f: pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _write(self, path, write):
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+        tmpPath = path + '.' + str(os.getpid()) + '.tmp'
+        with open(tmpPath, 'wb') as f:
+            write(f)
+        os.replace(tmpPath, path)
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._list_entries())
+        else:
+            self._size += os.path.getsize(path)
+
+        if self._size > self.maxSize:
+            self.evict()
+
+    def evict(self):
+        '''removes the least recently used entries until 90% of maxSize'''
+        entries = sorted(self._list_entries(), key=lambda x: x[2])
+        size    = sum(x[1] for x in entries)
+
+        for path, entrySize, _ in entries:
+            if size <= 0.9*self.maxSize:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entrySize
+
+        self._size = size
+
+    def _list_entries(self):
+        entries = []
+        for entry in os.scandir(self.cacheDir):
+            if not entry.name.endswith(('.npy', '.pkl')):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+
+        return entries
+
+
+def get_parse_cache(caseDir=None, maxSize=10*1024**3):
+    '''
+    Returns the parse cache of the case in postProcessing/POD/.cache
+    '''
+
+    if caseDir is None:
+        caseDir = os.getcwd()
+
+    cacheDir = os.path.join(caseDir, 'postProcessing', 'POD', '.cache')
+
+    return ParseCache(cacheDir, maxSize)
+
+
+def read_cached_field(fname, cache=None, dtype=np.float64):
+    '''
+    Input
+    -----
+        fname: path of an OpenFOAM field file
+        cache: ParseCache, the field is parsed from fname if None
+        dtype: data type of the returned array
+
+    Output
+    ------
+        data: (nPts, nComp) array of the field values
+    '''
+
+    if cache is None:
+        return read_foam_field(fname, dtype)
+
+    key  = cache.get_key(fname, np.dtype(dtype).str)
+    data = cache.load(key)
+    if data is not None:
+        return data
+
+    header = read_foam_header(fname)
+    data   = read_foam_field(fname, dtype, header)
+
+    # binary fields are memory-mapped already:
+    if header['format'] == 'ascii':
+        cache.store(key, data)
+
+    return data
+
+
+def _get_row_plan(indices):
+    '''
+    returns the digest, runs and inverse (see get_row_runs) of indices,
+    computed once for all the files read with the same indices
+    '''
+    indices = np.ascontiguousarray(indices, dtype=np.int64)
+    digest  = hashlib.sha1(indices.tobytes()).hexdigest()
+
+    plan = _rowPlans.get(digest)
+    if plan is None:
+        if len(_rowPlans) >= 8:
+            _rowPlans.clear()
+        plan = (digest,) + get_row_runs(indices)
+        _rowPlans[digest] = plan
+
+    return plan
+
+
+def read_cached_rows(fname, indices, cache=None, dtype=np.float64):
+    '''
+    Input
+    -----
+        fname: path of an OpenFOAM field file
+        indices: indices of the rows to read
+        cache: ParseCache, the rows are parsed from fname if None
+        dtype: data type of the returned array
+
+    Output
+    ------
+        data: (len(indices), nComp) array of the field values at indices
+
+    Only the runs of consecutive rows of indices are read (see
+    read_foam_rows), unless the whole field is in the cache or the rows are
+    more than _maxRowFraction of an ascii file, which is then parsed and
+    cached whole. The rows parsed from an ascii file are cached under the
+    digest of indices.
+    '''
+
+    if cache is not None:
+        data = cache.load( cache.get_key(fname, np.dtype(dtype).str) )
+        if data is not None:
+            return data[indices]
+
+    digest, runs, inverse = _get_row_plan(indices)
+    header = read_foam_header(fname)
+
+    if header['format'] == 'binary':
+        return read_foam_rows(fname, runs, dtype, header)[inverse]
+
+    if inverse.size and runs[:, 1].sum() - runs[:, 0].sum() > \
+       _maxRowFraction*header['nPts']:
+        return read_cached_field(fname, cache, dtype)[indices]
+
+    key = None
+    if cache is not None:
+        key  = cache.get_key(fname, np.dtype(dtype).str, digest)
+        data = cache.load(key)
+        if data is not None:
+            return data[inverse]
+
+    data = read_foam_rows(fname, runs, dtype, header)
+    if data is None:
+        return read_cached_field(fname, cache, dtype)[indices]
+
+    if key is not None:
+        cache.store(key, data)
+
+    return data[inverse]
@@ -2,13 +2,19 @@ import os
 from subprocess import call
 import numpy as np
 import time
-from tqdm import tqdm 
 from .reader_support_functions import *
+from .foam_file import *
+from .parse_cache import *
+from .region import *
+from .parallel_reader import *
+from ..profiler import *
 
 __all__=["config_to_dict", "read_points_from_foamFile", "read_velocity_from_foamFile"]
 
 def read_velocity_from_foamFile(filePath, patchName, indices, 
-                                nSnaps, nPts, nDim, cols=None):
+                                nSnaps, nPts, nDim, cols=None, nWorkers=1,
+                                cache=True, out=None, dtype=np.float64,
+                                timeSelection=None):
     '''
     Input
     -----
@@ -18,54 +24,85 @@ def read_velocity_from_foamFile(filePath, patchName, indices,
         indices: list of indices to read from the velocity file
         n_snaps: # of snapshots to use for POD
         npts: # of points in the snapshot window
+        nWorkers: # of processes used to import the snapshots
+        cache: ParseCache of parsed files, True for the default cache of
+               the case and None to always parse the files
+        out: (nDim, nPts, nSnaps) array, e.g. a snapshot memmap, filled
+             with the snapshots instead of a new array
+        dtype: data type of the snapshots if out is None
+        timeSelection: timeStart, timeEnd and stride of the snapshots, see
+                       get_time_dirs
 
     Output
     ------
         u1, u2: velocity vectors in the snapshot window
     '''
+    from tqdm import tqdm
     
-    timeDirs = get_time_dirs(filePath, nSnaps)
+    if nDim not in (2, 3):
+        raise ValueError('Oops! Number of dimensions not defined ...')
+
+    with stage('listDirs'):
+        timeDirs = get_time_dirs(filePath, nSnaps, timeSelection,
+                                 get_snapshot_field(patchName, nDim))
+        fnames   = get_snapshot_files(filePath, patchName, timeDirs, nDim)
 
-    u1 = np.zeros((nPts, nSnaps))
-    u2 = np.zeros((nPts, nSnaps))
     if nDim == 3:
-        u3 = np.zeros((nPts, nSnaps))
+        cols = [0, 1, 2]
+
+    if cache is True:
+        cache = get_parse_cache()
+
+    # velocity components stacked in a single snapshot matrix, in shared
+    # memory for the worker processes:
+    if out is not None:
+        u = out
+    elif nWorkers > 1:
+        u = get_shared_array((nDim, nPts, nSnaps), dtype)
+    else:
+        u = np.zeros((nDim, nPts, nSnaps), dtype=dtype)
 
     print('\n importing velocity snapshots ...')
 
-    # 2d problem:
-    if nDim == 2:
-        for i in tqdm( range(nSnaps), ncols=100 ):
-            fname = filePath + '/' + str(timeDirs[i]) + '/' + patchName + '/' \
-                'vectorField/U'
-            data = read_data(fname, cols)
-        
-            temp1 = data[0]
-            temp2 = data[1]
-        
-            u1[:, i] = temp1[indices]
-            u2[:, i] = temp2[indices]
-            
-        return u1, u2
-    # 3d problem:
-    elif nDim == 3:
-        for i in tqdm( range(nSnaps), ncols=100 ):
-            fname = filePath + '/' + str(timeDirs[i]) + '/' + \
-                    'U'
-            data = get_internal_field(fname, skiprows=22)
+    with stage('readSnapshots'):
+        # bytes of the field files actually read, only the rows of the
+        # window or nothing when cached:
+        pop_bytes_read()
+        if nWorkers > 1:
+            read_snapshots_parallel(fnames, indices, cols, u, nWorkers, cache)
+        else:
+            for i in tqdm( range(nSnaps), ncols=100 ):
+                u[:, :, i] = read_snapshot(fnames[i], indices, cols, cache, u.dtype)
 
-            u1[:, i] = data[indices, 0]
-            u2[:, i] = data[indices, 1]
-            u3[:, i] = data[indices, 2]
+        add_snapshots(nSnaps)
+        add_bytes( pop_bytes_read() )
 
-        return u1, u2, u3
-        
+    return tuple(u)
+
+
+def get_region(fname, coordData, minX, maxX, nDim, roi, cache, *args):
+    '''
+    Returns the indices and # of points of coordData, read from fname, in
+    the POD window and regions of interest. The region index of small
+    regions is persisted in the cache, args identify the scaling of
+    coordData.
+    '''
+
+    window = get_window(minX, maxX, nDim)
+    shapes = get_roi_shapes(roi, nDim)
+
+    if cache is not None and use_region_index(coordData, window, shapes):
+        key   = cache.get_key(fname, 'regionIndex', *args)
+        index = get_region_index(coordData, cache, key)
     else:
-        raise ValueError('Oops! Number of dimensions not defined ...')
+        index = None
+
+    return select_region(coordData, window, shapes, index)
 
 
 def read_points_from_foamFile(filePath, nSnaps, patchName,
-                              minX, maxX, h, nDim, cols=None):
+                              minX, maxX, h, nDim, cols=None, cache=True,
+                              roi=None, timeSelection=None):
     '''
     Input
     -----
@@ -74,22 +111,38 @@ def read_points_from_foamFile(filePath, nSnaps, patchName,
         x1min, x2min: lower bound of the POD window
         x1max, x2max: upper bound of the POD window
         h: non-dimensionalization length
+        cache: ParseCache of parsed files, True for the default cache of
+               the case and None to always parse the files
+        roi: list of (name, values) regions of interest, see get_roi_shapes,
+             only points in the POD window and in any of them are kept
+        timeSelection: timeStart, timeEnd and stride of the snapshots, see
+                       get_time_dirs
 
     Output
     ------
         x1, x2: array of x1, x2 coordinates in the POD window
     '''
     
-    timeDirs = get_time_dirs(filePath, nSnaps)
+    with stage('listDirs'):
+        timeDirs = get_time_dirs(filePath, nSnaps, timeSelection,
+                                 get_snapshot_field(patchName, nDim))
+
+    if cache is True:
+        cache = get_parse_cache()
 
     if nDim == 2:
         filePath = filePath + '/' + str(timeDirs[0]) + '/' \
                    + patchName + '/points'
 
-        coordData = read_data(filePath, cols)
-        coordData = coordData.T/h
+        with stage('readPoints'):
+            coordData = read_cached_field(filePath, cache)
+            coordData = coordData[:, cols]/h
+            if get_profiler() is not None:
+                add_bytes( os.path.getsize(filePath) )
 
-        indices, nPts = get_indices_npts(coordData, minX, maxX, nDim, cols)
+        with stage('roi'):
+            indices, nPts = get_region(filePath, coordData, minX, maxX, nDim,
+                                       roi, cache, h, cols)
 
         x1 = coordData[indices, 0]
         x2 = coordData[indices, 1]
@@ -101,7 +154,10 @@ def read_points_from_foamFile(filePath, nSnaps, patchName,
                       + 'cellCentres'
 
         if os.path.exists(cellCentres):
-            coordData = get_internal_field(cellCentres, skiprows=22)
+            with stage('readPoints'):
+                coordData = read_cached_field(cellCentres, cache)
+                if get_profiler() is not None:
+                    add_bytes( os.path.getsize(cellCentres) )
 
         # if cellCentres file does not exists then, run the "myWriteCellCentres"
         # command in the case directory
@@ -113,10 +169,12 @@ def read_points_from_foamFile(filePath, nSnaps, patchName,
                 raise RuntimeError('Oops! Something went wrong with' + 
                                    ' myWriteCellCentres ...')
 
-            coordData = get_internal_field(cellCentres, skiprows=22)
+            coordData = read_cached_field(cellCentres, cache)
             
         coordData = coordData/h
-        indices, nPts = get_indices_npts(coordData, minX, maxX, nDim)
+        with stage('roi'):
+            indices, nPts = get_region(cellCentres, coordData, minX, maxX, nDim,
+                                       roi, cache, h)
         
         x1 = coordData[indices, 0]
         x2 = coordData[indices, 1]
@@ -142,6 +200,17 @@ def config_to_dict(configFile):
             str = str[:-2]
             modes = [int(x) for x in str.split(',')]
 
+        elif (line.startswith('roi')):
+            str = line.partition('(')[2]
+            str = str[:str.rindex(')')]
+            temp = [float(x) for x in str.split(',')]
+            configDict.setdefault('roi', []).append((line.split()[0], temp))
+
+        elif (line.startswith('spodFreqs')):
+            str = line.partition('(')[2]
+            str = str[:str.rindex(')')]
+            configDict['spodFreqs'] = [float(x) for x in str.split(',')]
+
         elif (line.startswith('point')):
             str = line.partition('(')[2]
             str = str[:-2]
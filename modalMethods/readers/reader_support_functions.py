@@ -1,9 +1,12 @@
 import numpy as np
-import os
-import re
 import time, sys
+from .foam_file import *
+from .parse_cache import *
+from .region import *
+from .time_catalog import *
 
-__all__=["get_columns", "read_data", "get_internal_field", "get_indices_npts", "get_time_dirs"]
+__all__=["get_columns", "read_data", "get_internal_field", "get_indices_npts", "get_time_dirs",
+         "get_snapshot_field", "get_snapshot_files", "read_snapshot", "open_snapshot_memmap"]
 
 
 def get_columns(dir1, dir2):
@@ -21,29 +24,6 @@ def get_columns(dir1, dir2):
     return cols
 
 
-def get_number_of_cols(fname, skiprows=0):
-    count = 0
-    with open(fname) as f:
-        for line in f:
-            count += 1
-
-            if count > skiprows:
-                line = re.split(r'[(|)|\s]', line)
-                while '' in line:
-                    line.remove('')
-
-                try:
-                    temp = float( line[0] )
-                    nCols = len(line)
-                    break
-                except:
-                    continue
-
-            else: continue
-
-    return nCols
-
-
 def read_data(filePath, cols):
     '''
     Input
@@ -56,70 +36,34 @@ def read_data(filePath, cols):
         data: array of data read from the file
     '''
 
-    data = [[] for i in range(len(cols))]
-    
-    with open(filePath) as f:
-        for line in f:
-            line = re.split(r'[(|)|\s]', line)
-            try:
-                for i in range(len(cols)):
-                    data[i].append(float(line[1+cols[i]]))
-            except:
-                continue
-                
-    return np.array(data)
-
-
-def get_internal_field(fname, skiprows=0):
-    nCols = get_number_of_cols(fname, skiprows)
-    data = [[] for i in range(nCols)]
-
-    count = 0                   # line counter
-    pointsInternalField = 0     # number of points in the internal field
-
-    with open(fname) as f:
-        for line in f:
-            count += 1
-
-            if count == (skiprows-1):
-                line = re.split(r'[\s]', line)
-
-                # remove whitespaces from the line
-                while '' in line:
-                    line.remove('')
-
-                pointsInternalField = int( line[0] )
-
-            elif (count > skiprows) and (count <= pointsInternalField + skiprows):
-                line = re.split(r'[(|)|\s]', line)
+    data = read_foam_field(filePath)
 
-                # remove whitespaces from the line
-                while '' in line:
-                    line.remove('')
+    return data[:, cols].T
 
-                try:
-                    for i in range( nCols ):
-                        data[i].append( float( line[i] ) )
 
-                except:
-                    continue
-
-            elif count > pointsInternalField + skiprows:
-                break
+def get_internal_field(fname, skiprows=0):
+    '''
+    Input
+    -----
+        fname: path of the OpenFOAM field file
+        skiprows: unused, the field size and offset are read from the header
 
-            # skip rows
-            else: continue
+    Output
+    ------
+        data: (nPts, nComp) array of the internal field
+    '''
 
-    return np.array(data).T
+    return read_foam_field(fname)
 
 
 def get_indices_npts(coordData, minX, maxX, nDim, cols=None):
     '''
     Input
     -----
-        x1, x2: coordinates of the snapshot window
-        x1min, x2min: lower bound of the POD window
-        x1max, x2max: upper bound of the POD window
+        coordData: coordinates of the snapshot points
+        minX: lower bound of the POD window
+        maxX: upper bound of the POD window
+        cols: columns of the coordinates of the POD plane in 2d
 
     Output
     ------
@@ -127,24 +71,11 @@ def get_indices_npts(coordData, minX, maxX, nDim, cols=None):
         npts: number of points in the snapshot window
     '''
 
-    indices = []
-    npts = coordData.shape[0]
+    if cols is None:
+        cols = list( range(nDim) )
 
-    for i in range(npts):
-
-        if nDim == 2:
-            if ( (minX['x1'] <= coordData[i, cols[0]]) and (coordData[i, cols[0]] <= maxX['x1']) and
-                 (minX['x2'] <= coordData[i, cols[1]]) and (coordData[i, cols[1]] <= maxX['x2']) ):
-                indices.append(i)
-
-        elif nDim == 3:
-            if ( (minX['x1'] <= coordData[i, 0]) and (coordData[i, 0] <= maxX['x1']) and
-                 (minX['x2'] <= coordData[i, 1]) and (coordData[i, 1] <= maxX['x2']) and
-                 (minX['x3'] <= coordData[i, 2]) and (coordData[i, 2] <= maxX['x3']) ):
-                 indices.append(i)
-
-    indices = np.array(indices)
-    nPts = indices.size
+    window  = get_window(minX, maxX, nDim)
+    indices, nPts = select_region(coordData[:, cols], window)
 
     return indices, nPts
 
@@ -161,17 +92,76 @@ def is_number(s):
     return True
 
 
-def get_time_dirs(filePath, nSnaps):
+def get_time_dirs(filePath, nSnaps, timeSelection=None, field=None):
     '''
-    Returns list of time directories in the folder
+    Returns the last nSnaps (all if None) time directories in the folder in
+    increasing time order, among those selected by timeSelection, a
+    dictionary of timeStart, timeEnd and stride (see TimeCatalog.select),
+    and holding the file field (see get_snapshot_field) if not None
     '''
 
-    dirs = os.listdir(filePath)
-    dirs = [x for x in dirs if is_number(x)]
-    dirs = np.sort( np.asarray(dirs) )
+    catalog = get_time_catalog(filePath)
+
+    return catalog.select(nSnaps, field=field, **(timeSelection or {}))
 
-    nFiles = dirs.size
 
-    timeDirs = dirs[nFiles - nSnaps:]
+def get_snapshot_field(patchName, nDim):
+    '''
+    Returns the path of the velocity file relative to a time directory
+    '''
+
+    if nDim == 2:
+        return patchName + '/vectorField/U'
+
+    return 'U'
+
+
+def get_snapshot_files(filePath, patchName, timeDirs, nDim):
+    '''
+    Returns list of velocity files for the time directories
+    '''
+
+    field = get_snapshot_field(patchName, nDim)
+
+    return [filePath + '/' + str(t) + '/' + field for t in timeDirs]
+
+
+def read_snapshot(fname, indices, cols, cache=None, dtype=np.float64):
+    '''
+    Input
+    -----
+        fname: path of the velocity file
+        indices: list of indices in the snapshot window
+        cols: list of cols to read from the file
+        cache: ParseCache used to skip parsing previously read files
+        dtype: data type of the returned array
+
+    Output
+    ------
+        data: (len(cols), nPts) array of the velocity in the snapshot window
+    '''
+
+    data = read_cached_rows(fname, indices, cache, dtype)
+
+    return data[:, cols].T
+
+
+def open_snapshot_memmap(fname, shape, dtype=np.float64, mode='r+'):
+    '''
+    Input
+    -----
+        fname: path of the snapshot matrix file
+        shape: (nComp, nPts, nSnaps) shape of the snapshot matrix
+        dtype: data type of the snapshots
+        mode: 'w+' to create the file, 'r+' or 'r' to open an existing one
+
+    Output
+    ------
+        u: (nComp, nPts, nSnaps) memory-mapped snapshot matrix, every
+           snapshot is stored contiguously in the file
+    '''
+
+    nComp, nPts, nSnaps = shape
+    u = np.memmap(fname, dtype=dtype, mode=mode, shape=(nSnaps, nComp, nPts))
 
-    return timeDirs
+    return u.transpose(1, 2, 0)
@@ -0,0 +1,183 @@
+import numpy as np
+
+__all__=["get_window", "get_roi_shapes", "use_region_index", "get_region_index",
+         "select_region"]
+
+# the k-d tree is only used for regions whose bounding box is smaller than
+# this fraction of the bounding box of the mesh:
+_maxIndexFraction = 0.05
+
+
+def get_window(minX, maxX, nDim):
+    '''
+    Returns the box of the POD window given by its lower and upper bounds
+    '''
+
+    keys = ['x' + str(i+1) for i in range(nDim)]
+
+    return {'type': 'box', 'min': np.array([minX[x] for x in keys]),
+            'max': np.array([maxX[x] for x in keys])}
+
+
+def get_roi_shapes(roi, nDim):
+    '''
+    Input
+    -----
+        roi: list of (name, values) entries of the config file:
+             roiBox (x1min, x1max, x2min, x2max[, x3min, x3max])
+             roiSphere (c1, c2[, c3], radius)
+             roiPolygon (x1, x2, x1, x2, ...), arbitrary polygon in 2d
+             roiPolyhedron (x1, x2, x3, ...), convex hull of the vertices in 3d
+        nDim: # of dimensions
+
+    Output
+    ------
+        shapes: list of dictionaries describing the shapes
+    '''
+
+    shapes = []
+    for name, values in roi or []:
+        values = np.asarray(values, dtype=float)
+
+        if name == 'roiBox' and values.size == 2*nDim:
+            shapes.append({'type': 'box', 'min': values[0::2], 'max': values[1::2]})
+
+        elif name == 'roiSphere' and values.size == nDim + 1:
+            shapes.append({'type': 'sphere', 'centre': values[:nDim],
+                           'radius': values[nDim]})
+
+        elif name in ('roiPolygon', 'roiPolyhedron') and values.size % nDim == 0:
+            shapes.append({'type': 'polygon', 'vertices': values.reshape(-1, nDim)})
+
+        else:
+            raise ValueError('\n wrong definition of region of interest ' +
+                             name + ' ...')
+
+    return shapes
+
+
+def _get_bounds(shape):
+    '''returns the bounding box of a shape'''
+    if shape['type'] == 'box':
+        return shape['min'], shape['max']
+
+    elif shape['type'] == 'sphere':
+        return shape['centre'] - shape['radius'], shape['centre'] + shape['radius']
+
+    return shape['vertices'].min(axis=0), shape['vertices'].max(axis=0)
+
+
+def _get_mask(shape, x):
+    '''returns True for the points x inside the shape'''
+    if shape['type'] == 'box':
+        return np.all((shape['min'] <= x) & (x <= shape['max']), axis=1)
+
+    elif shape['type'] == 'sphere':
+        return np.sum(np.square(x - shape['centre']), axis=1) <= shape['radius']**2
+
+    elif x.shape[1] == 2:
+        from matplotlib.path import Path
+        return Path(shape['vertices']).contains_points(x)
+
+    from scipy.spatial import Delaunay
+    return Delaunay(shape['vertices']).find_simplex(x) >= 0
+
+
+def _get_region_bounds(window, shapes=None):
+    '''returns the bounding box of the points in the window and in any shape'''
+    lower, upper = _get_bounds(window)
+    if shapes:
+        bounds = [_get_bounds(shape) for shape in shapes]
+        lower  = np.maximum(lower, np.min([b[0] for b in bounds], axis=0))
+        upper  = np.minimum(upper, np.max([b[1] for b in bounds], axis=0))
+
+    return lower, upper
+
+
+def use_region_index(coordData, window, shapes=None):
+    '''
+    returns True if the bounding box of the region covers less than
+    _maxIndexFraction of that of the mesh, the k-d tree then skips most of
+    the points; the vectorized mask of all the points is as fast otherwise
+    '''
+    lower, upper = _get_region_bounds(window, shapes)
+
+    # bounding box of the mesh from a sample of its points:
+    sample = coordData[::max(1, coordData.shape[0] // 65536)]
+    meshMin, meshMax = sample.min(axis=0), sample.max(axis=0)
+
+    extent = np.clip(np.minimum(upper, meshMax) - np.maximum(lower, meshMin), 0, None)
+    size   = meshMax - meshMin
+    ratio  = np.where(size > 0, extent/np.where(size > 0, size, 1), 1.0)
+
+    return np.prod(ratio) < _maxIndexFraction
+
+
+def get_region_index(coordData, cache=None, key=None):
+    '''
+    Input
+    -----
+        coordData: (nPts, nDim) coordinates of the mesh
+        cache: ParseCache in which the index is persisted
+        key: cache key of the mesh, see ParseCache.get_key
+
+    Output
+    ------
+        index: k-d tree of the mesh points
+    '''
+
+    from scipy.spatial import cKDTree
+
+    if cache is not None:
+        index = cache.load_object(key)
+        if index is not None:
+            return index
+
+    index = cKDTree(coordData)
+
+    if cache is not None:
+        cache.store_object(key, index)
+
+    return index
+
+
+def select_region(coordData, window, shapes=None, index=None):
+    '''
+    Input
+    -----
+        coordData: (nPts, nDim) coordinates of the mesh
+        window: box (see get_roi_shapes) bounding the POD window
+        shapes: list of shapes, the points inside any of them are kept
+        index: k-d tree of coordData used to skip points far from the region
+
+    Output
+    ------
+        indices: sorted list of indices in the region of interest
+        nPts: number of points in the region of interest
+    '''
+
+    lower, upper = _get_region_bounds(window, shapes)
+
+    if index is not None:
+        if np.any(lower > upper):
+            candidates = np.zeros(0, dtype=int)
+        else:
+            candidates = index.query_ball_point((lower + upper)/2,
+                                                r=np.max(upper - lower)/2,
+                                                p=np.inf)
+            candidates = np.sort( np.asarray(candidates, dtype=int) )
+    else:
+        candidates = np.arange(coordData.shape[0])
+
+    x    = coordData[candidates]
+    mask = _get_mask(window, x)
+
+    if shapes:
+        inShapes = np.zeros(mask.shape, dtype=bool)
+        for shape in shapes:
+            inShapes[mask] |= _get_mask(shape, x[mask])
+        mask &= inShapes
+
+    indices = candidates[mask]
+
+    return indices, indices.size
@@ -0,0 +1,222 @@
+import numpy as np
+import os
+import json
+import hashlib
+
+__all__=["TimeCatalog", "get_time_catalog"]
+
+_catalogVersion = 1
+
+# catalogs already loaded by this process, by directory:
+_catalogs = dict()
+
+
+def _parse_time(name):
+    '''returns the time of a time directory name, None if it is not one'''
+    try:
+        t = float(name)
+    except ValueError:
+        return None
+
+    return t if np.isfinite(t) else None
+
+
+def _scan_files(path):
+    '''returns the size of every file below path, by relative path'''
+    files = dict()
+    for root, dirs, names in os.walk(path):
+        rel = os.path.relpath(root, path)
+        for name in names:
+            try:
+                size = os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+            files[name if rel == '.' else rel + '/' + name] = size
+
+    return files
+
+
+class TimeCatalog(object):
+    '''
+    Catalog of the time directories of a directory (the case, processorN
+    or postProcessing/cuttingPlane): the numeric time, the files and their
+    sizes of every time directory, persisted as JSON in catalogFile.
+
+    The catalog is refreshed incrementally: the directory is only listed
+    again when its modification time changed, and then only the new time
+    directories are scanned, together with the latest known one which may
+    have been written meanwhile. Files added to older time directories are
+    only seen by refresh(rescan=True).
+
+    Input
+    -----
+        filePath: directory of the time directories
+        catalogFile: JSON file of the catalog, not persisted if None
+    '''
+
+    def __init__(self, filePath, catalogFile=None):
+        self.filePath    = os.path.abspath(filePath)
+        self.catalogFile = catalogFile
+        self.entries = dict()
+        self.mtime   = None
+
+        self._load()
+
+    def _load(self):
+        if self.catalogFile is None:
+            return
+
+        try:
+            with open(self.catalogFile) as f:
+                catalog = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if catalog.get('version') != _catalogVersion or \
+           catalog.get('filePath') != self.filePath:
+            return
+
+        self.entries = catalog['entries']
+        self.mtime   = catalog['mtime']
+
+    def save(self):
+        '''writes the catalog, silently skipped if catalogFile is not writable'''
+        if self.catalogFile is None:
+            return
+
+        catalog = {'version': _catalogVersion, 'filePath': self.filePath,
+                   'mtime': self.mtime, 'entries': self.entries}
+
+        tmpFile = self.catalogFile + '.' + str(os.getpid()) + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.catalogFile), exist_ok=True)
+            with open(tmpFile, 'w') as f:
+                json.dump(catalog, f)
+            os.replace(tmpFile, self.catalogFile)
+        except OSError:
+            pass
+
+    def refresh(self, rescan=False, latest=False):
+        '''
+        updates the catalog if the directory changed, or scans every time
+        directory again if rescan, and the latest time directory anyway if
+        latest (e.g. while it is being written); returns True if the
+        directory was listed
+        '''
+
+        mtime = os.stat(self.filePath).st_mtime_ns
+        if mtime == self.mtime and not rescan:
+            if latest and self.entries:
+                name  = self.names[-1]
+                files = _scan_files(os.path.join(self.filePath, name))
+                if files != self.entries[name]['files']:
+                    self.entries[name]['files'] = files
+                    self.save()
+
+            return False
+
+        names = dict()
+        with os.scandir(self.filePath) as it:
+            for entry in it:
+                t = _parse_time(entry.name)
+                if t is not None and entry.is_dir():
+                    names[entry.name] = t
+
+        known = self.entries
+        if known and not rescan:
+            latest = max(known, key=lambda name: known[name]['time'])
+            entries = {name: known[name] for name in names
+                       if name in known and name != latest}
+        else:
+            entries = dict()
+
+        for name, t in names.items():
+            if name not in entries:
+                entries[name] = {'time': t, 'files': _scan_files(
+                                     os.path.join(self.filePath, name))}
+
+        self.entries = entries
+        self.mtime = mtime
+        self.save()
+
+        return True
+
+    @property
+    def names(self):
+        '''time directory names in increasing time order'''
+        return sorted(self.entries, key=lambda name: self.entries[name]['time'])
+
+    @property
+    def times(self):
+        '''times of the time directories in increasing order'''
+        return np.array([self.entries[name]['time'] for name in self.names])
+
+    def get_size(self, name, field):
+        '''returns the size of the file field of a time directory, None if missing'''
+        return self.entries[name]['files'].get(field)
+
+    def select(self, nSnaps=None, timeStart=None, timeEnd=None, stride=1,
+               field=None):
+        '''
+        Input
+        -----
+            nSnaps: # of time directories, the last ones of the selection;
+                    all of them if None
+            timeStart, timeEnd: bounds of the time range, included
+            stride: keep every stride-th time directory of the range
+            field: keep the time directories with this file only, e.g. 'U'
+                   or 'zNormal/vectorField/U'
+
+        Output
+        ------
+            timeDirs: names of the selected time directories in increasing
+                      time order
+        '''
+
+        names = self.names
+        if field is not None:
+            names = [name for name in names if field in self.entries[name]['files']]
+        if timeStart is not None:
+            names = [name for name in names if self.entries[name]['time'] >= timeStart]
+        if timeEnd is not None:
+            names = [name for name in names if self.entries[name]['time'] <= timeEnd]
+
+        names = names[::max(1, int(stride))]
+
+        if nSnaps is not None:
+            if nSnaps > len(names):
+                raise ValueError('\n only ' + str(len(names)) + ' time directories ' +
+                                 'selected in ' + self.filePath + ', nSnaps is ' +
+                                 str(nSnaps) + ' ...')
+            names = names[len(names) - nSnaps:]
+
+        return np.asarray(names)
+
+
+def get_time_catalog(filePath, catalogDir=None):
+    '''
+    Input
+    -----
+        filePath: directory of the time directories
+        catalogDir: directory of the catalog files, postProcessing/.timeCatalog
+                    of the working directory (the case) if None
+
+    Output
+    ------
+        catalog: up to date TimeCatalog of filePath, kept for the next calls
+                 of this process
+    '''
+
+    if catalogDir is None:
+        catalogDir = os.path.join(os.getcwd(), 'postProcessing', '.timeCatalog')
+
+    key = hashlib.sha1(os.path.abspath(filePath).encode()).hexdigest()
+
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        catalog = TimeCatalog(filePath, os.path.join(catalogDir, key + '.json'))
+        _catalogs[key] = catalog
+
+    catalog.refresh()
+
+    return catalog
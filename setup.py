@@ -7,10 +7,14 @@ setup(name='modalMethods',
       packages=find_packages(),
       entry_points = {
           'console_scripts':[
-              'writePODmodes=modalMethods.bin.POD.write_pod_modes:main',
-              'podBasicPlot=modalMethods.bin.POD.pod_basic_plot:main',
-              'podQuiverPlot=modalMethods.bin.POD.pod_quiver_plot:main',
-              'podEnergyPlot=modalMethods.bin.POD.pod_energy_plot:main'
+              'modalMethods=modalMethods.cli:main',
+              'writePODmodes=modalMethods.cli:write_pod_modes',
+              'podBasicPlot=modalMethods.cli:pod_basic_plot',
+              'podQuiverPlot=modalMethods.cli:pod_quiver_plot',
+              'podEnergyPlot=modalMethods.cli:pod_energy_plot',
+              'podProject=modalMethods.cli:pod_project',
+              'writeDMDmodes=modalMethods.cli:write_dmd_modes',
+              'writeSPODmodes=modalMethods.cli:write_spod_modes'
               ]
           },
       install_requires=[